@@ -1,3 +1,7 @@
 from .local_cache import LocalCache
 from .instrument_dto import InstrumentDTO
+from .instrument_catalog import InstrumentCatalog
+from .candle_archive import CandleArchive
 from .ticker_cache import TickerCache
+from .candle_backfill import CandleBackfill
+from .day_result_cache import DayResultCache
@@ -0,0 +1,274 @@
+import fcntl
+import json
+import os
+import shutil
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, date as date_type
+
+import numpy as np
+
+from app import AppConfig
+
+
+class CandleArchive:
+    """
+    Колоночный архив минутных свечей тикера: db/archive/{ticker}/{YYYY-MM}.npy.
+    Файл месяца - структурированный массив numpy, отсортированный по времени:
+    time - минута от начала эпохи (int32), цены - целые в шагах 10^-digits (int64), volume (int64).
+    Файлы читаются через memmap, день выбирается бинарным поиском по времени.
+    День без данных хранится одной нулевой записью в 00:00 - как признак в таблице candles
+    """
+
+    DTYPE = np.dtype([
+        ('time', np.int32),
+        ('open', np.int64),
+        ('high', np.int64),
+        ('low', np.int64),
+        ('close', np.int64),
+        ('volume', np.int64),
+    ])
+
+    MINUTES_IN_DAY = 1440
+    EPOCH = datetime(1970, 1, 1)
+
+    # знаков после запятой в ценах, если в мете тикера ничего нет
+    DEFAULT_DIGITS = 9
+
+    # загруженные файлы месяцев: путь -> (mtime, массив)
+    loaded: dict[str, tuple[float, np.ndarray]] = {}
+
+    def __init__(self, ticker: str):
+        self.ticker = ticker
+        self.dir = f"{AppConfig.BASE_DIR}/db/archive/{ticker}"
+        self.meta_file = f"{self.dir}/meta.json"
+        self._digits: int | None = None
+
+    def get_month_file(self, month: str) -> str:
+        return f"{self.dir}/{month}.npy"
+
+    @classmethod
+    def to_minute(cls, dt: datetime) -> int:
+        """Минута от начала эпохи. Часовой пояс отбрасывается, время ожидается в UTC"""
+        dt = dt.replace(tzinfo=None)
+        return int((dt - cls.EPOCH).total_seconds()) // 60
+
+    @classmethod
+    def get_day_start(cls, date: str | date_type) -> int:
+        if isinstance(date, str):
+            date = datetime.strptime(date, "%Y-%m-%d").date()
+        return (date.toordinal() - cls.EPOCH.toordinal()) * cls.MINUTES_IN_DAY
+
+    def get_digits(self) -> int:
+        if self._digits is None:
+            if os.path.exists(self.meta_file):
+                with open(self.meta_file) as f:
+                    self._digits = int(json.load(f)['digits'])
+            else:
+                self._digits = self.DEFAULT_DIGITS
+        return self._digits
+
+    def set_digits(self, digits: int):
+        os.makedirs(self.dir, exist_ok=True)
+        with open(self.meta_file, 'w') as f:
+            json.dump({'digits': digits}, f)
+        self._digits = digits
+
+    def get_scale(self) -> int:
+        return 10 ** self.get_digits()
+
+    def load_month(self, month: str) -> np.ndarray | None:
+        path = self.get_month_file(month)
+        try:
+            mtime = os.stat(path).st_mtime
+        except FileNotFoundError:
+            return None
+
+        loaded = self.loaded.get(path)
+        if loaded is not None and loaded[0] == mtime:
+            return loaded[1]
+
+        data = np.load(path, mmap_mode='r')
+        self.loaded[path] = (mtime, data)
+        return data
+
+    def get_day_rows(self, date: str) -> np.ndarray | None:
+        """
+        Записи дня из архива
+        :return: None - дня нет в архиве
+        """
+        data = self.load_month(date[:7])
+        if data is None:
+            return None
+
+        day_start = self.get_day_start(date)
+        times = data['time']
+        left = np.searchsorted(times, day_start, side='left')
+        right = np.searchsorted(times, day_start + self.MINUTES_IN_DAY, side='left')
+        if left == right:
+            return None
+
+        return data[left:right]
+
+    def has_day(self, date: str) -> bool:
+        return self.get_day_rows(date) is not None
+
+    def get_day(self, date: str) -> dict[str, np.ndarray] | None:
+        """
+        Колонки дня: time (минута дня), цены во float, volume.
+        Как в TickerCache.get_candles: единственная запись - признак дня без данных (пустые колонки),
+        нулевая запись-признак среди свечей пропускается
+        :return: None - дня нет в архиве
+        """
+        rows = self.get_day_rows(date)
+        if rows is None:
+            return None
+
+        day_start = self.get_day_start(date)
+        if len(rows) == 1:
+            rows = rows[:0]
+        else:
+            is_marker = (rows['time'] == day_start) & (rows['open'] == 0) & (rows['close'] == 0)
+            if is_marker.any():
+                rows = rows[~is_marker]
+
+        scale = self.get_scale()
+        return {
+            'time': rows['time'] - day_start,
+            'open': rows['open'] / scale,
+            'high': rows['high'] / scale,
+            'low': rows['low'] / scale,
+            'close': rows['close'] / scale,
+            'volume': np.asarray(rows['volume']),
+        }
+
+    @contextmanager
+    def lock(self):
+        """Блокировка архива тикера между процессами на время чтения, слияния и записи файлов месяцев"""
+        os.makedirs(self.dir, exist_ok=True)
+        with open(f"{self.dir}/.lock", 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def add_rows(self, rows: list[tuple]):
+        """
+        Добавляет записи в формате строк таблицы candles: (дата и время, open, high, low, close, volume).
+        Записи с уже существующим временем не перезаписываются, как INSERT OR IGNORE.
+        Свечи дописывают и бэктесты в процессах пула, поэтому слияние с файлом месяца идет под блокировкой
+        """
+        by_month: dict[str, list[tuple]] = {}
+        scale = self.get_scale()
+        for dt, open_, high, low, close, volume in rows:
+            if isinstance(dt, str):
+                dt = self.parse_datetime(dt)
+            by_month.setdefault(dt.strftime('%Y-%m'), []).append((
+                self.to_minute(dt),
+                round(open_ * scale),
+                round(high * scale),
+                round(low * scale),
+                round(close * scale),
+                volume,
+            ))
+
+        with self.lock():
+            if not os.path.exists(self.meta_file):
+                # фиксируем масштаб, с которым записаны цены
+                self.set_digits(self.get_digits())
+
+            for month, month_rows in by_month.items():
+                new_data = np.array(month_rows, dtype=self.DTYPE)
+                # файл читается заново: кэш по mtime может не заметить запись другого процесса в ту же секунду
+                path = self.get_month_file(month)
+                if os.path.exists(path):
+                    new_data = np.concatenate([np.load(path), new_data])
+
+                # при совпадении времени остается первая (старая) запись
+                _, unique_index = np.unique(new_data['time'], return_index=True)
+                self.save_month(month, new_data[unique_index])
+
+    def save_month(self, month: str, data: np.ndarray):
+        """Запись через временный файл, чтобы читающие процессы не видели недописанный файл"""
+        path = self.get_month_file(month)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, data)
+        os.replace(tmp_path, path)
+        self.loaded.pop(path, None)
+
+    def clear(self):
+        for path in list(self.loaded.keys()):
+            if path.startswith(self.dir + '/'):
+                del self.loaded[path]
+        shutil.rmtree(self.dir, ignore_errors=True)
+        self._digits = None
+
+    @staticmethod
+    def parse_datetime(value: str) -> datetime:
+        """Время из таблицы candles: '2024-10-24 04:00:00+00:00' или признак дня без данных '2024-10-24 00:00'"""
+        try:
+            return datetime.strptime(value, "%Y-%m-%d %H:%M:%S%z")
+        except ValueError:
+            return datetime.strptime(value, "%Y-%m-%d %H:%M")
+
+    @staticmethod
+    def get_price_digits(values, max_digits: int = 9) -> int:
+        """Минимальное число знаков после запятой, при котором все цены - целые в шагах 10^-digits"""
+        values = np.asarray(values, dtype=np.float64)
+        for digits in range(max_digits + 1):
+            scaled = values * 10 ** digits
+            if np.all(np.abs(scaled - np.round(scaled)) < 1e-6):
+                return digits
+        return max_digits
+
+    def get_migration_digits(self, rows: list[tuple], round_signs: int | None) -> int:
+        """
+        Масштаб цен для пересобираемого архива.
+        Нулевые записи-признаки дней без данных не учитываются. По выборке цен нельзя понять,
+        не придут ли позже более точные, поэтому без знаков инструмента берется DEFAULT_DIGITS.
+        Масштаб уже существующего архива не уменьшается
+        """
+        if round_signs is None:
+            digits = self.DEFAULT_DIGITS
+        else:
+            prices = [price for row in rows for price in row[1:5] if price != 0]
+            digits = max(round_signs, self.get_price_digits(prices))
+
+        if os.path.exists(self.meta_file):
+            digits = max(digits, self.get_digits())
+
+        return digits
+
+    @staticmethod
+    def get_round_signs(cursor: sqlite3.Cursor) -> int | None:
+        """Знаки после запятой из таблицы instrument базы тикера. None - инструмента в базе нет"""
+        try:
+            cursor.execute("SELECT value FROM instrument WHERE key = 'round_signs'")
+        except sqlite3.OperationalError:
+            return None
+        row = cursor.fetchone()
+        return int(row[0]) if row else None
+
+    def migrate_from_sqlite(self, db_file: str) -> int:
+        """
+        Пересобирает архив тикера из таблицы candles его базы
+        :return: количество перенесенных записей
+        """
+        conn = sqlite3.connect(db_file)
+        cursor = conn.cursor()
+        cursor.execute('SELECT date, open, high, low, close, volume FROM candles ORDER BY date')
+        rows = cursor.fetchall()
+        round_signs = self.get_round_signs(cursor)
+        conn.close()
+
+        digits = self.get_migration_digits(rows, round_signs)
+        self.clear()
+        if not rows:
+            return 0
+
+        self.set_digits(digits)
+
+        self.add_rows(rows)
+        return len(rows)
@@ -0,0 +1,116 @@
+import asyncio
+from typing import Callable
+
+from tinkoff.invest import AsyncClient, CandleInterval
+
+from app import AppConfig
+from app.cache import TickerCache
+from app.helper import RateLimiter, TradingCalendar
+
+
+class CandleBackfill:
+    """
+    Загрузка истории минутных свечей в кэш тикеров.
+    Дни всех тикеров запрашиваются параллельно через асинхронный клиент с ограничением частоты,
+    загруженные дни пишутся в базы пачками, одной транзакцией на пачку
+    """
+
+    # сколько загруженных дней тикера копить перед записью в базу
+    SAVE_BATCH_DAYS = 20
+
+    def __init__(
+            self,
+            tickers: list[str],
+            last_date: str,
+            days_num: int,
+            rate_limit: int | None = None,
+            concurrency: int | None = None,
+            client_factory: Callable | None = None,
+            on_progress: Callable[[], None] | None = None,
+    ):
+        """
+        :param tickers: тикеры
+        :param last_date: последний день периода "YYYY-MM-DD"
+        :param days_num: торговых дней в периоде
+        :param rate_limit: запросов в минуту, по умолчанию AppConfig.BACKFILL_RATE_LIMIT
+        :param concurrency: одновременных запросов, по умолчанию AppConfig.BACKFILL_CONCURRENCY
+        :param client_factory: создает асинхронный контекст клиента API (подменяется в тестах)
+        :param on_progress: вызывается после каждого обработанного дня
+        """
+        self.tickers = tickers
+        self.days_list = TradingCalendar.get_trading_days(last_date, days_num)
+        self.rate_limit = rate_limit or AppConfig.BACKFILL_RATE_LIMIT
+        self.concurrency = concurrency or AppConfig.BACKFILL_CONCURRENCY
+        self.client_factory = client_factory or (lambda: AsyncClient(AppConfig.TOKEN))
+        self.on_progress = on_progress
+
+        self.pending: dict[str, dict[str, list]] = {}
+        self.saved_cnt = 0
+        self.errors: list[tuple[str, str, Exception]] = []
+
+    def get_jobs(self) -> list[tuple[TickerCache, str]]:
+        """Пары (кэш тикера, день) для дней, которых еще нет в кэше"""
+        jobs = []
+        for ticker in self.tickers:
+            ticker_cache = TickerCache(ticker)
+            # инструмент нужен для figi и округления цен, берется до параллельной загрузки
+            ticker_cache.get_instrument()
+            jobs.extend((ticker_cache, date) for date in ticker_cache.get_missing_days(self.days_list))
+        return jobs
+
+    def run(self, jobs: list[tuple[TickerCache, str]] | None = None) -> int:
+        """
+        :return: количество сохраненных дней
+        """
+        if jobs is None:
+            jobs = self.get_jobs()
+        return asyncio.run(self.run_async(jobs))
+
+    async def run_async(self, jobs: list[tuple[TickerCache, str]]) -> int:
+        limiter = RateLimiter.per_minute(self.rate_limit, capacity=self.concurrency)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        ticker_caches = {ticker_cache.ticker: ticker_cache for ticker_cache, _ in jobs}
+
+        async with self.client_factory() as client:
+            async def fetch(ticker_cache: TickerCache, date: str):
+                async with semaphore:
+                    await limiter.acquire()
+                    try:
+                        candles = await self.fetch_day(client, ticker_cache, date)
+                    except Exception as e:
+                        self.errors.append((ticker_cache.ticker, date, e))
+                    else:
+                        self.add_day(ticker_cache, date, candles)
+
+                if self.on_progress:
+                    self.on_progress()
+
+            await asyncio.gather(*(fetch(ticker_cache, date) for ticker_cache, date in jobs))
+
+        for ticker_cache in ticker_caches.values():
+            self.save_pending(ticker_cache)
+
+        return self.saved_cnt
+
+    @staticmethod
+    async def fetch_day(client, ticker_cache: TickerCache, date: str) -> list:
+        from_time, to_time = ticker_cache.get_api_day_bounds(date)
+        response = await client.market_data.get_candles(
+            figi=ticker_cache.get_instrument().figi,
+            from_=from_time,
+            to=to_time,
+            interval=CandleInterval.CANDLE_INTERVAL_1_MIN
+        )
+        return response.candles
+
+    def add_day(self, ticker_cache: TickerCache, date: str, candles: list):
+        pending = self.pending.setdefault(ticker_cache.ticker, {})
+        pending[date] = candles
+        if len(pending) >= self.SAVE_BATCH_DAYS:
+            self.save_pending(ticker_cache)
+
+    def save_pending(self, ticker_cache: TickerCache):
+        pending = self.pending.pop(ticker_cache.ticker, None)
+        if pending:
+            ticker_cache.save_candles(pending)
+            self.saved_cnt += len(pending)
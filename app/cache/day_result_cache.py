@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from dataclasses import asdict
+
+from app import AppConfig
+from app.dto import TestBotTradeDayDto
+
+
+class DayResultCache:
+    """
+    Дисковый кэш результатов тестового дня бота (TestBotTradeDayDto).
+    Общий для всех процессов и запусков - исторические дни не меняются и повторно не считаются.
+    Ключ - тот же, что строит TestAlgorithm.get_cache_key, плюс хэш версии кода симулятора,
+    так что после любой правки алгоритма старые результаты просто перестают находиться
+    """
+
+    # код, от которого зависит результат прогона дня
+    SOURCE_DIRS = ['bot', 'app/cache', 'app/config', 'app/helper', 'app/dto']
+
+    _version: str | None = None
+    # соединение свое в каждом потоке: (pid, соединение)
+    _local = threading.local()
+
+    @classmethod
+    def get_db_file(cls) -> str:
+        return f"{AppConfig.BASE_DIR}/db/test_results.db"
+
+    @classmethod
+    def get_version(cls) -> str:
+        """Хэш исходников симулятора. Считается один раз на процесс"""
+        if cls._version is None:
+            sha = hashlib.sha1()
+            for source_dir in cls.SOURCE_DIRS:
+                for root, dirs, files in os.walk(os.path.join(AppConfig.BASE_DIR, source_dir)):
+                    dirs.sort()
+                    for file_name in sorted(files):
+                        if not file_name.endswith('.py'):
+                            continue
+                        path = os.path.join(root, file_name)
+                        sha.update(os.path.relpath(path, AppConfig.BASE_DIR).encode())
+                        with open(path, 'rb') as f:
+                            sha.update(f.read())
+            cls._version = sha.hexdigest()[:16]
+
+        return cls._version
+
+    @classmethod
+    def get_connection(cls) -> sqlite3.Connection:
+        # sqlite не дает использовать соединение из другого потока, а наследовать от родительского процесса
+        # его нельзя, поэтому привязываем к потоку и pid
+        conn_info = getattr(cls._local, 'conn_info', None)
+        if conn_info is None or conn_info[0] != os.getpid():
+            conn = sqlite3.connect(cls.get_db_file(), timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS day_results (
+                key TEXT NOT NULL,
+                version TEXT NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (key, version)
+            )
+            ''')
+            conn.commit()
+            conn_info = (os.getpid(), conn)
+            cls._local.conn_info = conn_info
+
+        return conn_info[1]
+
+    @classmethod
+    def close_connection(cls):
+        """Закрывает соединение текущего потока"""
+        conn_info = getattr(cls._local, 'conn_info', None)
+        cls._local.conn_info = None
+        if conn_info and conn_info[0] == os.getpid():
+            conn_info[1].close()
+
+    @classmethod
+    def get(cls, key: str) -> TestBotTradeDayDto | None:
+        cursor = cls.get_connection().execute(
+            'SELECT data FROM day_results WHERE key = ? AND version = ?',
+            (key, cls.get_version())
+        )
+        row = cursor.fetchone()
+        if row is None:
+            return None
+
+        return TestBotTradeDayDto(**json.loads(row[0]))
+
+    @classmethod
+    def set(cls, key: str, value: TestBotTradeDayDto):
+        conn = cls.get_connection()
+        conn.execute(
+            'INSERT OR REPLACE INTO day_results (key, version, data) VALUES (?, ?, ?)',
+            (key, cls.get_version(), json.dumps(asdict(value)))
+        )
+        conn.commit()
+
+    @classmethod
+    def clear_old_versions(cls) -> int:
+        """Удаляет результаты прошлых версий кода. Возвращает количество удаленных записей"""
+        conn = cls.get_connection()
+        cursor = conn.execute('DELETE FROM day_results WHERE version != ?', (cls.get_version(),))
+        conn.commit()
+        return cursor.rowcount
@@ -0,0 +1,121 @@
+import json
+import os
+import time
+
+from tinkoff.invest import Client, Share
+
+from app import AppConfig
+from app.cache import InstrumentDTO
+
+
+class InstrumentCatalog:
+    """
+    Справочник акций, общий для всех тикеров.
+    Загружается из API целиком один раз, хранится в памяти процесса и в файле db/instruments.json,
+    обновляется по истечении AppConfig.INSTRUMENT_CATALOG_TTL. Поиск по тикеру и по figi
+    """
+
+    by_ticker: dict[str, InstrumentDTO] = {}
+    by_figi: dict[str, InstrumentDTO] = {}
+    updated_at: float = 0.
+
+    @staticmethod
+    def get_file() -> str:
+        return f"{AppConfig.BASE_DIR}/db/instruments.json"
+
+    @classmethod
+    def get_by_ticker(cls, ticker: str) -> InstrumentDTO | None:
+        cls.load()
+        return cls.by_ticker.get(ticker)
+
+    @classmethod
+    def get_by_figi(cls, figi: str) -> InstrumentDTO | None:
+        cls.load()
+        return cls.by_figi.get(figi)
+
+    @classmethod
+    def is_fresh(cls, updated_at: float) -> bool:
+        return time.time() - updated_at < AppConfig.INSTRUMENT_CATALOG_TTL * 3600
+
+    @classmethod
+    def load(cls, force=False):
+        """Справочник из памяти, если устарел - из файла, если устарел и он - из API"""
+        if not force and cls.is_fresh(cls.updated_at):
+            return
+
+        if not force and cls.load_file():
+            return
+
+        cls.fetch()
+
+    @classmethod
+    def load_file(cls) -> bool:
+        """
+        :return: False - файла нет, он устарел или записан для другого набора полей InstrumentDTO
+        """
+        try:
+            with open(cls.get_file()) as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return False
+
+        fields = set(vars(InstrumentDTO()).keys())
+        if not cls.is_fresh(data['updated_at']) or any(set(row.keys()) != fields for row in data['instruments']):
+            return False
+
+        cls.set_instruments([InstrumentDTO(**row) for row in data['instruments']], data['updated_at'])
+        return True
+
+    @classmethod
+    def fetch(cls):
+        with Client(AppConfig.TOKEN) as client:
+            shares = client.instruments.shares().instruments
+
+        instruments = [cls.share_to_dto(share) for share in shares]
+        updated_at = time.time()
+        cls.save_file(instruments, updated_at)
+        cls.set_instruments(instruments, updated_at)
+
+    @classmethod
+    def save_file(cls, instruments: list[InstrumentDTO], updated_at: float):
+        """Запись через временный файл, чтобы другие процессы не прочитали недописанный"""
+        path = cls.get_file()
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'updated_at': updated_at, 'instruments': [vars(dto) for dto in instruments]}, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def set_instruments(cls, instruments: list[InstrumentDTO], updated_at: float):
+        cls.by_ticker = {dto.ticker: dto for dto in instruments}
+        cls.by_figi = {dto.figi: dto for dto in instruments}
+        cls.updated_at = updated_at
+
+    @classmethod
+    def clear(cls):
+        cls.set_instruments([], 0.)
+
+    @staticmethod
+    def share_to_dto(share: Share) -> InstrumentDTO:
+        min_increment = share.min_price_increment.units + share.min_price_increment.nano * 1e-9
+
+        # это для того, чтобы превратить float 2e-05 в 0.00005 и подобные тоже
+        min_increment_str = "{:.10f}".format(min_increment).rstrip('0').rstrip('.')
+
+        decimal_point_index = min_increment_str.find('.')
+        if decimal_point_index == -1:
+            round_signs = 0
+        else:
+            round_signs = len(min_increment_str) - decimal_point_index - 1
+        min_increment = round(min_increment, round_signs)
+
+        return InstrumentDTO(
+            ticker=share.ticker,
+            figi=share.figi,
+            name=share.name,
+            currency=share.currency,
+            round_signs=round_signs,
+            min_increment=min_increment,
+            lot=share.lot,
+            short_enabled_flag=share.short_enabled_flag,
+        )
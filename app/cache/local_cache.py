@@ -1,26 +1,140 @@
-global_cache = {}
+from collections import OrderedDict
+
+# namespace -> OrderedDict(key -> value). порядок - от давно использованных к недавним
+global_cache: dict[str, OrderedDict] = {}
+# namespace -> {'hits': .., 'misses': .., 'evictions': ..}
+global_stats: dict[str, dict[str, int]] = {}
+global_counters: dict[str, int] = {}
+# namespace -> суммарный nbytes значений (у значений без nbytes считается 0)
+global_nbytes: dict[str, int] = {}
 
 
 class LocalCache:
+    """
+    Кэш в памяти процесса. Ключи делятся на пространства по префиксу,
+    в каждом хранится не больше заданного числа значений (и байт, если задан лимит по объему),
+    лишние вытесняются по давности использования (LRU)
+    """
+
+    DEFAULT_NAMESPACE = 'default'
+
+    # префиксы проверяются по порядку, более длинные раньше
+    NAMESPACES = ['candle_day_', 'candle_arr_', 'candle_', 'b_']
+
+    # лимиты по количеству значений. None - без ограничений
+    LIMITS: dict[str, int | None] = {
+        # GetCandlesResponse за день, самые тяжелые - около мегабайта
+        'candle_': 60,
+        # массивы минутных свечей дня, ограничены по объему (см. BYTE_LIMITS)
+        'candle_arr_': None,
+        'candle_day_': 50000,
+        'b_': 100000,
+        DEFAULT_NAMESPACE: 10000,
+    }
+
+    # лимиты по объему значений (атрибут nbytes), байт. Память ограничивают в каждом процессе пула отдельно
+    BYTE_LIMITS: dict[str, int | None] = {
+        # MinuteCandlesDay с таблицами для агрегированных свечей ~330Кб: около 400 дней
+        'candle_arr_': 128 * 1024 * 1024,
+    }
+
+    @classmethod
+    def get_namespace(cls, key) -> str:
+        key = str(key)
+        for prefix in cls.NAMESPACES:
+            if key.startswith(prefix):
+                return prefix
+        return cls.DEFAULT_NAMESPACE
+
+    @classmethod
+    def get(cls, key, default=None):
+        namespace = cls.get_namespace(key)
+        storage = global_cache.get(namespace)
+
+        if storage is None or key not in storage:
+            cls._inc_stat(namespace, 'misses')
+            return default
+
+        storage.move_to_end(key)
+        cls._inc_stat(namespace, 'hits')
+        return storage[key]
+
+    @classmethod
+    def set(cls, key, value):
+        namespace = cls.get_namespace(key)
+        storage = global_cache.setdefault(namespace, OrderedDict())
+        if key in storage:
+            global_nbytes[namespace] -= cls.get_value_nbytes(storage[key])
+        storage[key] = value
+        storage.move_to_end(key)
+        global_nbytes[namespace] = global_nbytes.get(namespace, 0) + cls.get_value_nbytes(value)
+
+        cls.evict(namespace)
+
+    @classmethod
+    def set_limit(cls, namespace: str, limit: int | None):
+        """Меняет лимит пространства. Лишние значения вытесняются сразу"""
+        cls.LIMITS[namespace] = limit
+        cls.evict(namespace)
+
+    @classmethod
+    def set_byte_limit(cls, namespace: str, limit: int | None):
+        """Меняет лимит пространства по объему. Лишние значения вытесняются сразу"""
+        cls.BYTE_LIMITS[namespace] = limit
+        cls.evict(namespace)
+
+    @classmethod
+    def evict(cls, namespace: str):
+        """
+        Вытесняет давно использованные значения сверх лимитов.
+        Последнее значение остается, даже если оно одно больше лимита по объему
+        """
+        storage = global_cache.get(namespace)
+        if not storage:
+            return
+
+        limit = cls.LIMITS.get(namespace)
+        byte_limit = cls.BYTE_LIMITS.get(namespace)
+        while ((limit is not None and len(storage) > limit)
+               or (byte_limit is not None and global_nbytes[namespace] > byte_limit and len(storage) > 1)):
+            _, value = storage.popitem(last=False)
+            global_nbytes[namespace] -= cls.get_value_nbytes(value)
+            cls._inc_stat(namespace, 'evictions')
+
+    @staticmethod
+    def get_value_nbytes(value) -> int:
+        return getattr(value, 'nbytes', 0)
+
+    @staticmethod
+    def get_nbytes(namespace: str) -> int:
+        """Суммарный объем значений пространства, байт"""
+        return global_nbytes.get(namespace, 0)
+
     @staticmethod
-    def get(key, default=None):
-        global global_cache
-        return global_cache.get(key, default)
+    def _inc_stat(namespace: str, name: str):
+        stats = global_stats.setdefault(namespace, {'hits': 0, 'misses': 0, 'evictions': 0})
+        stats[name] += 1
 
     @staticmethod
-    def set(key, value):
-        global global_cache
-        global_cache[key] = value
+    def get_stats() -> dict[str, dict[str, int]]:
+        """Статистика по пространствам: hits, misses, evictions и текущий размер size"""
+        out = {}
+        for namespace in set(global_stats.keys()) | set(global_cache.keys()):
+            stats = global_stats.get(namespace, {'hits': 0, 'misses': 0, 'evictions': 0})
+            out[namespace] = {**stats, 'size': len(global_cache.get(namespace, {}))}
+        return out
 
     @classmethod
     def inc_counter(cls, key):
-        cls.set(key, cls.get_counter(key) + 1)
+        global_counters[key] = cls.get_counter(key) + 1
 
     @classmethod
     def get_counter(cls, key):
-        return cls.get(key, 0)
+        return global_counters.get(key, 0)
 
     @staticmethod
     def clear():
-        global global_cache
-        global_cache = {}
+        global_cache.clear()
+        global_stats.clear()
+        global_counters.clear()
+        global_nbytes.clear()
@@ -1,25 +1,62 @@
 import math
+import os
 import sqlite3
+import threading
 from datetime import datetime, timedelta, timezone
 
+import numpy as np
 from tinkoff.invest import GetCandlesResponse, HistoricCandle, Client, CandleInterval
 
 from app import AppConfig
 from app.helper import TimeHelper, f2q, q2f
-from app.cache import InstrumentDTO, LocalCache
+from app.cache import InstrumentDTO, LocalCache, CandleArchive, InstrumentCatalog
 
 
 class TickerCache:
+    # соединения с базами тикеров, свои в каждом потоке: файл базы -> (pid, соединение)
+    _local = threading.local()
+
     def __init__(self, ticker):
         self.token = AppConfig.TOKEN
         self.ticker = ticker
         self.db_file = f"{AppConfig.BASE_DIR}/db/c_{ticker}.db"
-        self.create_database()
+        self.get_connection()
+        self.archive = CandleArchive(ticker)
         self.instrument: InstrumentDTO | None = None
         self.cache = {}
 
-    def create_database(self):
-        conn = sqlite3.connect(self.db_file)
+    @classmethod
+    def get_thread_connections(cls) -> dict[str, tuple[int, sqlite3.Connection]]:
+        if not hasattr(cls._local, 'connections'):
+            cls._local.connections = {}
+        return cls._local.connections
+
+    def get_connection(self) -> sqlite3.Connection:
+        """
+        Соединение с базой тикера, одно на поток.
+        sqlite не дает использовать соединение из другого потока (тесты в ноутбуках идут в ThreadPoolExecutor),
+        а от родительского процесса его нельзя наследовать, поэтому привязываем еще и к pid
+        """
+        connections = self.get_thread_connections()
+        conn_info = connections.get(self.db_file)
+        if conn_info is None or conn_info[0] != os.getpid():
+            conn = sqlite3.connect(self.db_file, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self.create_database(conn)
+            conn_info = (os.getpid(), conn)
+            connections[self.db_file] = conn_info
+
+        return conn_info[1]
+
+    def close_connection(self):
+        """Закрывает соединение текущего потока"""
+        conn_info = self.get_thread_connections().pop(self.db_file, None)
+        if conn_info and conn_info[0] == os.getpid():
+            conn_info[1].close()
+
+    @staticmethod
+    def create_database(conn: sqlite3.Connection):
         cursor = conn.cursor()
 
         cursor.execute('''
@@ -29,11 +66,27 @@ class TickerCache:
             high REAL,
             low REAL,
             close REAL,
-            volume INTEGER
+            volume INTEGER,
+            day DATE
         )
         ''')
         conn.commit()
 
+        # день свечи отдельной колонкой с индексом, чтобы выборка по дням не разбирала каждую строку
+        columns = [row[1] for row in cursor.execute('PRAGMA table_info(candles)')]
+        if 'day' not in columns:
+            cursor.execute('ALTER TABLE candles ADD COLUMN day DATE')
+        cursor.execute('UPDATE candles SET day = date(date) WHERE day IS NULL')
+        cursor.execute('CREATE INDEX IF NOT EXISTS candles_day_index ON candles (day)')
+        # заполняет день для любых вставок, в том числе из сторонних скриптов
+        cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS candles_set_day AFTER INSERT ON candles WHEN NEW.day IS NULL
+        BEGIN
+            UPDATE candles SET day = date(NEW.date) WHERE rowid = NEW.rowid;
+        END
+        ''')
+        conn.commit()
+
         cursor.execute('''
         CREATE TABLE IF NOT EXISTS candles_day (
             date DATE PRIMARY KEY,
@@ -54,21 +107,18 @@ class TickerCache:
         ''')
         conn.commit()
 
-        conn.close()
-
     def clear_candles_table(self):
-        conn = sqlite3.connect(self.db_file)
+        conn = self.get_connection()
         cursor = conn.cursor()
         cursor.execute('DELETE FROM candles WHERE 1')
         conn.commit()
-        conn.close()
+        self.archive.clear()
 
     def clear_instrument_table(self):
-        conn = sqlite3.connect(self.db_file)
+        conn = self.get_connection()
         cursor = conn.cursor()
         cursor.execute('DELETE FROM instrument WHERE 1')
         conn.commit()
-        conn.close()
 
     @staticmethod
     def get_days_list(end_date, days_num):
@@ -101,13 +151,17 @@ class TickerCache:
         if cache_val is not None:
             return cache_val
 
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM candles WHERE date(date) = ?', (date,))
-        rows = cursor.fetchall()
-        conn.close()
+        columns = self.archive.get_day(date)
+        if columns is not None:
+            val = GetCandlesResponse(candles=self.columns_to_candles(date, columns))
+            LocalCache.set(cache_key, val)
+            return val
+
+        rows = self.get_candles_rows(date)
 
         if rows:
+            self.archive.add_rows(rows)
+
             if len(rows) == 1:
                 val = GetCandlesResponse(candles=[])
                 LocalCache.set(cache_key, val)
@@ -136,10 +190,96 @@ class TickerCache:
             # Запрос к API, если нет данных в базе
             return self.fetch_candles_from_api(date, True)
 
+    def get_candles_rows(self, date) -> list[tuple]:
+        """Строки таблицы candles за день"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT date, open, high, low, close, volume FROM candles WHERE day = ?', (date,))
+        rows = cursor.fetchall()
+        return rows
+
+    def load_candles_range(self, from_date: str, to_date: str):
+        """
+        Переносит в архив одним запросом к базе все прошедшие дни периода, которых там еще нет.
+        Сегодняшний день не переносится - он всегда берется из API
+        """
+        missing_days = {date for date in self.get_days_list(to_date, self.get_days_num(from_date, to_date))
+                        if not TimeHelper.is_today(date) and not self.archive.has_day(date)}
+        if not missing_days:
+            return
+
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            'SELECT date, open, high, low, close, volume, day FROM candles WHERE day BETWEEN ? AND ?',
+            (min(missing_days), max(missing_days)))
+        rows = [row[:6] for row in cursor.fetchall() if row[6] in missing_days]
+
+        if rows:
+            self.archive.add_rows(rows)
+
+    def get_candles_range(self, from_date: str, to_date: str) -> dict[str, dict]:
+        """
+        Минутные свечи прошедших дней периода колонками (как get_candles_columns).
+        Дни, которых нет в архиве, переносятся туда из базы одним запросом
+        :return: дата -> колонки. Дней, которых нет ни в архиве, ни в базе, и сегодняшнего дня в ответе нет
+        """
+        self.load_candles_range(from_date, to_date)
+
+        out = {}
+        for date in self.get_days_list(to_date, self.get_days_num(from_date, to_date)):
+            columns = None if TimeHelper.is_today(date) else self.archive.get_day(date)
+            if columns is not None:
+                out[date] = columns
+        return out
+
+    @staticmethod
+    def get_days_num(from_date: str, to_date: str) -> int:
+        return (datetime.strptime(to_date, "%Y-%m-%d") - datetime.strptime(from_date, "%Y-%m-%d")).days + 1
+
+    def get_candles_columns(self, date) -> dict | None:
+        """
+        Минутные свечи прошедшего дня колонками из архива (см. CandleArchive.get_day).
+        Если дня в архиве нет - он переносится туда из базы.
+        :return: None - данных нет ни в архиве, ни в базе
+        """
+        columns = self.archive.get_day(date)
+        if columns is not None:
+            return columns
+
+        rows = self.get_candles_rows(date)
+        if not rows:
+            return None
+
+        self.archive.add_rows(rows)
+        return self.archive.get_day(date)
+
+    @staticmethod
+    def columns_to_candles(date, columns: dict) -> list[HistoricCandle]:
+        day_start = datetime.strptime(date, "%Y-%m-%d")
+        return [
+            HistoricCandle(
+                time=day_start + timedelta(minutes=minute),
+                open=f2q(open_),
+                high=f2q(high),
+                low=f2q(low),
+                close=f2q(close),
+                volume=volume,
+                is_complete=True
+            )
+            for minute, open_, high, low, close, volume in zip(
+                columns['time'].tolist(),
+                columns['open'].tolist(),
+                columns['high'].tolist(),
+                columns['low'].tolist(),
+                columns['close'].tolist(),
+                columns['volume'].tolist(),
+            )
+        ]
+
     def fetch_candles_from_api(self, date, save=True):
         with Client(self.token) as client:
-            from_time = datetime.strptime(date + " 03:55", "%Y-%m-%d %H:%M").replace(tzinfo=timezone.utc)
-            to_time = datetime.strptime(date + " 23:59", "%Y-%m-%d %H:%M").replace(tzinfo=timezone.utc)
+            from_time, to_time = self.get_api_day_bounds(date)
             candles = client.market_data.get_candles(
                 figi=self.get_instrument().figi,
                 from_=from_time,
@@ -148,36 +288,57 @@ class TickerCache:
             )
 
             if save:
-                conn = sqlite3.connect(self.db_file)
-                cursor = conn.cursor()
-
-                if candles.candles:
-                    for candle in candles.candles:
-                        cursor.execute('''
-                        INSERT OR IGNORE INTO candles (date, open, high, low, close, volume)
-                        VALUES (?, ?, ?, ?, ?, ?)
-                        ''', (
-                            candle.time,
-                            q2f(candle.open, self.instrument.round_signs),
-                            q2f(candle.high, self.instrument.round_signs),
-                            q2f(candle.low, self.instrument.round_signs),
-                            q2f(candle.close, self.instrument.round_signs),
-                            candle.volume
-                        ))
-                    conn.commit()
-
-                else:
-                    # Сохранение записи-признака отсутствия данных
-                    cursor.execute('''
-                    INSERT OR IGNORE INTO candles (date, open, high, low, close, volume)
-                    VALUES (?, 0, 0, 0, 0, 0)
-                    ''', (date + " 00:00",))
-                    conn.commit()
-
-                conn.close()
+                self.save_candles({date: candles.candles})
 
             return candles
 
+    @staticmethod
+    def get_api_day_bounds(date) -> tuple[datetime, datetime]:
+        """Период запроса минутных свечей дня к API"""
+        from_time = datetime.strptime(date + " 03:55", "%Y-%m-%d %H:%M").replace(tzinfo=timezone.utc)
+        to_time = datetime.strptime(date + " 23:59", "%Y-%m-%d %H:%M").replace(tzinfo=timezone.utc)
+        return from_time, to_time
+
+    def save_candles(self, days: dict[str, list[HistoricCandle]]):
+        """
+        Сохраняет свечи нескольких дней одной транзакцией.
+        Для дня без свечей пишется запись-признак отсутствия данных
+        """
+        round_signs = self.get_instrument().round_signs
+        rows = []
+        for date, candles in days.items():
+            if candles:
+                rows.extend((
+                    candle.time,
+                    q2f(candle.open, round_signs),
+                    q2f(candle.high, round_signs),
+                    q2f(candle.low, round_signs),
+                    q2f(candle.close, round_signs),
+                    candle.volume
+                ) for candle in candles)
+            else:
+                # Сохранение записи-признака отсутствия данных
+                rows.append((date + " 00:00", 0, 0, 0, 0, 0))
+
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.executemany('''
+        INSERT OR IGNORE INTO candles (date, open, high, low, close, volume)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ''', rows)
+        conn.commit()
+
+    def get_missing_days(self, days: list[str]) -> list[str]:
+        """Прошедшие дни из списка, которых нет ни в архиве, ни в базе"""
+        days = [date for date in days if not TimeHelper.is_today(date) and not self.archive.has_day(date)]
+        if not days:
+            return []
+
+        cursor = self.get_connection().cursor()
+        cursor.execute('SELECT DISTINCT day FROM candles WHERE day >= ? AND day <= ?', (min(days), max(days)))
+        saved_days = {row[0] for row in cursor.fetchall()}
+        return [date for date in days if date not in saved_days]
+
     def get_day_candles(self, from_date, to_date) -> GetCandlesResponse:
         dates_needed = [from_date + timedelta(days=x) for x in range((to_date - from_date).days + 1)]
         candles = []
@@ -200,7 +361,7 @@ class TickerCache:
                 candles.append(cached_candles[cache_key])
             return GetCandlesResponse(candles=candles)
 
-        conn = sqlite3.connect(self.db_file)
+        conn = self.get_connection()
         cursor = conn.cursor()
 
         # запрашиваем из базы все, что есть по этим датам
@@ -209,6 +370,11 @@ class TickerCache:
             (from_date.strftime('%Y-%m-%d'), to_date.strftime('%Y-%m-%d')))
         data_dict = dict([(row[0], row) for row in cursor.fetchall()])
 
+        # дней, которых нет в candles_day, считаем из минутных свечей. к API только если нет и их
+        data_dict.update(self.materialize_day_candles(
+            [date_needed.strftime('%Y-%m-%d') for date_needed in dates_needed
+             if date_needed.strftime('%Y-%m-%d') not in data_dict]))
+
         for date_needed in dates_needed:
             cache_key = f"candle_day_{self.ticker}_{date_needed}"
             _date = date_needed.strftime('%Y-%m-%d')
@@ -296,14 +462,68 @@ class TickerCache:
                         ''', (date_needed.date(),))
                         conn.commit()
 
-        conn.close()
         return GetCandlesResponse(candles=candles)
 
+    def materialize_day_candles(self, dates: list[str]) -> dict[str, tuple]:
+        """
+        Дневные свечи прошедших дней из минутных свечей кэша, для всех дней разом.
+        Результат пишется в candles_day одной транзакцией, день без минутных данных - записью-признаком
+        :return: дата -> строка candles_day. Дней, которых нет среди минутных свечей, в ответе нет
+        """
+        dates = [date for date in dates if not TimeHelper.is_today(date)]
+        if not dates:
+            return {}
+
+        self.load_candles_range(min(dates), max(dates))
+
+        rows = []
+        days = {}
+        for date in dates:
+            columns = self.archive.get_day(date)
+            if columns is None:
+                continue
+            if len(columns['time']):
+                days[date] = columns
+            else:
+                rows.append((date, 0, 0, 0, 0, 0))
+
+        if days:
+            lengths = np.array([len(columns['time']) for columns in days.values()])
+            starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+            ends = starts + lengths - 1
+
+            def concat(name: str) -> np.ndarray:
+                return np.concatenate([columns[name] for columns in days.values()])
+
+            round_signs = self.get_instrument().round_signs
+            rows.extend(
+                (date, round(open_, round_signs), round(high, round_signs), round(low, round_signs),
+                 round(close, round_signs), volume)
+                for date, open_, high, low, close, volume in zip(
+                    days.keys(),
+                    concat('open')[starts].tolist(),
+                    np.maximum.reduceat(concat('high'), starts).tolist(),
+                    np.minimum.reduceat(concat('low'), starts).tolist(),
+                    concat('close')[ends].tolist(),
+                    np.add.reduceat(concat('volume'), starts).tolist(),
+                )
+            )
+
+        if rows:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            cursor.executemany(
+                'INSERT OR IGNORE INTO candles_day (date, open, high, low, close, volume) VALUES (?, ?, ?, ?, ?, ?)',
+                rows)
+            conn.commit()
+
+        return {row[0]: row for row in rows}
+
     def get_instrument(self) -> InstrumentDTO:
         if self.instrument:
             return self.instrument
 
-        conn = sqlite3.connect(self.db_file)
+        conn = self.get_connection()
         cursor = conn.cursor()
 
         # Выбираем все данные из таблицы
@@ -315,37 +535,13 @@ class TickerCache:
 
         instrument_fields = vars(InstrumentDTO())
 
-        # если нет - запрашиваем из API
+        # если нет - берем из общего справочника инструментов
         if len(data_dict) != len(instrument_fields):
             self.clear_instrument_table()
 
-            with Client(self.token) as client:
-                instruments = client.instruments.shares()
-                for instrument in instruments.instruments:
-                    if instrument.ticker == self.ticker:
-                        min_increment = instrument.min_price_increment.units + \
-                                        instrument.min_price_increment.nano * 1e-9
-
-                        # это для того, чтобы превратить float 2e-05 в 0.00005 и подобные тоже
-                        min_increment_str = "{:.10f}".format(min_increment).rstrip('0').rstrip('.')
-
-                        decimal_point_index = min_increment_str.find('.')
-                        if decimal_point_index == -1:
-                            round_signs = 0
-                        else:
-                            round_signs = len(min_increment_str) - decimal_point_index - 1
-                        min_increment = round(min_increment, round_signs)
-
-                        data_dict = {
-                            'ticker': self.ticker,
-                            'figi': instrument.figi,
-                            'name': instrument.name,
-                            'currency': instrument.currency,
-                            'round_signs': round_signs,
-                            'min_increment': min_increment,
-                            'lot': instrument.lot,
-                            'short_enabled_flag': instrument.short_enabled_flag,
-                        }
+            instrument = InstrumentCatalog.get_by_ticker(self.ticker)
+            if instrument:
+                data_dict = vars(instrument)
 
             # кладем в таблицу
             for key, val in data_dict.items():
@@ -356,9 +552,6 @@ class TickerCache:
             # Сохраняем изменения
             conn.commit()
 
-        # Закрываем соединение с базой данных
-        conn.close()
-
         if len(data_dict) == 0:
             raise Exception(f"No figi found for '{self.ticker}'")
 
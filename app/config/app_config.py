@@ -56,3 +56,51 @@ class AppConfig:
 
     MEMORY_RUN_COEFFICIENT = float(os.environ.get('MEMORY_RUN_COEFFICIENT', 0.7))
     """Модификатор объема памяти. На сколько меньше считать объем скрипта при первичном запуске"""
+
+    TEST_WORKERS = int(os.environ.get('TEST_WORKERS', 1))
+    """Количество процессов для перебора вариантов конфига и для ботов в тесте аккаунта. 1 - последовательный расчет"""
+
+    TEST_FAST_FORWARD = True if os.environ.get('TEST_FAST_FORWARD') == '1' else False
+    """Пропускать в тестах минуты, в которых бот ничего не делает. Результаты совпадают с поминутным прогоном"""
+
+    TEST_WALK_FORWARD = True if os.environ.get('TEST_WALK_FORWARD') == '1' else False
+    """Подбор конфига в тестах по скользящему окну: пересчитывается только новый день окна"""
+
+    TEST_BIG_SEARCH_RUNGS = int(os.environ.get('TEST_BIG_SEARCH_RUNGS', 1))
+    """Количество этапов отсева при большом подборе конфига. 1 - полный перебор всех вариантов"""
+
+    TEST_BIG_SEARCH_KEEP = float(os.environ.get('TEST_BIG_SEARCH_KEEP', 0.5))
+    """Доля лучших вариантов, которая переходит на следующий этап отсева"""
+
+    TEST_BIG_SEARCH_CANDIDATES = int(os.environ.get('TEST_BIG_SEARCH_CANDIDATES', 0))
+    """Максимальное количество кандидатов на первом этапе отсева. 0 - все варианты"""
+
+    BACKFILL_RATE_LIMIT = int(os.environ.get('BACKFILL_RATE_LIMIT', 250))
+    """Лимит запросов свечей в минуту при загрузке истории в кэш"""
+
+    BACKFILL_CONCURRENCY = int(os.environ.get('BACKFILL_CONCURRENCY', 8))
+    """Количество одновременных запросов свечей при загрузке истории в кэш"""
+
+    INSTRUMENT_CATALOG_TTL = float(os.environ.get('INSTRUMENT_CATALOG_TTL', 24))
+    """Через сколько часов справочник инструментов db/instruments.json загружается из API заново"""
+
+    CLIENT_HEALTH_CHECK_INTERVAL = int(os.environ.get('CLIENT_HEALTH_CHECK_INTERVAL', 300))
+    """Секунд без успешных запросов, после которых общий клиент API проверяется перед использованием"""
+
+    BOT_MARKET_DATA_STREAM = True if os.environ.get('BOT_MARKET_DATA_STREAM') == '1' else False
+    """Цена и статус торгов для ботов из стрима рыночных данных вместо запросов на каждой итерации"""
+
+    BOT_TRADES_STREAM = True if os.environ.get('BOT_TRADES_STREAM') == '1' else False
+    """Следить за исполнением заявок ботов по стриму сделок, список заявок запрашивается только после сделок"""
+
+    ORDER_STATE_REFRESH_INTERVAL = int(os.environ.get('ORDER_STATE_REFRESH_INTERVAL', 300))
+    """Максимум секунд между запросами списка активных заявок при подключенном стриме сделок"""
+
+    MARKET_DATA_GATEWAY = True if os.environ.get('MARKET_DATA_GATEWAY') == '1' else False
+    """Цена и статус торгов для ботов из общего шлюза рыночных данных хоста, starter запускает шлюз вместе с ботами"""
+
+    MARKET_DATA_GATEWAY_SOCKET = os.environ.get('MARKET_DATA_GATEWAY_SOCKET', f"{basedir}/db/market_data_gateway.sock")
+    """Unix сокет шлюза рыночных данных"""
+
+    MARKET_DATA_GATEWAY_INTERVAL = float(os.environ.get('MARKET_DATA_GATEWAY_INTERVAL', 5))
+    """Секунд между пакетными запросами цен и статусов в шлюзе рыночных данных"""
@@ -1,6 +1,8 @@
 from tinkoff.invest import Quotation, MoneyValue
 
 from .time_helper import TimeHelper
+from .trading_calendar import TradingCalendar
+from .rate_limiter import RateLimiter
 
 
 def q2f(quotation: Quotation | MoneyValue, digits=2):
@@ -72,6 +72,5 @@ class DayExclusions:
             '2025-12-31',
         ]
 
-    # todo #337 убрать создание объекта каждый раз
     def is_exclusion(self, date: datetime) -> bool:
         return date.strftime('%Y-%m-%d') in self.exclusion_days
@@ -0,0 +1,52 @@
+import asyncio
+import time
+
+
+class RateLimiter:
+    """
+    Ограничитель частоты запросов (token bucket) для asyncio.
+    Токены копятся со скоростью rate в секунду до capacity, каждый запрос забирает один токен
+    """
+
+    def __init__(self, rate: float, capacity: int = 1, timer=time.monotonic):
+        """
+        :param rate: токенов в секунду
+        :param capacity: размер корзины - сколько запросов можно сделать подряд без ожидания
+        :param timer: источник времени в секундах (подменяется в тестах)
+        """
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.timer = timer
+        self.tokens = float(self.capacity)
+        self.updated_at = timer()
+        self.lock = asyncio.Lock()
+
+    @classmethod
+    def per_minute(cls, requests_per_minute: int, capacity: int = 1, timer=time.monotonic) -> 'RateLimiter':
+        return cls(requests_per_minute / 60, capacity, timer)
+
+    def refill(self):
+        now = self.timer()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def try_acquire(self) -> float:
+        """
+        Забирает токен, если он есть
+        :return: 0 - токен получен, иначе сколько секунд ждать до появления токена
+        """
+        self.refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.
+
+        return (1 - self.tokens) / self.rate
+
+    async def acquire(self):
+        """Ждет токен. Ожидающие получают токены по очереди"""
+        async with self.lock:
+            while True:
+                wait = self.try_acquire()
+                if not wait:
+                    return
+                await asyncio.sleep(wait)
@@ -1,6 +1,6 @@
 from datetime import datetime, timezone, time, timedelta
 
-from .day_exclusions import DayExclusions
+from .trading_calendar import TradingCalendar
 
 
 class TimeHelper:
@@ -9,7 +9,7 @@ class TimeHelper:
     START_TIME = '04:00'
     END_TIME = '20:49'
 
-    # расписание есть в ClientTestEnvHelper
+    # расписание есть в TradingCalendar
     MORNING_BREAK_START = '06:40'
     MORNING_BREAK_END = '07:00'
     EVENING_BREAK_START = '15:40'
@@ -56,23 +56,23 @@ class TimeHelper:
     @classmethod
     def is_trading_day(cls, dt: datetime | str | None = None) -> bool:
         """True если торги доступны в этот день"""
-        return True
-
-    @classmethod
-    def is_weekend(cls, dt: datetime | str | None = None) -> bool:
         if dt is None:
             dt = cls.now()
 
         if isinstance(dt, str):
             dt = cls.to_datetime(dt)
 
-        ex = DayExclusions()
-        is_exclusion = ex.is_exclusion(dt)
-        is_working_day = dt.weekday() < 5
+        return TradingCalendar.is_trading_day(dt)
 
-        return not (is_working_day ^ is_exclusion)  # xor
+    @classmethod
+    def is_weekend(cls, dt: datetime | str | None = None) -> bool:
+        if dt is None:
+            dt = cls.now()
 
+        if isinstance(dt, str):
+            dt = cls.to_datetime(dt)
 
+        return TradingCalendar.is_weekend(dt)
 
     @staticmethod
     def to_time(str_time) -> time:
@@ -0,0 +1,128 @@
+from datetime import date, datetime, timedelta
+
+from tinkoff.invest import SecurityTradingStatus
+
+from .day_exclusions import DayExclusions
+
+
+class TradingCalendar:
+    """
+    Предрасчитанный торговый календарь.
+    По дням - массив флагов (выходной / торговый), по минутам - таблица статусов торгов на 1440 минут
+    для рабочего и выходного дня. Все проверки идут по индексу, без разбора строк
+    """
+
+    FLAG_WEEKEND = 1
+    FLAG_TRADING = 2
+
+    MINUTES_IN_DAY = 1440
+
+    # Временные интервалы для рабочего дня (всё в GMT)
+    WORK_DAY_SCHEDULE = {
+        '00:00': SecurityTradingStatus.SECURITY_TRADING_STATUS_NOT_AVAILABLE_FOR_TRADING,
+        '04:00': SecurityTradingStatus.SECURITY_TRADING_STATUS_DEALER_NORMAL_TRADING,
+        '06:40': SecurityTradingStatus.SECURITY_TRADING_STATUS_BREAK_IN_TRADING,
+        '06:50': SecurityTradingStatus.SECURITY_TRADING_STATUS_OPENING_AUCTION_PERIOD,
+        '07:00': SecurityTradingStatus.SECURITY_TRADING_STATUS_NORMAL_TRADING,
+        '15:40': SecurityTradingStatus.SECURITY_TRADING_STATUS_CLOSING_AUCTION,
+        '15:45': SecurityTradingStatus.SECURITY_TRADING_STATUS_TRADING_AT_CLOSING_AUCTION_PRICE,
+        '15:50': SecurityTradingStatus.SECURITY_TRADING_STATUS_NOT_AVAILABLE_FOR_TRADING,
+        '16:00': SecurityTradingStatus.SECURITY_TRADING_STATUS_OPENING_AUCTION_PERIOD,
+        '16:04': SecurityTradingStatus.SECURITY_TRADING_STATUS_NOT_AVAILABLE_FOR_TRADING,
+        '16:05': SecurityTradingStatus.SECURITY_TRADING_STATUS_NORMAL_TRADING,
+        '20:50': SecurityTradingStatus.SECURITY_TRADING_STATUS_NOT_AVAILABLE_FOR_TRADING,
+    }
+
+    # Временные интервалы для выходного дня
+    WEEKEND_DAY_SCHEDULE = {
+        '00:00': SecurityTradingStatus.SECURITY_TRADING_STATUS_NOT_AVAILABLE_FOR_TRADING,
+        '04:00': SecurityTradingStatus.SECURITY_TRADING_STATUS_DEALER_NORMAL_TRADING,
+        '20:50': SecurityTradingStatus.SECURITY_TRADING_STATUS_NOT_AVAILABLE_FOR_TRADING,
+    }
+
+    # заполняются в build()
+    first_ordinal: int = 0
+    day_flags: bytearray = bytearray()
+    work_day_statuses: list[int] = []
+    weekend_day_statuses: list[int] = []
+
+    @classmethod
+    def build(cls):
+        """Расчет массивов. Вызывается один раз при импорте модуля"""
+        exclusions = {datetime.strptime(day, '%Y-%m-%d').date() for day in DayExclusions().exclusion_days}
+
+        # покрываем целиком годы, в которых заданы исключения. за их пределами исключений нет
+        first_day = date(min(day.year for day in exclusions), 1, 1)
+        last_day = date(max(day.year for day in exclusions), 12, 31)
+
+        cls.first_ordinal = first_day.toordinal()
+        cls.day_flags = bytearray(last_day.toordinal() - cls.first_ordinal + 1)
+
+        day = first_day
+        for i in range(len(cls.day_flags)):
+            flags = cls.FLAG_TRADING
+            if (day.weekday() < 5) == (day in exclusions):
+                flags |= cls.FLAG_WEEKEND
+            cls.day_flags[i] = flags
+            day += timedelta(days=1)
+
+        cls.work_day_statuses = cls.build_minute_table(cls.WORK_DAY_SCHEDULE)
+        cls.weekend_day_statuses = cls.build_minute_table(cls.WEEKEND_DAY_SCHEDULE)
+
+    @classmethod
+    def build_minute_table(cls, schedule: dict[str, int]) -> list[int]:
+        """Статус торгов для каждой минуты суток по расписанию вида {'HH:MM': статус}"""
+        table = [SecurityTradingStatus.SECURITY_TRADING_STATUS_NOT_AVAILABLE_FOR_TRADING] * cls.MINUTES_IN_DAY
+        for key in sorted(schedule.keys()):
+            hours, minutes = map(int, key.split(':'))
+            start = hours * 60 + minutes
+            table[start:] = [schedule[key]] * (cls.MINUTES_IN_DAY - start)
+        return table
+
+    @classmethod
+    def get_day_flags(cls, day: date) -> int:
+        index = day.toordinal() - cls.first_ordinal
+        if 0 <= index < len(cls.day_flags):
+            return cls.day_flags[index]
+
+        # вне расчитанного периода исключений нет
+        return cls.FLAG_TRADING | (cls.FLAG_WEEKEND if day.weekday() >= 5 else 0)
+
+    @classmethod
+    def is_weekend(cls, day: date) -> bool:
+        return bool(cls.get_day_flags(day) & cls.FLAG_WEEKEND)
+
+    @classmethod
+    def is_trading_day(cls, day: date) -> bool:
+        return bool(cls.get_day_flags(day) & cls.FLAG_TRADING)
+
+    @classmethod
+    def get_status(cls, dt: datetime) -> int:
+        """Статус торгов на момент dt (часы и минуты берутся как есть, ожидается UTC)"""
+        return cls.get_day_statuses(dt)[dt.hour * 60 + dt.minute]
+
+    @classmethod
+    def get_day_statuses(cls, day: date) -> list[int]:
+        """Статусы торгов по минутам суток для дня"""
+        return cls.weekend_day_statuses if cls.is_weekend(day) else cls.work_day_statuses
+
+    @classmethod
+    def get_trading_days(cls, end_date: str, days_num: int) -> list[str]:
+        """
+        Торговые дни в количестве days_num, заканчивая end_date (она входит всегда)
+        :param end_date: дата в формате "YYYY-MM-DD"
+        :return: список дат по возрастанию
+        """
+        current_date = datetime.strptime(end_date, "%Y-%m-%d").date()
+        out = [end_date]
+
+        while len(out) < days_num:
+            current_date -= timedelta(days=1)
+            if cls.is_trading_day(current_date):
+                out.append(current_date.strftime("%Y-%m-%d"))
+
+        out.reverse()
+        return out
+
+
+TradingCalendar.build()
@@ -1 +1,2 @@
+from .client_pool import ClientPool
 from .tinkoff_api import TinkoffApi
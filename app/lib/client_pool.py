@@ -0,0 +1,101 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from grpc import StatusCode
+from tinkoff.invest import Client, RequestError
+from tinkoff.invest.services import Services
+
+from app.config import AppConfig
+
+
+class ClientPool:
+    """
+    Долгоживущие клиенты API, по одному на токен в процессе: канал gRPC и TLS-соединение
+    не пересоздаются на каждый запрос.
+    Клиент переподключается после ошибки соединения, а если давно не было успешных запросов -
+    перед выдачей проверяется легким запросом
+    """
+
+    # коды ошибок, после которых канал пересоздается
+    RECONNECT_CODES = {StatusCode.UNAVAILABLE, StatusCode.INTERNAL, StatusCode.UNKNOWN}
+
+    # токен -> (pid, Client, Services, время последнего успешного запроса)
+    clients: dict[str, tuple[int, Client, Services, float]] = {}
+    lock = threading.Lock()
+
+    @classmethod
+    @contextmanager
+    def client(cls, token: str | None = None):
+        """
+        Замена `with Client(token) as client`: отдает общий клиент.
+        Ошибки пробрасываются как есть, при ошибке соединения клиент сбрасывается
+        """
+        token = token or AppConfig.TOKEN
+        services = cls.get(token)
+        try:
+            yield services
+        except RequestError as e:
+            if e.code in cls.RECONNECT_CODES:
+                cls.reset(token)
+            raise
+        except (ValueError, ConnectionError):
+            # запрос в закрытый канал
+            cls.reset(token)
+            raise
+        else:
+            cls.touch(token)
+
+    @classmethod
+    def get(cls, token: str) -> Services:
+        with cls.lock:
+            info = cls.clients.get(token)
+            if info is not None and info[0] != os.getpid():
+                # канал нельзя наследовать от родительского процесса
+                info = None
+
+            if info is not None and time.monotonic() - info[3] >= AppConfig.CLIENT_HEALTH_CHECK_INTERVAL:
+                if cls.is_healthy(info[2]):
+                    info = (*info[:3], time.monotonic())
+                    cls.clients[token] = info
+                else:
+                    cls.close(info)
+                    info = None
+
+            if info is None:
+                client = Client(token)
+                info = (os.getpid(), client, client.__enter__(), time.monotonic())
+                cls.clients[token] = info
+
+            return info[2]
+
+    @staticmethod
+    def is_healthy(services: Services) -> bool:
+        """Проверка канала легким запросом"""
+        try:
+            services.users.get_info()
+        except Exception:
+            return False
+        return True
+
+    @classmethod
+    def touch(cls, token: str):
+        with cls.lock:
+            info = cls.clients.get(token)
+            if info is not None:
+                cls.clients[token] = (*info[:3], time.monotonic())
+
+    @classmethod
+    def reset(cls, token: str):
+        with cls.lock:
+            info = cls.clients.pop(token, None)
+            if info is not None and info[0] == os.getpid():
+                cls.close(info)
+
+    @staticmethod
+    def close(info: tuple[int, Client, Services, float]):
+        try:
+            info[1].__exit__(None, None, None)
+        except Exception:
+            pass
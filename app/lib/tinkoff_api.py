@@ -2,11 +2,13 @@ from datetime import datetime, timezone, timedelta
 from typing import List
 
 import pytz
-from tinkoff.invest import Client, InvestError, InstrumentIdType, OrderType, OrderDirection, CandleInterval
+from tinkoff.invest import InvestError, InstrumentIdType, OrderType, OrderDirection, CandleInterval
 
+from app.cache import InstrumentCatalog
 from app.dto import BoughtInstrumentDto
 from app.helper import q2f
 from app.config import AppConfig
+from app.lib.client_pool import ClientPool
 
 
 class TinkoffApi:
@@ -18,8 +20,8 @@ class TinkoffApi:
         :return: {figi: float, ...}
         """
         out = {}
-        with Client(AppConfig.TOKEN) as client:
-            try:
+        try:
+            with ClientPool.client(AppConfig.TOKEN) as client:
                 # Получаем последние цены для каждого инструмента в списке FIGI
                 response = client.market_data.get_last_prices(figi=figi_list)
 
@@ -27,8 +29,8 @@ class TinkoffApi:
                     figi = last_price.figi
                     price = q2f(last_price.price)
                     out[figi] = price
-            finally:
-                return out
+        finally:
+            return out
 
     @staticmethod
     def get_current_price_from_last_candle(figi: str) -> float | None:
@@ -43,24 +45,24 @@ class TinkoffApi:
         # Запрашиваем свечи за последние 5 минут, чтобы гарантировать наличие свежих данных
         start_time = now - timedelta(minutes=5)
 
-        with Client(AppConfig.TOKEN) as client:
-            try:
+        try:
+            with ClientPool.client(AppConfig.TOKEN) as client:
                 candles_response = client.market_data.get_candles(
                     figi=figi,
                     from_=start_time,
                     to=now,
                     interval=CandleInterval.CANDLE_INTERVAL_1_MIN
                 )
-            except InvestError as e:
-                print(f"Ошибка при получении последних свечей: {e}")
-                return None
 
-            # Проверяем, что свечи получены
-            if candles_response.candles:
-                last_candle = candles_response.candles[-1]
-                return q2f(last_candle.close)
-            else:
-                return None
+                # Проверяем, что свечи получены
+                if candles_response.candles:
+                    last_candle = candles_response.candles[-1]
+                    return q2f(last_candle.close)
+                else:
+                    return None
+        except InvestError as e:
+            print(f"Ошибка при получении последних свечей: {e}")
+            return None
 
     @staticmethod
     def get_last_price(figi: str) -> float | None:
@@ -115,30 +117,35 @@ class TinkoffApi:
         Получает баланс аккаунта пользователя в рублях
         :return: Баланс счета в рублях
         """
-        with Client(AppConfig.TOKEN) as client:
-            try:
+        try:
+            with ClientPool.client(AppConfig.TOKEN) as client:
                 response = client.operations.get_portfolio(account_id=str(account_id))
                 return q2f(response.total_amount_portfolio)
-            except InvestError as e:
-                print(f"Ошибка при получении баланса: {e}")
-                return 0
+        except InvestError as e:
+            print(f"Ошибка при получении баланса: {e}")
+            return 0
 
     @staticmethod
     def get_ticker_by_figi(figi):
-        with Client(AppConfig.TOKEN) as client:
-            try:
+        instrument = InstrumentCatalog.get_by_figi(figi)
+        if instrument:
+            return instrument.ticker
+
+        # не акции в справочнике нет
+        try:
+            with ClientPool.client(AppConfig.TOKEN) as client:
                 response = client.instruments.get_instrument_by(
                     id_type=InstrumentIdType.INSTRUMENT_ID_TYPE_FIGI, id=figi)
                 return response.instrument.ticker
-            except InvestError as e:
-                print(f"An error occurred for FIGI {figi}: {e}")
+        except InvestError as e:
+            print(f"An error occurred for FIGI {figi}: {e}")
         return None
 
     @staticmethod
     def get_shares_on_account(account_id) -> List[BoughtInstrumentDto]:
         instruments = []
-        with Client(AppConfig.TOKEN) as client:
-            try:
+        try:
+            with ClientPool.client(AppConfig.TOKEN) as client:
                 response = client.operations.get_portfolio(account_id=str(account_id))
                 for position in response.positions:
                     if position.instrument_type != 'share':
@@ -148,14 +155,14 @@ class TinkoffApi:
                         ticker=TinkoffApi.get_ticker_by_figi(position.figi),
                         quantity=position.quantity.units,
                     ))
-            except InvestError as e:
-                print(f"Ошибка при получении инструментов на аккаунте: {e}")
+        except InvestError as e:
+            print(f"Ошибка при получении инструментов на аккаунте: {e}")
         return instruments
 
     @staticmethod
     def sell(account_id, figi, quantity):
-        with Client(AppConfig.TOKEN) as client:
-            try:
+        try:
+            with ClientPool.client(AppConfig.TOKEN) as client:
                 # Создаем ордер на продажу по лучшей цене, так как это работает почти всегда в отличие от рыночного
                 client.orders.post_order(
                     figi=figi,
@@ -166,5 +173,5 @@ class TinkoffApi:
                     order_id=str(datetime.now(timezone.utc)),
                 )
                 print(f"Sold {quantity} of {figi}")
-            except InvestError as e:
-                print(f"An error occurred: {e}")
+        except InvestError as e:
+            print(f"An error occurred: {e}")
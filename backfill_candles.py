@@ -0,0 +1,24 @@
+import sys
+from datetime import datetime
+
+from app.cache import CandleBackfill
+from bot.vis import TaskProgress
+
+if __name__ == '__main__':
+    # python backfill_candles.py тикеры,через,запятую [торговых дней, по умолчанию 30] [последний день YYYY-MM-DD]
+    tickers = sys.argv[1].split(',')
+    days_num = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    last_date = sys.argv[3] if len(sys.argv) > 3 else datetime.now().strftime("%Y-%m-%d")
+
+    backfill = CandleBackfill(tickers, last_date, days_num)
+    jobs = backfill.get_jobs()
+    print(f"Дней к загрузке: {len(jobs)}")
+
+    if jobs:
+        progress = TaskProgress(len(jobs))
+        backfill.on_progress = progress.update_progress
+        saved_cnt = backfill.run(jobs)
+        print(f"Сохранено дней: {saved_cnt}")
+
+    for ticker, date, error in backfill.errors:
+        print(f"Ошибка {ticker} {date}: {error}")
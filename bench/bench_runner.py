@@ -0,0 +1,135 @@
+import json
+import os
+import resource
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+from app import AppConfig
+from app.cache import TickerCache
+from app.config import RunConfig, AccConfig
+from bench.candle_generator import SyntheticCandleGenerator
+from bot.test import TestAlgorithm, TestAccAlgorithm
+
+
+class BenchRunner:
+    """
+    Замеры скорости симулятора на синтетических свечах.
+    Каждый замер идет в отдельном процессе, чтобы пиковая память не копилась между замерами.
+    Базы свечей создаются во временной папке: на время прогона она подставляется в AppConfig.BASE_DIR,
+    процессы замеров наследуют ее при fork
+    Результат - список словарей (по строке JSON на замер)
+    """
+
+    TICKERS = ['BENCHA', 'BENCHB']
+    LAST_DATE = '2024-10-24'
+
+    # запас дней под окно подбора конфига перед тестовым периодом
+    PRETEST_DAYS = 10
+
+    BOT_CONFIG = '{ticker}+ 4/fan7:0/2 x l1 x 0.6(+x0.2)¤'
+    ACC_CONFIG = 't2 [0] |u0.2 d0|'
+
+    CASES = ['test', 'best', 'best_big', 'acc']
+
+    def __init__(self, sizes: list[int]):
+        self.sizes = sizes
+
+    def seed(self):
+        days_num = max(self.sizes) + self.PRETEST_DAYS
+        for i, ticker in enumerate(self.TICKERS):
+            SyntheticCandleGenerator(ticker, seed=i + 1).seed_db(self.LAST_DATE, days_num)
+
+    def run(self) -> list[dict]:
+        original_base_dir = AppConfig.BASE_DIR
+        with tempfile.TemporaryDirectory() as base_dir:
+            os.makedirs(os.path.join(base_dir, 'db'))
+            AppConfig.BASE_DIR = base_dir
+            try:
+                self.seed()
+
+                out = []
+                for case in self.CASES:
+                    for size in self.sizes:
+                        with ProcessPoolExecutor(max_workers=1) as executor:
+                            out.append(executor.submit(BenchRunner.run_case, case, size).result())
+            finally:
+                for ticker in self.TICKERS:
+                    TickerCache(ticker).close_connection()
+                AppConfig.BASE_DIR = original_base_dir
+        return out
+
+    @classmethod
+    def run_case(cls, case: str, size: int) -> dict:
+        start = time.perf_counter()
+        bot_days = getattr(cls, f"case_{case}")(size)
+        seconds = time.perf_counter() - start
+
+        # ru_maxrss в Linux отдается в килобайтах
+        peak_rss_kb = max(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+        )
+
+        return {
+            'case': case,
+            'size': size,
+            'bot_days': bot_days,
+            'seconds': round(seconds, 3),
+            'bot_days_per_sec': round(bot_days / seconds, 2) if seconds > 0 else 0,
+            'peak_rss_mb': round(peak_rss_kb / 1024, 1),
+        }
+
+    @classmethod
+    def get_config(cls, ticker: str | None = None) -> RunConfig:
+        return RunConfig.from_repr_string(cls.BOT_CONFIG.format(ticker=ticker or cls.TICKERS[0]))
+
+    @classmethod
+    def case_test(cls, size: int) -> int:
+        """Одиночный тест одного конфига"""
+        alg = TestAlgorithm(config=cls.get_config(), use_cache=False)
+        alg.test(last_test_date=cls.LAST_DATE, test_days_num=size)
+        return size
+
+    @classmethod
+    def case_best(cls, size: int, use_big_make_alg=False) -> int:
+        """Подбор лучшего конфига по окну в size дней"""
+        config = cls.get_config()
+        alg = TestAlgorithm(config=config, use_cache=False)
+        test_date = (datetime.strptime(cls.LAST_DATE, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+
+        if use_big_make_alg:
+            variants = alg.make_config_variants_big(config, cls.LAST_DATE)
+        else:
+            variants = alg.make_config_variants(config, cls.LAST_DATE)
+
+        alg.make_best_config_with_profit(
+            test_date=test_date,
+            prev_days=size,
+            original_config=config,
+            use_big_make_alg=use_big_make_alg,
+        )
+        return len(set(variants)) * size
+
+    @classmethod
+    def case_best_big(cls, size: int) -> int:
+        return cls.case_best(size, use_big_make_alg=True)
+
+    @classmethod
+    def case_acc(cls, size: int) -> int:
+        """
+        Тест аккаунта с ботами по всем тикерам.
+        В bot_days идут только торговые дни ботов, подбор конфига внутри не считается
+        """
+        bot_alg_list = [TestAlgorithm(config=cls.get_config(ticker), use_cache=False) for ticker in cls.TICKERS]
+        acc_alg = TestAccAlgorithm(
+            config=AccConfig.from_repr_string(cls.ACC_CONFIG),
+            bot_alg_list=bot_alg_list,
+        )
+        acc_alg.test(last_test_date=cls.LAST_DATE, test_days_num=size)
+        return size * len(bot_alg_list)
+
+    @staticmethod
+    def to_json_lines(results: list[dict]) -> str:
+        return '\n'.join(json.dumps(res) for res in results)
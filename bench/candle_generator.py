@@ -0,0 +1,103 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+from app.cache import TickerCache
+
+
+class SyntheticCandleGenerator:
+    """
+    Заполняет db/c_{ticker}.db синтетическими минутными свечами (случайное блуждание),
+    дневными свечами и данными инструмента. Нужен для замеров без доступа к API
+    """
+
+    # торговые минуты дня, как у реальных свечей (время в UTC)
+    START_TIME = '04:00'
+    END_TIME = '20:49'
+
+    def __init__(
+            self,
+            ticker: str,
+            seed: int = 1,
+            start_price: float = 100.,
+            volatility: float = 0.0008,
+    ):
+        self.ticker = ticker
+        self.rnd = random.Random(seed)
+        self.price = start_price
+        self.volatility = volatility
+        self.round_signs = 2
+
+    def seed_db(self, last_date: str, days_num: int) -> str:
+        """
+        Пересоздает свечи тикера за days_num календарных дней до last_date включительно
+        :return: путь к файлу базы
+        """
+        ticker_cache = TickerCache(self.ticker)
+        ticker_cache.clear_candles_table()
+        ticker_cache.clear_instrument_table()
+
+        conn = ticker_cache.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM candles_day WHERE 1')
+
+        cursor.executemany("INSERT INTO instrument (key, value) VALUES (?, ?)", self.get_instrument_rows())
+
+        end_date = datetime.strptime(last_date, "%Y-%m-%d")
+        for day in range(days_num - 1, -1, -1):
+            date = (end_date - timedelta(days=day)).strftime("%Y-%m-%d")
+            rows = self.make_day(date)
+
+            cursor.executemany(
+                'INSERT INTO candles (date, open, high, low, close, volume) VALUES (?, ?, ?, ?, ?, ?)',
+                rows)
+            cursor.execute(
+                'INSERT INTO candles_day (date, open, high, low, close, volume) VALUES (?, ?, ?, ?, ?, ?)',
+                (
+                    date,
+                    rows[0][1],
+                    max(row[2] for row in rows),
+                    min(row[3] for row in rows),
+                    rows[-1][4],
+                    sum(row[5] for row in rows),
+                ))
+
+        conn.commit()
+
+        return ticker_cache.db_file
+
+    def get_instrument_rows(self) -> list[tuple]:
+        return [
+            ('ticker', self.ticker),
+            ('figi', f"BENCH{self.ticker}"),
+            ('name', f"Synthetic {self.ticker}"),
+            ('currency', 'rub'),
+            ('round_signs', self.round_signs),
+            ('min_increment', 0.01),
+            ('lot', 1),
+            ('short_enabled_flag', True),
+        ]
+
+    def make_day(self, date: str) -> list[tuple]:
+        """Минутные свечи дня в формате строк таблицы candles"""
+        rows = []
+        current = datetime.strptime(f"{date} {self.START_TIME}", "%Y-%m-%d %H:%M").replace(tzinfo=timezone.utc)
+        end = datetime.strptime(f"{date} {self.END_TIME}", "%Y-%m-%d %H:%M").replace(tzinfo=timezone.utc)
+
+        while current <= end:
+            open_ = self.price
+            close = max(0.01, open_ * (1 + self.rnd.gauss(0, self.volatility)))
+            high = max(open_, close) * (1 + abs(self.rnd.gauss(0, self.volatility / 2)))
+            low = min(open_, close) * (1 - abs(self.rnd.gauss(0, self.volatility / 2)))
+            self.price = close
+
+            rows.append((
+                str(current),
+                round(open_, self.round_signs),
+                round(high, self.round_signs),
+                round(low, self.round_signs),
+                round(close, self.round_signs),
+                self.rnd.randint(1, 1000),
+            ))
+            current += timedelta(minutes=1)
+
+        return rows
@@ -0,0 +1,14 @@
+import sys
+
+from bench.bench_runner import BenchRunner
+
+if __name__ == '__main__':
+    # python benchmark.py [размеры через запятую] [файл для результата]
+    sizes = [int(x) for x in sys.argv[1].split(',')] if len(sys.argv) > 1 else [5, 20]
+
+    results_text = BenchRunner.to_json_lines(BenchRunner(sizes).run())
+    print(results_text)
+
+    if len(sys.argv) > 2:
+        with open(sys.argv[2], 'w') as f:
+            f.write(results_text + '\n')
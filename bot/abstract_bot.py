@@ -30,8 +30,8 @@ class AbstractBot(ABC):
     def is_trading_day(self):
         return TimeHelper.is_trading_day(self.time.now())
 
-    def log(self, message, repeat=False):
-        self.logger.log(message, repeat)
+    def log(self, message, *args, repeat=False):
+        self.logger.log(message, *args, repeat=repeat)
 
     def can_trade(self) -> Tuple[bool, int]:
         """
@@ -42,11 +42,7 @@ class AbstractBot(ABC):
         now = self.time.now()
         now_time = now.time()
 
-        start_hour_str, start_min_str = self.config.start_time.split(':')
-        end_hour_str, end_min_str = self.config.end_time.split(':')
-
-        start_time = datetime_time(int(start_hour_str), int(start_min_str), self.START_SEC_SHIFT)
-        end_time = datetime_time(int(end_hour_str), int(end_min_str))
+        start_time, end_time = self.get_trading_hours()
 
         # ко времени запуска приближаемся шагами в половину оставшегося времени
         if now_time < start_time:
@@ -61,6 +57,24 @@ class AbstractBot(ABC):
 
         return True, 0
 
+    def get_trading_hours(self) -> Tuple[datetime_time, datetime_time]:
+        """
+        Время начала и окончания торговли по конфигу
+        :return: (start_time, end_time)
+        """
+        start_hour_str, start_min_str = self.config.start_time.split(':')
+        end_hour_str, end_min_str = self.config.end_time.split(':')
+
+        start_time = datetime_time(int(start_hour_str), int(start_min_str), self.START_SEC_SHIFT)
+        end_time = datetime_time(int(end_hour_str), int(end_min_str))
+
+        return start_time, end_time
+
+    def is_trading_hours(self, now_time: datetime_time) -> bool:
+        """True если по времени can_trade не будет ни ждать начала торгов, ни останавливать бота"""
+        start_time, end_time = self.get_trading_hours()
+        return start_time <= now_time < end_time
+
     def continue_trading(self):
         return self.state != self.STATE_FINISHED
 
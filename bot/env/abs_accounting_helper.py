@@ -3,7 +3,7 @@ from abc import ABC, abstractmethod
 from tinkoff.invest import OrderDirection, PostOrderResponse, OrderType, OrderState
 
 from app.constants import HistoryOrderType
-from bot.helper import OrderHelper
+from bot.helper import OrderHelper, OrderRecord
 from bot.env import AbstractProxyClient, AbstractTimeHelper
 from app.models import Order
 
@@ -21,7 +21,23 @@ class AbstractAccountingHelper(ABC):
     def register_order(self, order: Order):
         pass
 
-    def add_deal_by_order(self, order: PostOrderResponse | OrderState, use_executed_lots=False):
+    def register_event(self, type_: int, datetime, price: float, total: float, count: int,
+                       commission: float | None = None):
+        """
+        Запись операции. По умолчанию собирает модель Order и передает в register_order,
+        тестовое окружение пишет поля напрямую без моделей
+        """
+        self.register_order(Order(
+            run=self.run_id,
+            type=type_,
+            datetime=datetime,
+            price=price,
+            commission=commission,
+            total=total,
+            count=count
+        ))
+
+    def add_deal_by_order(self, order: PostOrderResponse | OrderState | OrderRecord, use_executed_lots=False):
         lots = OrderHelper.get_lots(order, use_executed_lots)
         avg_price = self.client.round(OrderHelper.get_avg_price(order))
         commission = OrderHelper.get_commission(order)
@@ -48,15 +64,14 @@ class AbstractAccountingHelper(ABC):
             type_ = HistoryOrderType.EXECUTED_BUY_LIMIT if order.direction == OrderDirection.ORDER_DIRECTION_BUY \
                 else HistoryOrderType.EXECUTED_SELL_LIMIT
 
-        self.register_order(Order(
-            run=self.run_id,
-            type=type_,
+        self.register_event(
+            type_=type_,
             datetime=self.client.time.now(),
             price=avg_price,
             commission=self.client.round(commission / lots),
             total=total,
             count=lots
-        ))
+        )
 
     def register_order_mark(self, avg_price: float, type_: int = HistoryOrderType.MARK):
         """
@@ -65,15 +80,14 @@ class AbstractAccountingHelper(ABC):
         :param avg_price:
         :return:
         """
-        self.register_order(Order(
-            run=self.run_id,
-            type=type_,
+        self.register_event(
+            type_=type_,
             datetime=self.client.time.now(),
             price=avg_price,
             commission=0,
             total=0,
             count=0
-        ))
+        )
 
     def register_order_mark_star(self, avg_price: float):
         """
@@ -83,7 +97,7 @@ class AbstractAccountingHelper(ABC):
         """
         self.register_order_mark(avg_price, HistoryOrderType.MARK_STAR)
 
-    def add_order(self, order: PostOrderResponse):
+    def add_order(self, order: PostOrderResponse | OrderRecord):
         lots = OrderHelper.get_lots(order)
         avg_price = self.client.round(OrderHelper.get_avg_price(order))
         if order.order_type == OrderType.ORDER_TYPE_MARKET:
@@ -96,46 +110,37 @@ class AbstractAccountingHelper(ABC):
             type_ = HistoryOrderType.OPEN_BUY_LIMIT if order.direction == OrderDirection.ORDER_DIRECTION_BUY \
                 else HistoryOrderType.OPEN_SELL_LIMIT
 
-        order = Order(
-            run=self.run_id,
-            type=type_,
+        self.register_event(
+            type_=type_,
             datetime=self.time.now(),
             price=avg_price,
             total=self.client.round(lots * avg_price),
             count=lots
         )
 
-        self.register_order(order)
-
     def add_order_fail(self, avg_price: float, lots: int = 1):
-        order = Order(
-            run=self.run_id,
-            type=HistoryOrderType.ORDER_FAIL,
+        self.register_event(
+            type_=HistoryOrderType.ORDER_FAIL,
             datetime=self.time.now(),
             price=avg_price,
             total=self.client.round(lots * avg_price),
             count=lots
         )
 
-        self.register_order(order)
-
-    def del_order(self, order: PostOrderResponse):
+    def del_order(self, order: PostOrderResponse | OrderRecord):
         lots = OrderHelper.get_lots(order)
         avg_price = self.client.round(OrderHelper.get_avg_price(order))
         type_ = HistoryOrderType.CANCEL_BUY_LIMIT if order.direction == OrderDirection.ORDER_DIRECTION_BUY \
             else HistoryOrderType.CANCEL_SELL_LIMIT
 
-        order = Order(
-            run=self.run_id,
-            type=type_,
+        self.register_event(
+            type_=type_,
             datetime=self.time.now(),
             price=avg_price,
             total=self.client.round(lots * avg_price),
             count=lots
         )
 
-        self.register_order(order)
-
     @abstractmethod
     def get_instrument_count(self):
         pass
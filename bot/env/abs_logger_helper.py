@@ -7,19 +7,39 @@ class AbstractLoggerHelper(ABC):
         self.last_error = ''
         self.error_cnt = 0
 
-    def log(self, message, repeat=False):
+    def is_enabled(self) -> bool:
+        """Пишет ли логгер сообщения. Если нет - сообщения даже не форматируются"""
+        return True
+
+    @staticmethod
+    def format_message(message, args: tuple = ()) -> str:
+        """
+        Сообщение может быть строкой, строкой с %-аргументами или функцией без параметров,
+        которая отдает строку. Функция вызывается только здесь
+        """
+        if callable(message):
+            message = message()
+        if args:
+            message = message % args
+        return message
+
+    def log(self, message, *args, repeat=False):
+        if not self.is_enabled():
+            return
+
+        message = self.format_message(message, args)
         if self.last_message != message or repeat:
             self.info(message)
             self.last_message = message
 
     @abstractmethod
-    def info(self, message):
+    def info(self, message, *args):
         pass
 
     @abstractmethod
-    def error(self, message):
+    def error(self, message, *args):
         pass
 
     @abstractmethod
-    def debug(self, message):
+    def debug(self, message, *args):
         pass
@@ -8,6 +8,7 @@ from tinkoff.invest import CandleInterval, Quotation, MoneyValue, OrderType, Pos
 from app import AppConfig
 from app.cache import TickerCache, InstrumentDTO
 from bot.env import AbstractTimeHelper, AbstractLoggerHelper
+from bot.helper import OrderRecord
 from app.helper import q2f
 
 
@@ -26,15 +27,21 @@ class AbstractProxyClient(ABC):
             self,
             ticker,
             time: AbstractTimeHelper,
-            logger: AbstractLoggerHelper
+            logger: AbstractLoggerHelper,
+            ticker_cache: TickerCache | None = None,
     ):
         # авто расчет надо переделать если будут инструменты с шагом не кратным десятой доле #26
         self.token = AppConfig.TOKEN
         self.time: AbstractTimeHelper = time
         self.logger = logger
-        self.ticker_cache = TickerCache(ticker)
+        # кэш тикера можно передать общий на несколько клиентов (тест списка конфигов)
+        self.ticker_cache = ticker_cache if ticker_cache is not None else TickerCache(ticker)
         self.instrument: InstrumentDTO = self.get_instrument()
 
+    def start_iteration(self):
+        """Вызывается в начале каждой итерации бота"""
+        pass
+
     @abstractmethod
     def update_cached_status(self):
         pass
@@ -65,7 +72,7 @@ class AbstractProxyClient(ABC):
                      self.instrument.round_signs)
 
     @abstractmethod
-    def place_order(self, lots: int, direction, price: float | None, order_type: int) -> PostOrderResponse | None:
+    def place_order(self, lots: int, direction, price: float | None, order_type: int) -> PostOrderResponse | OrderRecord | None:
         pass
 
     # Базовая функция для загрузки данных последних свечей
@@ -84,7 +91,7 @@ class AbstractProxyClient(ABC):
         pass
 
     @abstractmethod
-    def order_is_executed(self, order: PostOrderResponse) -> Tuple[bool, OrderState | None]:
+    def order_is_executed(self, order: PostOrderResponse | OrderRecord) -> Tuple[bool, OrderState | OrderRecord | None]:
         pass
 
     @abstractmethod
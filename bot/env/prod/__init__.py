@@ -1,5 +1,8 @@
 from .time_helper import TimeProdEnvHelper
 from .logger_helper import LoggerHelper
+from .market_data_stream import MarketDataStream
+from .market_data_gateway import MarketDataGateway, MarketDataGatewayClient
+from .order_state_tracker import OrderStateTracker
 from .tinkoff_client import TinkoffProxyClient
 from .accounting_helper import AccountingHelper
 from .tinkoff_acc_client import TinkoffAccClient
@@ -46,13 +46,18 @@ class LoggerHelper(AbstractLoggerHelper):
         file_handler.setFormatter(formatter)
         self.logger.addHandler(file_handler)
 
-    def info(self, message):
-        self.logger.info(message)
+    def is_enabled(self) -> bool:
+        return self.logger.isEnabledFor(logging.INFO)
 
-    def error(self, message):
-        self.last_error = message
+    def info(self, message, *args):
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(self.format_message(message, args))
+
+    def error(self, message, *args):
+        self.last_error = self.format_message(message, args)
         self.error_cnt += 1
-        self.logger.error(message)
+        self.logger.error(self.last_error)
 
-    def debug(self, message):
-        self.logger.debug(message)
+    def debug(self, message, *args):
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(self.format_message(message, args))
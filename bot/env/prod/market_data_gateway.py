@@ -0,0 +1,197 @@
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from datetime import datetime
+
+from tinkoff.invest import Quotation, RequestError, SecurityTradingStatus
+
+from app import AppConfig
+from app.lib import ClientPool
+
+
+# поля статуса торгов, которые шлюз отдает ботам
+STATUS_FIELDS = (
+    'limit_order_available_flag',
+    'market_order_available_flag',
+    'api_trade_available_flag',
+    'bestprice_order_available_flag',
+)
+
+
+class MarketDataGateway:
+    """
+    Общий для всех ботов хоста источник цен и статусов торгов.
+    Раз в интервал запрашивает цены и статусы всех активных инструментов двумя пакетными запросами
+    и отдает последние значения по unix сокету: запрос - строка {"figi": ...}, ответ - строка json.
+    Инструмент становится активным при первом запросе бота и перестает опрашиваться через FIGI_TTL секунд без запросов
+    """
+
+    # сколько секунд опрашивать инструмент без запросов от ботов
+    FIGI_TTL = 600
+
+    def __init__(self, figi_list: list[str] = None, socket_path: str = None, interval: float = None,
+                 client_factory=None):
+        """
+        :param figi_list: инструменты, которые опрашиваются с самого запуска
+        :param client_factory: создает контекст клиента API (подменяется в тестах)
+        """
+        self.socket_path = socket_path or AppConfig.MARKET_DATA_GATEWAY_SOCKET
+        self.interval = interval or AppConfig.MARKET_DATA_GATEWAY_INTERVAL
+        self.client_factory = client_factory or (lambda: ClientPool.client(AppConfig.TOKEN))
+
+        self.lock = threading.Lock()
+        # figi: время последнего запроса от бота
+        self.figi_requested: dict[str, float] = {figi: time.monotonic() for figi in figi_list or []}
+        # figi: {price, status, updated_at}
+        self.data: dict[str, dict] = {}
+
+        self.stopped = threading.Event()
+        self.server: socketserver.ThreadingUnixStreamServer | None = None
+        self.threads: list[threading.Thread] = []
+
+    def start(self):
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+        gateway = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    response = gateway.handle_request(line)
+                    self.wfile.write(json.dumps(response).encode() + b'\n')
+
+        self.server = socketserver.ThreadingUnixStreamServer(self.socket_path, Handler)
+        self.server.daemon_threads = True
+
+        self.threads = [
+            threading.Thread(target=self.server.serve_forever, name='gateway_server', daemon=True),
+            threading.Thread(target=self.run, name='gateway_poll', daemon=True),
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+    def run(self):
+        while not self.stopped.is_set():
+            self.poll()
+            self.stopped.wait(self.interval)
+
+    def get_active_figi(self) -> list[str]:
+        now = time.monotonic()
+        with self.lock:
+            for figi in [figi for figi, ts in self.figi_requested.items() if now - ts > self.FIGI_TTL]:
+                del self.figi_requested[figi]
+                self.data.pop(figi, None)
+            return list(self.figi_requested)
+
+    def poll(self):
+        """Пакетный запрос цен и статусов по всем активным инструментам"""
+        figi_list = self.get_active_figi()
+        if not figi_list:
+            return
+
+        try:
+            with self.client_factory() as client:
+                prices = client.market_data.get_last_prices(figi=figi_list).last_prices
+                statuses = client.market_data.get_trading_statuses(instrument_ids=figi_list).trading_statuses
+        except (RequestError, ValueError, ConnectionError) as e:
+            print(f"{datetime.now()} Ошибка опроса рыночных данных: {e}")
+            return
+
+        now = time.time()
+        with self.lock:
+            for item in prices:
+                self.get_item(item.figi)['price'] = [item.price.units, item.price.nano]
+
+            for item in statuses:
+                status = {field: getattr(item, field) for field in STATUS_FIELDS}
+                status['trading_status'] = int(item.trading_status)
+                self.get_item(item.figi)['status'] = status
+
+            for figi in figi_list:
+                if figi in self.data:
+                    self.data[figi]['updated_at'] = now
+
+    def get_item(self, figi: str) -> dict:
+        return self.data.setdefault(figi, {'price': None, 'status': None, 'updated_at': 0})
+
+    def handle_request(self, line: bytes) -> dict:
+        try:
+            figi = json.loads(line)['figi']
+        except (ValueError, KeyError, TypeError):
+            return {'error': 'bad request'}
+        if not figi or not isinstance(figi, str):
+            return {'error': 'bad request'}
+
+        with self.lock:
+            self.figi_requested[figi] = time.monotonic()
+            item = self.data.get(figi)
+
+        # устаревшие данные не отдаем - бот пойдет в API сам
+        if item is None or time.time() - item['updated_at'] > self.interval * 3:
+            return {'figi': figi, 'price': None, 'status': None}
+
+        return {'figi': figi, 'price': item['price'], 'status': item['status']}
+
+
+class MarketDataGatewayClient:
+    """
+    Клиент бота к шлюзу рыночных данных.
+    Если шлюз не запущен, не ответил или данных по инструменту еще нет - отдает None, и клиент идет в API запросами
+    """
+
+    # таймаут ответа шлюза, сек
+    TIMEOUT = 1
+
+    def __init__(self, figi: str, socket_path: str = None):
+        self.figi = figi
+        self.socket_path = socket_path or AppConfig.MARKET_DATA_GATEWAY_SOCKET
+
+    def request(self) -> dict | None:
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(self.TIMEOUT)
+                sock.connect(self.socket_path)
+                sock.sendall(json.dumps({'figi': self.figi}).encode() + b'\n')
+                with sock.makefile('rb') as file:
+                    return json.loads(file.readline())
+        except (OSError, ValueError):
+            return None
+
+    def get_last_price(self) -> Quotation | None:
+        response = self.request()
+        if not response or not response.get('price'):
+            return None
+        units, nano = response['price']
+        return Quotation(units=units, nano=nano)
+
+    def get_trading_status(self) -> dict | None:
+        """Поля статуса торгов для подстановки в GetTradingStatusResponse"""
+        response = self.request()
+        if not response or not response.get('status'):
+            return None
+        status = dict(response['status'])
+        status['trading_status'] = SecurityTradingStatus(status['trading_status'])
+        return status
+
+    @staticmethod
+    def is_running(socket_path: str = None) -> bool:
+        """Шлюз запущен и принимает подключения"""
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(MarketDataGatewayClient.TIMEOUT)
+                sock.connect(socket_path or AppConfig.MARKET_DATA_GATEWAY_SOCKET)
+            return True
+        except OSError:
+            return False
@@ -0,0 +1,82 @@
+import threading
+
+from tinkoff.invest import Client, LastPriceInstrument, InfoInstrument, MarketDataResponse, Quotation, TradingStatus
+
+from bot.env import AbstractLoggerHelper
+
+
+class MarketDataStream:
+    """
+    Последняя цена и статус торгов инструмента из стрима рыночных данных.
+    Стрим читается в фоновом потоке, состояние хранится в памяти, при обрыве поток переподключается.
+    Пока стрим не подключен или данных еще нет - отдает None, и клиент идет в API запросами
+    """
+
+    # пауза перед переподключением после обрыва, сек
+    RECONNECT_SLEEP = 5
+
+    def __init__(self, token: str, figi: str, logger: AbstractLoggerHelper, client_factory=None):
+        """
+        :param client_factory: создает контекст клиента API со стримом (подменяется в тестах)
+        """
+        self.token = token
+        self.figi = figi
+        self.logger = logger
+        self.client_factory = client_factory or (lambda: Client(self.token))
+
+        self.connected = False
+        self.last_price: Quotation | None = None
+        self.trading_status: TradingStatus | None = None
+
+        self.stopped = threading.Event()
+        self.manager = None
+        self.thread: threading.Thread | None = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name=f"market_data_{self.figi}", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.manager is not None:
+            self.manager.stop()
+
+    def run(self):
+        while not self.stopped.is_set():
+            try:
+                with self.client_factory() as client:
+                    self.consume(client.create_market_data_stream())
+            except Exception as e:
+                self.logger.error(f"Ошибка стрима рыночных данных: {e}")
+            finally:
+                self.connected = False
+                self.manager = None
+
+            if not self.stopped.is_set():
+                self.stopped.wait(self.RECONNECT_SLEEP)
+
+    def consume(self, manager):
+        """Подписка и чтение стрима до его остановки"""
+        self.manager = manager
+        manager.last_price.subscribe([LastPriceInstrument(figi=self.figi)])
+        manager.info.subscribe([InfoInstrument(figi=self.figi)])
+        self.connected = True
+
+        for data in manager:
+            self.on_data(data)
+            if self.stopped.is_set():
+                manager.stop()
+                break
+
+    def on_data(self, data: MarketDataResponse):
+        if data.last_price and data.last_price.figi == self.figi:
+            self.last_price = data.last_price.price
+
+        if data.trading_status and data.trading_status.figi == self.figi:
+            self.trading_status = data.trading_status
+
+    def get_last_price(self) -> Quotation | None:
+        return self.last_price if self.connected else None
+
+    def get_trading_status(self) -> TradingStatus | None:
+        return self.trading_status if self.connected else None
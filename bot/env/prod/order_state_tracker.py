@@ -0,0 +1,120 @@
+import threading
+import time
+from typing import Callable
+
+from tinkoff.invest import Client, OrderState, PostOrderResponse, TradesStreamResponse
+
+from app import AppConfig
+from bot.env import AbstractLoggerHelper
+
+
+class OrderStateTracker:
+    """
+    Активные заявки счета в памяти.
+    Список запрашивается одним запросом не чаще раза за итерацию бота, выставленные и снятые ботом заявки
+    учитываются сразу. Если подключен стрим сделок и с прошлого запроса по инструменту не было сделок -
+    список не запрашивается вовсе, но не реже раза в AppConfig.ORDER_STATE_REFRESH_INTERVAL секунд
+    (снятие заявок вручную в стриме сделок не видно)
+    """
+
+    # пауза перед переподключением стрима после обрыва, сек
+    RECONNECT_SLEEP = 5
+
+    def __init__(
+            self,
+            token: str,
+            account_id: str,
+            figi: str,
+            logger: AbstractLoggerHelper,
+            fetch_active_orders: Callable[[], list[OrderState] | None],
+            client_factory=None,
+    ):
+        """
+        :param fetch_active_orders: запрос активных заявок к API, None - ошибка запроса
+        :param client_factory: создает контекст клиента API для стрима сделок (подменяется в тестах)
+        """
+        self.token = token
+        self.account_id = account_id
+        self.figi = figi
+        self.logger = logger
+        self.fetch_active_orders = fetch_active_orders
+        self.client_factory = client_factory or (lambda: Client(self.token))
+
+        self.active: dict[str, OrderState | PostOrderResponse] | None = None
+        self.refreshed_at = 0.
+        self.iteration_refreshed = False
+
+        # стрим сделок: подключен и были ли сделки по инструменту с последнего запроса списка
+        self.stream_connected = False
+        self.has_new_trades = True
+        self.stopped = threading.Event()
+        self.thread: threading.Thread | None = None
+
+    def new_iteration(self):
+        self.iteration_refreshed = False
+
+    def is_cache_valid(self) -> bool:
+        if self.active is None:
+            return False
+        if self.iteration_refreshed:
+            return True
+        if not self.stream_connected or self.has_new_trades:
+            return False
+        return time.monotonic() - self.refreshed_at < AppConfig.ORDER_STATE_REFRESH_INTERVAL
+
+    def get_active_orders(self) -> list[OrderState | PostOrderResponse] | None:
+        if not self.is_cache_valid():
+            # сбрасываем до запроса, чтобы не потерять сделки, пришедшие во время него
+            self.has_new_trades = False
+            orders = self.fetch_active_orders()
+            if orders is None:
+                self.has_new_trades = True
+                return None
+
+            self.active = {order.order_id: order for order in orders}
+            self.refreshed_at = time.monotonic()
+            self.iteration_refreshed = True
+
+        return list(self.active.values())
+
+    def add_order(self, order: PostOrderResponse):
+        if self.active is not None:
+            self.active[order.order_id] = order
+
+    def remove_order(self, order_id: str):
+        if self.active is not None:
+            self.active.pop(order_id, None)
+
+    def start_stream(self):
+        self.thread = threading.Thread(target=self.run_stream, name=f"trades_{self.figi}", daemon=True)
+        self.thread.start()
+
+    def stop_stream(self):
+        self.stopped.set()
+
+    def run_stream(self):
+        while not self.stopped.is_set():
+            try:
+                with self.client_factory() as client:
+                    self.consume(client.orders_stream.trades_stream(accounts=[self.account_id]))
+            except Exception as e:
+                self.logger.error(f"Ошибка стрима сделок: {e}")
+            finally:
+                self.stream_connected = False
+
+            if not self.stopped.is_set():
+                self.stopped.wait(self.RECONNECT_SLEEP)
+
+    def consume(self, stream):
+        # пока стрима не было, сделки могли пройти незамеченными
+        self.has_new_trades = True
+        self.stream_connected = True
+
+        for data in stream:
+            self.on_data(data)
+            if self.stopped.is_set():
+                break
+
+    def on_data(self, data: TradesStreamResponse):
+        if data.order_trades and data.order_trades.figi == self.figi:
+            self.has_new_trades = True
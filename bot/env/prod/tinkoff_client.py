@@ -1,18 +1,49 @@
+from dataclasses import replace
 from datetime import datetime, timezone
 from typing import Tuple
 
-from tinkoff.invest import Client, RequestError, OrderType, PostOrderResponse, OrderDirection, GetCandlesResponse, \
+from tinkoff.invest import RequestError, OrderType, PostOrderResponse, OrderDirection, GetCandlesResponse, \
     CandleInterval, OrderState, OrderExecutionReportStatus, GetTradingStatusResponse
 
+from app import AppConfig
 from bot.env import AbstractProxyClient
+from bot.env.prod.market_data_gateway import MarketDataGatewayClient
+from bot.env.prod.market_data_stream import MarketDataStream
+from bot.env.prod.order_state_tracker import OrderStateTracker
 from app.helper import f2q
-from app.lib import TinkoffApi
+from app.lib import TinkoffApi, ClientPool
 
 
 class TinkoffProxyClient(AbstractProxyClient):
-    def __init__(self, ticker, time, logger, account_id: str):
+    # статусы, после которых заявка больше не активна
+    FINAL_STATUSES = (
+        OrderExecutionReportStatus.EXECUTION_REPORT_STATUS_FILL,
+        OrderExecutionReportStatus.EXECUTION_REPORT_STATUS_REJECTED,
+        OrderExecutionReportStatus.EXECUTION_REPORT_STATUS_CANCELLED,
+    )
+
+    def __init__(self, ticker, time, logger, account_id: str, use_stream: bool | None = None,
+                 use_trades_stream: bool | None = None, use_gateway: bool | None = None):
         super().__init__(ticker, time, logger)
         self.account_id: str = account_id
+
+        # активные заявки - одним запросом за итерацию или по стриму сделок
+        self.order_tracker = OrderStateTracker(self.token, account_id, self.get_figi(), logger,
+                                               self.fetch_active_orders)
+        if AppConfig.BOT_TRADES_STREAM if use_trades_stream is None else use_trades_stream:
+            self.order_tracker.start_stream()
+
+        # цена и статус торгов из стрима, запросы к API - только пока стрим не отдает данные
+        self.stream: MarketDataStream | None = None
+        if AppConfig.BOT_MARKET_DATA_STREAM if use_stream is None else use_stream:
+            self.stream = MarketDataStream(self.token, self.get_figi(), logger)
+            self.stream.start()
+
+        # общий для ботов хоста шлюз рыночных данных, в приоритете перед стримом
+        self.gateway: MarketDataGatewayClient | None = None
+        if AppConfig.MARKET_DATA_GATEWAY if use_gateway is None else use_gateway:
+            self.gateway = MarketDataGatewayClient(self.get_figi())
+
         self.status = self._get_trade_status()
 
     def get_current_price(self) -> float | None:
@@ -20,6 +51,16 @@ class TinkoffProxyClient(AbstractProxyClient):
         Получает текущую цену инструмента
         :return: Текущая цена инструмента или None, если цена не может быть получена.
         """
+        if self.gateway:
+            price_gateway = self.gateway.get_last_price()
+            if price_gateway is not None:
+                return self.q2f(price_gateway)
+
+        if self.stream:
+            price_stream = self.stream.get_last_price()
+            if price_stream is not None:
+                return self.q2f(price_stream)
+
         # первично - пытаемся достать из свечей
         price_candle = TinkoffApi.get_current_price_from_last_candle(self.get_figi())
         if price_candle is not None:
@@ -35,7 +76,7 @@ class TinkoffProxyClient(AbstractProxyClient):
 
     def _get_trade_status(self) -> GetTradingStatusResponse | None:
         try:
-            with Client(self.token) as client:
+            with ClientPool.client(self.token) as client:
                 trading_status = client.market_data.get_trading_status(figi=self.get_figi())
         except RequestError as e:
             self.logger.log(f"Ошибка при запросе статуса торговли: {e}")
@@ -43,6 +84,22 @@ class TinkoffProxyClient(AbstractProxyClient):
         return trading_status
 
     def update_cached_status(self):
+        gateway_status = self.gateway.get_trading_status() if self.gateway else None
+        if gateway_status is not None and self.status is not None:
+            self.status = replace(self.status, **gateway_status)
+            return self.status
+
+        stream_status = self.stream.get_trading_status() if self.stream else None
+        if stream_status is not None and self.status is not None:
+            # в стриме нет флага заявок по лучшей цене, он остается из последнего запроса
+            self.status = replace(
+                self.status,
+                trading_status=stream_status.trading_status,
+                limit_order_available_flag=stream_status.limit_order_available_flag,
+                market_order_available_flag=stream_status.market_order_available_flag,
+            )
+            return self.status
+
         new_status = self._get_trade_status()
         # это защита от случаев, когда сам метод сбоит, а остальное работает
         if new_status is not None:
@@ -64,8 +121,8 @@ class TinkoffProxyClient(AbstractProxyClient):
     def place_order(self, lots: int, direction, price: float | None, order_type: int) -> PostOrderResponse | None:
         try:
             price_quotation = f2q(price) if price else None
-            with Client(self.token) as client:
-                return client.orders.post_order(
+            with ClientPool.client(self.token) as client:
+                response = client.orders.post_order(
                     order_id=str(datetime.now(timezone.utc)),
                     figi=self.get_figi(),
                     quantity=lots,
@@ -74,6 +131,8 @@ class TinkoffProxyClient(AbstractProxyClient):
                     order_type=order_type,
                     price=price_quotation
                 )
+            self.order_tracker.add_order(response)
+            return response
         except RequestError as e:
             if order_type == OrderType.ORDER_TYPE_MARKET:
                 order_type_text = 'market'
@@ -89,8 +148,8 @@ class TinkoffProxyClient(AbstractProxyClient):
             return None
 
     def get_candles(self, from_date, to_date, interval) -> GetCandlesResponse:
-        with Client(self.token) as client:
-            try:
+        try:
+            with ClientPool.client(self.token) as client:
                 candles = client.market_data.get_candles(
                     figi=self.get_figi(),
                     from_=from_date,
@@ -98,55 +157,64 @@ class TinkoffProxyClient(AbstractProxyClient):
                     interval=interval
                 )
                 return candles
-            except RequestError as e:
-                self.logger.error(f"Ошибка при запросе свечей: {e}")
-                return GetCandlesResponse([])
+        except RequestError as e:
+            self.logger.error(f"Ошибка при запросе свечей: {e}")
+            return GetCandlesResponse([])
 
     def get_day_candles(self, from_date, to_date) -> GetCandlesResponse:
         return self.get_candles(from_date, to_date, interval=CandleInterval.CANDLE_INTERVAL_DAY)
 
     def order_is_executed(self, order: PostOrderResponse) -> Tuple[bool, OrderState | None]:
-        with Client(self.token) as client:
-            try:
+        try:
+            with ClientPool.client(self.token) as client:
                 order_state = client.orders.get_order_state(account_id=self.account_id, order_id=order.order_id)
-            except RequestError as e:
-                self.logger.error(f"Ошибка при запросе статуса заявки: {e}")
-                return False, None
-            return (
-                order_state.execution_report_status == OrderExecutionReportStatus.EXECUTION_REPORT_STATUS_FILL,
-                order_state
-            )
+                if order_state.execution_report_status in self.FINAL_STATUSES:
+                    self.order_tracker.remove_order(order.order_id)
+                return (
+                    order_state.execution_report_status == OrderExecutionReportStatus.EXECUTION_REPORT_STATUS_FILL,
+                    order_state
+                )
+        except RequestError as e:
+            self.logger.error(f"Ошибка при запросе статуса заявки: {e}")
+            return False, None
 
     def get_instruments_count(self):
-        with Client(self.token) as client:
-            try:
+        try:
+            with ClientPool.client(self.token) as client:
                 portfolio = client.operations.get_portfolio(account_id=self.account_id)
-            except RequestError as e:
-                self.logger.error(f"Ошибка при запросе портфеля: {e}")
+                for position in portfolio.positions:
+                    if position.figi == self.get_figi():
+                        return position.quantity.units - position.blocked_lots.units
                 return 0
-            for position in portfolio.positions:
-                if position.figi == self.get_figi():
-                    return position.quantity.units - position.blocked_lots.units
+        except RequestError as e:
+            self.logger.error(f"Ошибка при запросе портфеля: {e}")
             return 0
 
     def cancel_order(self, order) -> bool:
         if not order:
             return False
-        with Client(self.token) as client:
-            try:
+        try:
+            with ClientPool.client(self.token) as client:
                 client.orders.cancel_order(account_id=self.account_id, order_id=order.order_id)
-                return True
-            except RequestError as e:
-                self.logger.error(f"Ошибка при закрытии заявки на покупку: {e}")
+            self.order_tracker.remove_order(order.order_id)
+            return True
+        except RequestError as e:
+            self.logger.error(f"Ошибка при закрытии заявки на покупку: {e}")
         return False
 
+    def start_iteration(self):
+        self.order_tracker.new_iteration()
+
     def get_active_orders(self):
-        with Client(self.token) as client:
-            try:
+        return self.order_tracker.get_active_orders()
+
+    def fetch_active_orders(self):
+        try:
+            with ClientPool.client(self.token) as client:
                 all_orders = client.orders.get_orders(account_id=self.account_id)
                 active_orders = [order for order in all_orders.orders if order.execution_report_status
                                  != OrderExecutionReportStatus.EXECUTION_REPORT_STATUS_FILL]
                 return active_orders
-            except Exception as e:
-                self.logger.error(f"Ошибка при получении активных заявок: {e}")
-                return None
+        except Exception as e:
+            self.logger.error(f"Ошибка при получении активных заявок: {e}")
+            return None
@@ -1,4 +1,7 @@
 from .time_test_env import TimeTestEnvHelper
 from .logger_test_env import LoggerTestEnvHelper
+from .minute_candles_day import MinuteCandlesDay
+from .matching_engine import MatchingEngine
+from .order_log import OrderLog
 from .client_test_env import ClientTestEnvHelper
 from .accounting_test_env import AccountingTestEnvHelper
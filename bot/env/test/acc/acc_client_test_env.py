@@ -9,10 +9,33 @@ class TestAccClientEnvHelper(AbstractAccClient):
     def __init__(self, bot_alg_list: List[TestAlgorithm]):
         self.bot_alg_list = bot_alg_list
 
+        # режим проигрывания заранее посчитанных балансов ботов (параллельный тест аккаунта)
+        self.replay = False
+        # балансы ботов на текущую минуту проигрывания
+        self.replay_balances: tuple[float, ...] = ()
+        # в режиме проигрывания была попытка повлиять на ботов
+        self.intervened = False
+
+    def start_replay(self):
+        self.replay = True
+        self.replay_balances = ()
+        self.intervened = False
+
+    def stop_replay(self):
+        self.replay = False
+        self.replay_balances = ()
+
+    def set_balance(self, balances: tuple[float, ...]):
+        self.replay_balances = balances
+
     def get_account_balance_rub(self, account_id: str) -> float:
+        balances = self.replay_balances if self.replay \
+            else (bot_alg.get_cur_balance() for bot_alg in self.bot_alg_list)
+
+        # суммируем в том же порядке, чтобы округление совпадало в обоих режимах
         sum_balance = 0
-        for bot_alg in self.bot_alg_list:
-            sum_balance += bot_alg.get_cur_balance()
+        for balance in balances:
+            sum_balance += balance
         return round(sum_balance, 2)
 
     def get_shares_on_account(self, account_id) -> List[BoughtInstrumentDto]:
@@ -28,6 +51,11 @@ class TestAccClientEnvHelper(AbstractAccClient):
         return out
 
     def sell(self, account_id: str, figi: str, quantity: int):
+        if self.replay:
+            # при проигрывании боты уже досчитали день, продажа требует последовательного прогона
+            self.intervened = True
+            return
+
         # при тестах должно работать с figi = ticker для упрощения логики
         for bot_alg in self.bot_alg_list:
             if bot_alg.config.ticker != figi:
@@ -1,29 +1,34 @@
 from app.models import Order
 from bot.env import AbstractAccountingHelper
-from app.constants import HistoryOrderType
-from bot.env.test import ClientTestEnvHelper, TimeTestEnvHelper
+from bot.env.test import ClientTestEnvHelper, TimeTestEnvHelper, OrderLog
 
 
 class AccountingTestEnvHelper(AbstractAccountingHelper):
     def __init__(self, client: ClientTestEnvHelper, time: TimeTestEnvHelper):
         super().__init__(client, time)
-        self.orders = []
+        self.order_log = OrderLog()
 
     def reset(self):
         super().reset()
-        self.orders = []
+        self.order_log = OrderLog()
 
     def register_order(self, order: Order):
-        self.orders.append(order)
+        self.order_log.add(order.run, order.type, order.datetime, order.price, order.total, order.count,
+                           order.commission)
+
+    def register_event(self, type_: int, datetime, price: float, total: float, count: int,
+                       commission: float | None = None):
+        self.order_log.add(self.run_id, type_, datetime, price, total, count, commission)
 
     def get_executed_order_cnt(self) -> int:
         """
         Возвращает количество ордеров с реальными покупками, а не просто заявками
         """
-        return sum(1 for order in self.orders if order.type in HistoryOrderType.EXECUTED_TYPES)
+        return self.order_log.executed_cnt
 
-    def get_orders(self):
-        return self.orders
+    def get_orders(self) -> list[Order]:
+        """Модели Order создаются только здесь, по запросу (для графиков)"""
+        return self.order_log.to_orders()
 
     def get_instrument_count(self):
         return self.num
@@ -1,13 +1,16 @@
-from datetime import time as datetime_time, timedelta, datetime, timezone
+from datetime import time as datetime_time, timedelta, datetime, date
 from typing import Tuple
 
-from tinkoff.invest import HistoricCandle, PostOrderResponse, MoneyValue, OrderType, GetCandlesResponse, OrderState, \
-    OrderDirection, OrderExecutionReportStatus, SecurityTradingStatus
+import numpy as np
+from tinkoff.invest import HistoricCandle, MoneyValue, OrderType, GetCandlesResponse, OrderDirection, \
+    OrderExecutionReportStatus, SecurityTradingStatus
 
 from app import AppConfig
+from app.cache import LocalCache, TickerCache
 from bot.env import AbstractProxyClient
-from bot.env.test import TimeTestEnvHelper
-from app.helper import TimeHelper, f2q
+from bot.helper import OrderRecord
+from bot.env.test import TimeTestEnvHelper, MinuteCandlesDay, MatchingEngine
+from app.helper import TimeHelper, TradingCalendar, f2q
 
 
 class ClientTestEnvHelper(AbstractProxyClient):
@@ -41,46 +44,39 @@ class ClientTestEnvHelper(AbstractProxyClient):
     23:50 - m0 l0 b0 ..._NOT_AVAILABLE_FOR_TRADING: 1
     """
 
-    # Временные интервалы для рабочего дня (всё в GMT)
-    WORK_DAY_SCHEDULE = {
-        '00:00': SecurityTradingStatus.SECURITY_TRADING_STATUS_NOT_AVAILABLE_FOR_TRADING,
-        '04:00': SecurityTradingStatus.SECURITY_TRADING_STATUS_DEALER_NORMAL_TRADING,
-        '06:40': SecurityTradingStatus.SECURITY_TRADING_STATUS_BREAK_IN_TRADING,
-        '06:50': SecurityTradingStatus.SECURITY_TRADING_STATUS_OPENING_AUCTION_PERIOD,
-        '07:00': SecurityTradingStatus.SECURITY_TRADING_STATUS_NORMAL_TRADING,
-        '15:40': SecurityTradingStatus.SECURITY_TRADING_STATUS_CLOSING_AUCTION,
-        '15:45': SecurityTradingStatus.SECURITY_TRADING_STATUS_TRADING_AT_CLOSING_AUCTION_PRICE,
-        '15:50': SecurityTradingStatus.SECURITY_TRADING_STATUS_NOT_AVAILABLE_FOR_TRADING,
-        '16:00': SecurityTradingStatus.SECURITY_TRADING_STATUS_OPENING_AUCTION_PERIOD,
-        '16:04': SecurityTradingStatus.SECURITY_TRADING_STATUS_NOT_AVAILABLE_FOR_TRADING,
-        '16:05': SecurityTradingStatus.SECURITY_TRADING_STATUS_NORMAL_TRADING,
-        '20:50': SecurityTradingStatus.SECURITY_TRADING_STATUS_NOT_AVAILABLE_FOR_TRADING,
-    }
-
-    # Временные интервалы для выходного дня
-    WEEKEND_DAY_SCHEDULE = {
-        '00:00': SecurityTradingStatus.SECURITY_TRADING_STATUS_NOT_AVAILABLE_FOR_TRADING,
-        '04:00': SecurityTradingStatus.SECURITY_TRADING_STATUS_DEALER_NORMAL_TRADING,
-        '20:50': SecurityTradingStatus.SECURITY_TRADING_STATUS_NOT_AVAILABLE_FOR_TRADING,
-    }
+    # Временные интервалы для рабочего и выходного дня (всё в GMT)
+    WORK_DAY_SCHEDULE = TradingCalendar.WORK_DAY_SCHEDULE
+    WEEKEND_DAY_SCHEDULE = TradingCalendar.WEEKEND_DAY_SCHEDULE
+
+    # статусы, в которых можно торговать
+    CAN_TRADE_STATUSES = [
+        SecurityTradingStatus.SECURITY_TRADING_STATUS_DEALER_NORMAL_TRADING,
+        SecurityTradingStatus.SECURITY_TRADING_STATUS_NORMAL_TRADING,
+    ]
+
+    # таблица статусов дня (id) -> can_trade по минутам суток
+    can_trade_minutes: dict[int, np.ndarray] = {}
 
     def __init__(self,
                  ticker,
                  logger,
                  time_helper: TimeTestEnvHelper,
+                 ticker_cache: TickerCache | None = None,
                  ):
-        super().__init__(ticker, time_helper, logger)
+        super().__init__(ticker, time_helper, logger, ticker_cache)
 
-        self.candles_1_min_dict: dict = {}
+        self.day_candles: MinuteCandlesDay = MinuteCandlesDay()
         self.total_completed_orders = 0
 
         self.current_candle: HistoricCandle | None = None
+        self.current_minute: int | None = None
         self.current_price: float = 0
         self.commission: float = 0.0005
 
         self.order_next_index = 0
-        self.orders: dict[str, PostOrderResponse] = {}
-        self.executed_orders_ids = []
+        self.orders: dict[str, OrderRecord] = {}
+        self.matching = MatchingEngine()
+        self.executed_orders_ids: set[str] = self.matching.executed_ids
 
     def set_current_price(self, price: float):
         self.current_price = price
@@ -88,23 +84,71 @@ class ClientTestEnvHelper(AbstractProxyClient):
     def get_current_price(self) -> float | None:
         return self.current_price
 
-    def set_candles_list_by_date(self, date):
+    def set_candles_list_by_date(self, date, day_candles: MinuteCandlesDay | None = None):
+        """:param day_candles: свечи дня, уже загруженные другим клиентом того же тикера"""
         is_today = TimeHelper.is_today(date)
         trades_are_finished = TimeHelper.trades_are_finished()
 
-        candles = self.ticker_cache.get_candles(date, force_cache=is_today and trades_are_finished)
-        self.candles_1_min_dict = {(candle.time.hour, candle.time.minute): candle for candle in candles.candles}
+        if day_candles is None:
+            day_candles = self.get_minute_candles_day(date, force_cache=is_today and trades_are_finished)
+        self.day_candles = day_candles
         self.orders = {}
-        self.executed_orders_ids = []
+        self.matching = MatchingEngine()
+        self.executed_orders_ids = self.matching.executed_ids
+
+        # в реальной дате > 500. это флаг отсутствия данных
+        return is_today or self.day_candles.candles_cnt > 400
+
+    def preload_candles(self, from_date: str, to_date: str):
+        """Собирает массивы свечей всех прошедших дней периода до прогона по дням, одним запросом к базе"""
+        for date, columns in self.ticker_cache.get_candles_range(from_date, to_date).items():
+            cache_key = self.get_day_cache_key(date)
+            if LocalCache.get(cache_key) is None:
+                LocalCache.set(cache_key, self.columns_to_day(columns))
+
+    def get_day_cache_key(self, date) -> str:
+        return f"candle_arr_{self.ticker_cache.ticker}_{date}"
+
+    def columns_to_day(self, columns: dict) -> MinuteCandlesDay:
+        return MinuteCandlesDay.from_columns(columns, lambda price: self.q2f(f2q(price)))
+
+    def get_minute_candles_day(self, date, force_cache=False) -> MinuteCandlesDay:
+        """
+        Минутные свечи дня в виде массивов.
+        Для прошедших дней одинаковы для всех прогонов по тикеру, поэтому собираются один раз и кешируются
+        """
+        is_today = TimeHelper.is_today(date)
+        cache_key = self.get_day_cache_key(date)
 
-        return is_today or len(candles.candles) > 400  # в реальной дате > 500. это флаг отсутствия данных
+        if not is_today:
+            cache_val = LocalCache.get(cache_key)
+            if cache_val is not None:
+                return cache_val
+
+        # прошедшие дни - колонками из архива свечей, без объектов HistoricCandle
+        columns = None if is_today else self.ticker_cache.get_candles_columns(date)
+        if columns is not None:
+            day_candles = self.columns_to_day(columns)
+        else:
+            candles = self.ticker_cache.get_candles(date, force_cache=force_cache)
+            day_candles = MinuteCandlesDay.from_candles(candles.candles, self.q2f)
+
+        if not is_today:
+            LocalCache.set(cache_key, day_candles)
+
+        return day_candles
 
     def set_current_candle(self, candle: HistoricCandle):
         self.current_candle = candle
         self.set_current_price(self.q2f(candle.close))
 
+    def set_current_minute(self, index: int):
+        """Задает текущую минуту дня (индекс в массивах свечей) и цену по её закрытию"""
+        self.current_minute = index
+        self.set_current_price(self.day_candles.get_close(index))
+
     def get_candle(self, dt) -> HistoricCandle | None:
-        return self.candles_1_min_dict.get((dt.hour, dt.minute), None)
+        return self.day_candles.get_candle(MinuteCandlesDay.get_index(dt), dt)
 
     @staticmethod
     def to_time(str_time) -> datetime_time:
@@ -115,26 +159,20 @@ class ClientTestEnvHelper(AbstractProxyClient):
         pass
 
     def get_status_for_time(self):
-        current_time = self.time.now()
-        current_time_str = current_time.replace(tzinfo=timezone.utc).strftime('%H:%M')
-        is_workday = not TimeHelper.is_weekend(current_time)
-
         """Возвращает статус для текущего времени."""
-        schedule = self.WORK_DAY_SCHEDULE if is_workday else self.WEEKEND_DAY_SCHEDULE
-        status = SecurityTradingStatus.SECURITY_TRADING_STATUS_NOT_AVAILABLE_FOR_TRADING
-
-        for key in sorted(schedule.keys()):
-            if current_time_str < key:
-                return status
-            status = schedule[key]
-
-        return status
+        return TradingCalendar.get_status(self.time.now())
 
     def can_trade(self):
-        return self.get_status_for_time() in [
-            SecurityTradingStatus.SECURITY_TRADING_STATUS_DEALER_NORMAL_TRADING,
-            SecurityTradingStatus.SECURITY_TRADING_STATUS_NORMAL_TRADING,
-        ]
+        return self.get_status_for_time() in self.CAN_TRADE_STATUSES
+
+    @classmethod
+    def get_can_trade_minutes(cls, day: date) -> np.ndarray:
+        """can_trade по минутам суток дня (индекс - hour * 60 + minute)"""
+        statuses = TradingCalendar.get_day_statuses(day)
+        key = id(statuses)
+        if key not in cls.can_trade_minutes:
+            cls.can_trade_minutes[key] = np.isin(statuses, cls.CAN_TRADE_STATUSES)
+        return cls.can_trade_minutes[key]
 
     def can_limit_order(self):
         return self.can_trade()
@@ -150,11 +188,16 @@ class ClientTestEnvHelper(AbstractProxyClient):
     def float_to_money_value(self, price) -> MoneyValue:
         return MoneyValue(self.instrument.currency, units=int(price), nano=int((self.round(price - int(price))) * 1e9))
 
+    def money_value(self, price) -> float:
+        """Значение MoneyValue из float_to_money_value (units + nano * 1e-9), но без создания объекта"""
+        units = int(price)
+        return units + int((self.round(price - units)) * 1e9) * 1e-9
+
     def get_new_order_id(self):
         self.order_next_index += 1
         return str(self.order_next_index)
 
-    def place_order(self, lots: int, direction, price: float | None, order_type: int) -> PostOrderResponse | None:
+    def place_order(self, lots: int, direction, price: float | None, order_type: int) -> OrderRecord | None:
 
         # if random.randint(1, 3) == 1:
         #     print('----- Падение запроса ------')
@@ -185,6 +228,8 @@ class ClientTestEnvHelper(AbstractProxyClient):
 
             order = self.get_post_order_response_limit(direction, lots, price)
             self.orders[order.order_id] = order
+            # цена как в OrderHelper.get_avg_price для новой лимитной заявки
+            self.matching.add(order.order_id, direction, self.round(round(order.initial_security_price, 2)))
             return order
 
         else:
@@ -222,81 +267,35 @@ class ClientTestEnvHelper(AbstractProxyClient):
 
         return result
 
-    @staticmethod
-    def get_n_minutes(h, m, n):
-        specified_time = datetime.now().replace(hour=h, minute=m, second=0, microsecond=0)
-        prev_minutes = []
-
-        # Вычитаем минуты и добавляем результат в список
-        for i in range(n):
-            previous_time = specified_time + timedelta(minutes=i)
-            prev_minutes.append((previous_time.hour, previous_time.minute))
-
-        return prev_minutes
-
-    @staticmethod
-    def time_is_greater(time_pair, current_datetime):
-        """
-        Проверяет, больше ли или равно заданное время (час и минута) текущему времени.
-
-        :param time_pair: Кортеж, содержащий час и минуту (например, (14, 30)).
-        :param current_datetime: Объект datetime с текущим временем.
-        :return: True, если заданное время больше или равно текущему, иначе False.
-        """
-        hour, minute = time_pair
-        # Создаем объект datetime для заданного времени с использованием даты из current_datetime
-        given_datetime = current_datetime.replace(hour=hour, minute=minute, second=0, microsecond=0)
-
-        return given_datetime > current_datetime
-
     def get_calculated_candle(self, hour, minute, n=5) -> HistoricCandle:
         """
-        Отдает свечи, рассчитанные на основе минутных, но только нва текущий день
-        (данные собираются из массива self.candles_1_min_dict)
+        Отдает свечи, рассчитанные на основе минутных, но только на текущий день
+        (данные собираются из массивов self.day_candles)
         :param hour: час
         :param minute: минута
         :param n: интервал (минут)
         :return: HistoricCandle
         """
-        previous_minutes = self.get_n_minutes(hour, minute, n)
-
-        open_ = None
-        high = 0
-        low = 1000000000
-        close = f2q(0)
-        volume = 0
-        is_complete = True
-
         now = self.time.now()
-
-        for time_pair in previous_minutes:
-            t1: HistoricCandle | None = self.candles_1_min_dict.get(time_pair, None)
-            if t1 is None:
-                continue
-            if self.time_is_greater(time_pair, now):
-                is_complete = False
-                continue
-            if open_ is None:
-                open_ = t1.open
-            high = max(high, self.q2f(t1.high))
-            low = min(low, self.q2f(t1.low))
-            close = t1.close
-            volume += t1.volume
+        open_, high, low, close, volume, is_complete = self.day_candles.get_aggregated(
+            hour * 60 + minute, n, MinuteCandlesDay.get_index(now))
 
         if open_ is None:
-            open_ = f2q(0)
+            open_ = 0
+            close = 0
+            low = 1000000000
 
         return HistoricCandle(
             high=f2q(high),
             low=f2q(low),
-            open=open_,
-            close=close,
+            open=f2q(open_),
+            close=f2q(close),
             volume=volume,
             time=datetime(now.year, now.month, now.day, hour, minute),
             is_complete=is_complete,
         )
 
-    def order_is_executed(self, order: PostOrderResponse) -> Tuple[bool, OrderState | None]:
+    def order_is_executed(self, order: OrderRecord) -> Tuple[bool, OrderRecord | None]:
 
         # покупка по рыночной цене
         if order.order_type == OrderType.ORDER_TYPE_MARKET:
@@ -341,9 +340,17 @@ class ClientTestEnvHelper(AbstractProxyClient):
     def cancel_order(self, order) -> bool:
         if order.order_id in self.orders:
             del self.orders[order.order_id]
+            self.matching.remove(order.order_id)
             return True
         return False
 
+    def match_orders(self, low_buy_price: float, high_sell_price: float) -> list[str]:
+        """
+        Исполняет лимитные заявки, задетые свечой: покупки с ценой >= low, продажи с ценой <= high
+        :return: id исполненных заявок
+        """
+        return self.matching.match(low_buy_price, high_sell_price)
+
     def get_active_orders(self):
         return [order for order_id, order in self.orders.items() if order_id not in self.executed_orders_ids]
 
@@ -381,19 +388,18 @@ class ClientTestEnvHelper(AbstractProxyClient):
         #     ))
 
         i_lot = self.instrument.lot
-        return PostOrderResponse(
+        return OrderRecord(
             order_id=self.get_new_order_id(),
             execution_report_status=OrderExecutionReportStatus.EXECUTION_REPORT_STATUS_FILL,
             order_type=OrderType.ORDER_TYPE_MARKET,
             direction=direction,
             lots_requested=lots,
             lots_executed=lots,
-            initial_order_price=self.float_to_money_value(lots * self.current_price * i_lot),
-            executed_order_price=self.float_to_money_value(self.current_price),
-            total_order_amount=self.float_to_money_value(lots * self.current_price * i_lot),
-            initial_commission=self.float_to_money_value(lots * self.current_price * i_lot * self.commission),
-            executed_commission=self.float_to_money_value(0),  # как в оригинале
-            initial_security_price=self.float_to_money_value(self.current_price),
+            initial_order_price=self.money_value(lots * self.current_price * i_lot),
+            executed_order_price=self.money_value(self.current_price),
+            initial_commission=self.money_value(lots * self.current_price * i_lot * self.commission),
+            executed_commission=0.,  # как в оригинале
+            initial_security_price=self.money_value(self.current_price),
         )
 
     def get_post_order_response_bestprice(self, direction, lots):
@@ -423,19 +429,18 @@ class ClientTestEnvHelper(AbstractProxyClient):
         #     )
         # )
         i_lot = self.instrument.lot
-        return PostOrderResponse(
+        return OrderRecord(
             order_id=self.get_new_order_id(),
             execution_report_status=OrderExecutionReportStatus.EXECUTION_REPORT_STATUS_FILL,
             order_type=OrderType.ORDER_TYPE_BESTPRICE,
             direction=direction,
             lots_requested=lots,
             lots_executed=lots,
-            initial_order_price=self.float_to_money_value(lots * self.current_price * i_lot),
-            executed_order_price=self.float_to_money_value(self.current_price),
-            total_order_amount=self.float_to_money_value(lots * self.current_price * i_lot),
-            initial_commission=self.float_to_money_value(lots * self.current_price * i_lot * self.commission),
-            executed_commission=self.float_to_money_value(0),  # как в оригинале
-            initial_security_price=self.float_to_money_value(self.current_price),
+            initial_order_price=self.money_value(lots * self.current_price * i_lot),
+            executed_order_price=self.money_value(self.current_price),
+            initial_commission=self.money_value(lots * self.current_price * i_lot * self.commission),
+            executed_commission=0.,  # как в оригинале
+            initial_security_price=self.money_value(self.current_price),
         )
 
     def get_post_order_response_limit(self, direction, lots, price):
@@ -460,22 +465,21 @@ class ClientTestEnvHelper(AbstractProxyClient):
         #     server_time=datetime.datetime(2024, 4, 22, 14, 13, 59, 82995, tzinfo=datetime.timezone.utc)
         #   ))
         i_lot = self.instrument.lot
-        return PostOrderResponse(
+        return OrderRecord(
             order_id=self.get_new_order_id(),
             execution_report_status=OrderExecutionReportStatus.EXECUTION_REPORT_STATUS_NEW,
             order_type=OrderType.ORDER_TYPE_LIMIT,
             direction=direction,
             lots_requested=lots,
             lots_executed=0,
-            initial_order_price=self.float_to_money_value(lots * price * i_lot),
-            executed_order_price=self.float_to_money_value(0),
-            total_order_amount=self.float_to_money_value(0),
-            initial_commission=self.float_to_money_value(lots * price * i_lot * self.commission),
-            executed_commission=self.float_to_money_value(0),
-            initial_security_price=self.float_to_money_value(price),
+            initial_order_price=self.money_value(lots * price * i_lot),
+            executed_order_price=0.,
+            initial_commission=self.money_value(lots * price * i_lot * self.commission),
+            executed_commission=0.,
+            initial_security_price=self.money_value(price),
         )
 
-    def get_order_state(self, order: PostOrderResponse) -> OrderState:
+    def get_order_state(self, order: OrderRecord) -> OrderRecord:
         # OrderState(
         #   order_id='R252613501',
         #   execution_report_status= < OrderExecutionReportStatus.EXECUTION_REPORT_STATUS_FILL: 1 >,
@@ -531,28 +535,27 @@ class ClientTestEnvHelper(AbstractProxyClient):
         is_executed = (order.order_id in self.executed_orders_ids
                        or order.order_type == OrderType.ORDER_TYPE_MARKET
                        or order.order_type == OrderType.ORDER_TYPE_BESTPRICE)
-        price_0 = f2q(0)
 
         if order.lots_requested == 0 or self.instrument.lot == 0:
-            avg_init_price = price_0
+            avg_init_price = 0.
         else:
-            avg_init_price = self.float_to_money_value(
-                self.q2f(order.initial_order_price) / (order.lots_requested * self.instrument.lot))
+            avg_init_price = self.money_value(
+                round(order.initial_order_price, self.instrument.round_signs)
+                / (order.lots_requested * self.instrument.lot))
 
-        return OrderState(
+        return OrderRecord(
             order_id=order.order_id,
             order_type=order.order_type,
             direction=order.direction,
             lots_requested=order.lots_requested,
             lots_executed=order.lots_requested if is_executed else 0,
             initial_order_price=order.initial_order_price,
-            executed_order_price=order.initial_order_price if is_executed else price_0,
-            total_order_amount=order.initial_order_price if is_executed else price_0,
-            average_position_price=avg_init_price if is_executed else price_0,
+            executed_order_price=order.initial_order_price if is_executed else 0.,
+            average_position_price=avg_init_price if is_executed else 0.,
             initial_commission=order.initial_commission,
-            executed_commission=order.initial_commission if is_executed else price_0,
+            executed_commission=order.initial_commission if is_executed else 0.,
             initial_security_price=order.initial_security_price,
-            service_commission=self.float_to_money_value(0),
             execution_report_status=OrderExecutionReportStatus.EXECUTION_REPORT_STATUS_FILL
             if is_executed else OrderExecutionReportStatus.EXECUTION_REPORT_STATUS_NEW,
+            is_state=True,
         )
@@ -8,16 +8,19 @@ class LoggerTestEnvHelper(AbstractLoggerHelper):
         self.time = time_helper
         self.do_printing = do_printing
 
-    def info(self, message):
+    def is_enabled(self) -> bool:
+        return self.do_printing
+
+    def info(self, message, *args):
         if not self.do_printing:
             return
         time = self.time.current_time
-        print(f"{time.strftime('%H:%M')} - {message}")
+        print(f"{time.strftime('%H:%M')} - {self.format_message(message, args)}")
 
-    def error(self, message):
-        self.last_error = message
+    def error(self, message, *args):
+        self.last_error = self.format_message(message, args)
         self.error_cnt += 1
-        self.info(message)
+        self.info(self.last_error)
 
-    def debug(self, message):
-        self.info(message)
+    def debug(self, message, *args):
+        self.info(message, *args)
@@ -0,0 +1,95 @@
+from bisect import bisect_left, bisect_right, insort
+
+from tinkoff.invest import OrderDirection
+
+
+class MatchingEngine:
+    """
+    Стакан лимитных заявок тестового клиента.
+    Заявки лежат по ценовым уровням в отсортированных списках цен,
+    так что все уровни, задетые свечой, исполняются за одну операцию без перебора всех заявок
+    """
+
+    def __init__(self):
+        # отсортированные по возрастанию цены уровней
+        self.buy_prices: list[float] = []
+        self.sell_prices: list[float] = []
+
+        # цена -> {order_id: None}. dict, чтобы сохранять порядок выставления
+        self.buy_levels: dict[float, dict[str, None]] = {}
+        self.sell_levels: dict[float, dict[str, None]] = {}
+
+        # order_id -> (направление, цена) для активных заявок
+        self.active: dict[str, tuple[int, float]] = {}
+
+        self.executed_ids: set[str] = set()
+
+    def add(self, order_id: str, direction: int, price: float):
+        if direction == OrderDirection.ORDER_DIRECTION_BUY:
+            prices, levels = self.buy_prices, self.buy_levels
+        else:
+            prices, levels = self.sell_prices, self.sell_levels
+
+        if price not in levels:
+            levels[price] = {}
+            insort(prices, price)
+        levels[price][order_id] = None
+        self.active[order_id] = (direction, price)
+
+    def remove(self, order_id: str) -> bool:
+        """Снимает активную заявку. False - такой нет (уже исполнена или не выставлялась)"""
+        if order_id not in self.active:
+            return False
+
+        direction, price = self.active.pop(order_id)
+        if direction == OrderDirection.ORDER_DIRECTION_BUY:
+            prices, levels = self.buy_prices, self.buy_levels
+        else:
+            prices, levels = self.sell_prices, self.sell_levels
+
+        level = levels[price]
+        del level[order_id]
+        if not level:
+            del levels[price]
+            del prices[bisect_left(prices, price)]
+
+        return True
+
+    def match(self, low: float, high: float) -> list[str]:
+        """
+        Исполняет все заявки на покупку с ценой >= low и на продажу с ценой <= high
+        :return: id исполненных заявок
+        """
+        out = []
+
+        # покупка: уровни от low и выше
+        index = bisect_left(self.buy_prices, low)
+        if index < len(self.buy_prices):
+            for price in self.buy_prices[index:]:
+                out.extend(self.buy_levels.pop(price))
+            del self.buy_prices[index:]
+
+        # продажа: уровни до high включительно
+        index = bisect_right(self.sell_prices, high)
+        if index > 0:
+            for price in self.sell_prices[:index]:
+                out.extend(self.sell_levels.pop(price))
+            del self.sell_prices[:index]
+
+        for order_id in out:
+            del self.active[order_id]
+        self.executed_ids.update(out)
+
+        return out
+
+    def execute(self, order_id: str):
+        """Принудительно помечает заявку исполненной"""
+        self.remove(order_id)
+        self.executed_ids.add(order_id)
+
+    def get_bounds(self) -> tuple[float | None, float | None]:
+        """Максимальная цена активной заявки на покупку и минимальная на продажу"""
+        return (
+            self.buy_prices[-1] if self.buy_prices else None,
+            self.sell_prices[0] if self.sell_prices else None,
+        )
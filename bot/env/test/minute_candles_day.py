@@ -0,0 +1,205 @@
+from datetime import datetime
+from typing import Callable
+
+import numpy as np
+from tinkoff.invest import HistoricCandle, Quotation
+
+from app.helper import f2q
+
+
+class MinuteCandlesDay:
+    """
+    Минутные свечи одного дня в виде массивов на 1440 минут.
+    Индекс минуты - hour * 60 + minute (время в UTC), наличие свечи отмечается в mask
+    """
+
+    MINUTES_IN_DAY = 1440
+
+    # объем массивов дня вместе с таблицами для агрегированных свечей, считается один раз
+    full_nbytes: int | None = None
+
+    def __init__(self):
+        self.open = np.zeros(self.MINUTES_IN_DAY, dtype=np.float64)
+        self.high = np.zeros(self.MINUTES_IN_DAY, dtype=np.float64)
+        self.low = np.zeros(self.MINUTES_IN_DAY, dtype=np.float64)
+        self.close = np.zeros(self.MINUTES_IN_DAY, dtype=np.float64)
+        self.volume = np.zeros(self.MINUTES_IN_DAY, dtype=np.int64)
+        self.mask = np.zeros(self.MINUTES_IN_DAY, dtype=np.bool_)
+
+        # количество свечей в исходном ответе. по нему определяется наличие данных за день
+        self.candles_cnt = 0
+
+        # структуры для агрегированных свечей, строятся при первом запросе
+        self._high_table: list[np.ndarray] | None = None
+        self._low_table: list[np.ndarray] | None = None
+        self._volume_sum: np.ndarray | None = None
+        self._mask_sum: np.ndarray | None = None
+        self._next_index: np.ndarray | None = None
+        self._prev_index: np.ndarray | None = None
+
+    @classmethod
+    def from_candles(cls, candles: list[HistoricCandle], q2f: Callable[[Quotation], float]) -> 'MinuteCandlesDay':
+        """
+        Собирает массивы из списка свечей
+        :param candles: минутные свечи за день
+        :param q2f: функция перевода Quotation в float с округлением по инструменту
+        """
+        day = cls()
+        day.candles_cnt = len(candles)
+
+        for candle in candles:
+            index = cls.get_index(candle.time)
+            day.open[index] = q2f(candle.open)
+            day.high[index] = q2f(candle.high)
+            day.low[index] = q2f(candle.low)
+            day.close[index] = q2f(candle.close)
+            day.volume[index] = candle.volume
+            day.mask[index] = True
+
+        return day
+
+    @classmethod
+    def from_columns(cls, columns: dict[str, np.ndarray], price_f: Callable[[float], float]) -> 'MinuteCandlesDay':
+        """
+        Собирает массивы из колонок архива свечей (TickerCache.get_candles_columns)
+        :param columns: time - минута дня, open/high/low/close, volume
+        :param price_f: перевод цены из архива в цену свечи, так же как через HistoricCandle и q2f
+        """
+        day = cls()
+        day.candles_cnt = len(columns['time'])
+        if not day.candles_cnt:
+            return day
+
+        index = columns['time'].astype(np.intp)
+        day.open[index] = [price_f(x) for x in columns['open'].tolist()]
+        day.high[index] = [price_f(x) for x in columns['high'].tolist()]
+        day.low[index] = [price_f(x) for x in columns['low'].tolist()]
+        day.close[index] = [price_f(x) for x in columns['close'].tolist()]
+        day.volume[index] = columns['volume']
+        day.mask[index] = True
+
+        return day
+
+    @staticmethod
+    def get_index(dt: datetime) -> int:
+        return dt.hour * 60 + dt.minute
+
+    def has(self, index: int) -> bool:
+        return bool(self.mask[index])
+
+    def get_open(self, index: int) -> float:
+        return float(self.open[index])
+
+    def get_high(self, index: int) -> float:
+        return float(self.high[index])
+
+    def get_low(self, index: int) -> float:
+        return float(self.low[index])
+
+    def get_close(self, index: int) -> float:
+        return float(self.close[index])
+
+    def get_volume(self, index: int) -> int:
+        return int(self.volume[index])
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Объем для лимита LocalCache: массивы дня и таблицы агрегированных свечей, даже если они еще не построены.
+        Так размер дня в кэше не меняется после первого запроса агрегированной свечи
+        """
+        if MinuteCandlesDay.full_nbytes is None:
+            day = MinuteCandlesDay()
+            day.build_aggregates()
+            arrays = [day.open, day.high, day.low, day.close, day.volume, day.mask, day._volume_sum, day._mask_sum,
+                      day._next_index, day._prev_index, *day._high_table, *day._low_table]
+            MinuteCandlesDay.full_nbytes = sum(array.nbytes for array in arrays)
+        return MinuteCandlesDay.full_nbytes
+
+    def build_aggregates(self):
+        """
+        Префиксные суммы объема и наличия свечей, ближайшие свечи слева/справа
+        и разреженные таблицы (sparse table) максимумов high и минимумов low.
+        После этого любая агрегированная свеча считается за O(1)
+        """
+        n = self.MINUTES_IN_DAY
+        indexes = np.arange(n)
+
+        self._volume_sum = np.concatenate(([0], np.cumsum(self.volume)))
+        self._mask_sum = np.concatenate(([0], np.cumsum(self.mask)))
+
+        # ближайшая свеча не раньше i и не позже i. n и -1 - свечи нет
+        next_index = np.where(self.mask, indexes, n)
+        self._next_index = np.minimum.accumulate(next_index[::-1])[::-1]
+        prev_index = np.where(self.mask, indexes, -1)
+        self._prev_index = np.maximum.accumulate(prev_index)
+
+        # пустые минуты не должны влиять на максимум и минимум
+        high = np.where(self.mask, self.high, 0.)
+        low = np.where(self.mask, self.low, np.inf)
+        self._high_table = [high]
+        self._low_table = [low]
+        step = 1
+        while step * 2 <= n:
+            prev_high = self._high_table[-1]
+            prev_low = self._low_table[-1]
+            self._high_table.append(np.maximum(prev_high[:-step], prev_high[step:]))
+            self._low_table.append(np.minimum(prev_low[:-step], prev_low[step:]))
+            step *= 2
+
+    def get_aggregated(self, start_index: int, n: int, now_index: int) -> tuple:
+        """
+        Свеча из n минут, начиная с start_index (с переходом через полночь), без минут позже now_index
+        :return: (open, high, low, close, volume, is_complete). open None - свечей в интервале нет,
+                 high 0 и low inf - тоже
+        """
+        if self._high_table is None:
+            self.build_aggregates()
+
+        open_ = None
+        close = None
+        high = 0.
+        low = np.inf
+        volume = 0
+        is_complete = True
+
+        end_index = start_index + n
+        segments = [(start_index, min(end_index, self.MINUTES_IN_DAY))]
+        if end_index > self.MINUTES_IN_DAY:
+            segments.append((0, end_index - self.MINUTES_IN_DAY))
+
+        for seg_from, seg_to in segments:
+            # минуты, которые еще не наступили
+            valid_to = max(seg_from, min(seg_to, now_index + 1))
+            if self._mask_sum[seg_to] - self._mask_sum[valid_to] > 0:
+                is_complete = False
+
+            if valid_to <= seg_from or self._mask_sum[valid_to] - self._mask_sum[seg_from] == 0:
+                continue
+
+            if open_ is None:
+                open_ = float(self.open[self._next_index[seg_from]])
+            close = float(self.close[self._prev_index[valid_to - 1]])
+            volume += int(self._volume_sum[valid_to] - self._volume_sum[seg_from])
+
+            level = (valid_to - seg_from).bit_length() - 1
+            right_from = valid_to - (1 << level)
+            high = max(high, float(max(self._high_table[level][seg_from], self._high_table[level][right_from])))
+            low = min(low, float(min(self._low_table[level][seg_from], self._low_table[level][right_from])))
+
+        return open_, high, low, close, volume, is_complete
+
+    def get_candle(self, index: int, dt: datetime) -> HistoricCandle | None:
+        """Свеча в формате API. Для горячего цикла не использовать - только для совместимости"""
+        if not self.has(index):
+            return None
+
+        return HistoricCandle(
+            open=f2q(self.get_open(index)),
+            high=f2q(self.get_high(index)),
+            low=f2q(self.get_low(index)),
+            close=f2q(self.get_close(index)),
+            volume=self.get_volume(index),
+            time=dt.replace(second=0, microsecond=0),
+            is_complete=True,
+        )
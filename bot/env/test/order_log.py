@@ -0,0 +1,54 @@
+from datetime import datetime
+
+from app.constants import HistoryOrderType
+from app.models import Order
+
+
+class OrderLog:
+    """
+    Журнал операций тестового окружения.
+    Поля хранятся параллельными списками, модели Order создаются только по запросу (для графиков)
+    """
+
+    def __init__(self):
+        self.runs: list[int] = []
+        self.types: list[int] = []
+        self.datetimes: list[datetime] = []
+        self.prices: list[float] = []
+        self.commissions: list[float | None] = []
+        self.totals: list[float] = []
+        self.counts: list[int] = []
+
+        # количество операций с реальными покупками/продажами, а не просто заявок
+        self.executed_cnt = 0
+
+    def __len__(self):
+        return len(self.types)
+
+    def add(self, run: int, type_: int, datetime_: datetime, price: float, total: float, count: int,
+            commission: float | None = None):
+        self.runs.append(run)
+        self.types.append(type_)
+        self.datetimes.append(datetime_)
+        self.prices.append(price)
+        self.commissions.append(commission)
+        self.totals.append(total)
+        self.counts.append(count)
+
+        if type_ in HistoryOrderType.EXECUTED_TYPES:
+            self.executed_cnt += 1
+
+    def to_orders(self) -> list[Order]:
+        """Журнал в виде списка моделей Order"""
+        return [
+            Order(
+                run=self.runs[i],
+                type=self.types[i],
+                datetime=self.datetimes[i],
+                price=self.prices[i],
+                commission=self.commissions[i],
+                total=self.totals[i],
+                count=self.counts[i],
+            )
+            for i in range(len(self))
+        ]
@@ -1 +1,2 @@
+from bot.helper.order_record import OrderRecord
 from bot.helper.order_helper import OrderHelper
@@ -1,11 +1,12 @@
 from tinkoff.invest import PostOrderResponse, OrderState
 
 from app.helper import q2f
+from bot.helper.order_record import OrderRecord
 
 
 class OrderHelper:
     @staticmethod
-    def get_avg_price(order: PostOrderResponse | OrderState) -> float:
+    def get_avg_price(order: PostOrderResponse | OrderState | OrderRecord) -> float:
         """
         Отдает среднюю цену для одного лота в заказе
         Если есть executed - её, нет - вычисляет из initial
@@ -13,6 +14,12 @@ class OrderHelper:
         :param order:
         :return:
         """
+        if isinstance(order, OrderRecord):
+            price = round(order.average_position_price if order.is_state else order.executed_order_price, 2)
+            if price > 0:
+                return price
+            return round(order.initial_security_price, 2)
+
         if isinstance(order, PostOrderResponse):
             price = q2f(order.executed_order_price)
         elif isinstance(order, OrderState):
@@ -26,7 +33,7 @@ class OrderHelper:
         return q2f(order.initial_security_price)
 
     @staticmethod
-    def get_lots(order: PostOrderResponse | OrderState, use_executed_lots=False) -> int:
+    def get_lots(order: PostOrderResponse | OrderState | OrderRecord, use_executed_lots=False) -> int:
         """
         Отдает количество лотов в заказе.
         Отдает округленное частное от общей суммы и цены за 1 -
@@ -35,17 +42,20 @@ class OrderHelper:
         :param order:
         :return:
         """
-        if use_executed_lots and isinstance(order, OrderState):
+        if use_executed_lots and (isinstance(order, OrderState)
+                                  or isinstance(order, OrderRecord) and order.is_state):
             return order.lots_executed
         price = OrderHelper.get_avg_price(order)
         if price == 0:
             # print(f"fail zero {order.initial_order_price} {price}")
             return 1
-        lots = round(q2f(order.initial_order_price) / price)
+        initial_order_price = round(order.initial_order_price, 2) if isinstance(order, OrderRecord) \
+            else q2f(order.initial_order_price)
+        lots = round(initial_order_price / price)
         return lots if lots > 0 else 1
 
     @staticmethod
-    def get_commission(order: PostOrderResponse | OrderState):
+    def get_commission(order: PostOrderResponse | OrderState | OrderRecord):
         """
         Отдает комиссию для заказа
         Комиссия учитывается полная - для всех лотов в заказе сразу
@@ -55,6 +65,12 @@ class OrderHelper:
         :param order:
         :return:
         """
+        if isinstance(order, OrderRecord):
+            commission = round(order.executed_commission, 2)
+            if commission == 0:
+                commission = round(order.initial_commission, 2)
+            return commission
+
         commission = q2f(order.executed_commission)
         if commission == 0:
             commission = q2f(order.initial_commission)
@@ -0,0 +1,58 @@
+class OrderRecord:
+    """
+    Легкая замена PostOrderResponse и OrderState для тестового окружения.
+    Денежные поля - float со значением, которое хранил бы MoneyValue (units + nano * 1e-9, без округления),
+    так что OrderHelper считает по ним ровно то же, что и по объектам API
+    """
+
+    __slots__ = (
+        'order_id',
+        'order_type',
+        'direction',
+        'execution_report_status',
+        'lots_requested',
+        'lots_executed',
+        'initial_order_price',
+        'executed_order_price',
+        'average_position_price',
+        'initial_commission',
+        'executed_commission',
+        'initial_security_price',
+        'is_state',
+    )
+
+    def __init__(
+            self,
+            order_id: str,
+            order_type: int,
+            direction: int,
+            execution_report_status: int,
+            lots_requested: int,
+            lots_executed: int,
+            initial_order_price: float,
+            executed_order_price: float,
+            initial_commission: float,
+            executed_commission: float,
+            initial_security_price: float,
+            average_position_price: float = 0.,
+            is_state: bool = False,
+    ):
+        self.order_id = order_id
+        self.order_type = order_type
+        self.direction = direction
+        self.execution_report_status = execution_report_status
+        self.lots_requested = lots_requested
+        self.lots_executed = lots_executed
+        self.initial_order_price = initial_order_price
+        self.executed_order_price = executed_order_price
+        self.average_position_price = average_position_price
+        self.initial_commission = initial_commission
+        self.executed_commission = executed_commission
+        self.initial_security_price = initial_security_price
+        # True - аналог OrderState (статус заявки), False - аналог PostOrderResponse
+        self.is_state = is_state
+
+    def __repr__(self):
+        return (f"OrderRecord(order_id={self.order_id}, order_type={self.order_type}, "
+                f"direction={self.direction}, status={self.execution_report_status}, "
+                f"lots={self.lots_executed}/{self.lots_requested}, price={self.initial_security_price})")
@@ -4,7 +4,7 @@ from tinkoff.invest import PostOrderResponse, OrderType, OrderDirection, OrderSt
 
 from app import AppConfig
 from bot.env import AbstractProxyClient, AbstractAccountingHelper
-from bot.helper import OrderHelper
+from bot.helper import OrderHelper, OrderRecord
 
 
 class TradeAbstractStrategy(ABC):
@@ -24,16 +24,16 @@ class TradeAbstractStrategy(ABC):
         self.client: AbstractProxyClient = bot.client
         self.accounting: AbstractAccountingHelper = bot.accounting
 
-        self.active_buy_orders: dict[str, PostOrderResponse] = {}  # Массив активных заявок на покупку
-        self.active_sell_orders: dict[str, PostOrderResponse] = {}  # Массив активных заявок на продажу
+        self.active_buy_orders: dict[str, PostOrderResponse | OrderRecord] = {}  # Массив активных заявок на покупку
+        self.active_sell_orders: dict[str, PostOrderResponse | OrderRecord] = {}  # Массив активных заявок на продажу
 
         self.start_price: float = 0
         self.start_count: int = 0
         self.update_start_price_and_counter()
         self.cached_current_price: float | None = self.start_price
 
-    def log(self, message, repeat=False):
-        self.logger.log(message, repeat)
+    def log(self, message, *args, repeat=False):
+        self.logger.log(message, *args, repeat=repeat)
 
     def update_start_price_and_counter(self):
         self.start_price = self.update_cached_price() or 0
@@ -77,7 +77,7 @@ class TradeAbstractStrategy(ABC):
             self.accounting.add_deal_by_order(order)
 
             # todo del #332
-            self.log(f"!!! ORDER_TYPE_MARKET operation {order}")
+            self.log("!!! ORDER_TYPE_MARKET operation %s", order)
 
             if direction == OrderDirection.ORDER_DIRECTION_BUY:
                 prefix = "BUY MARKET executed"
@@ -88,7 +88,7 @@ class TradeAbstractStrategy(ABC):
         elif order_type == OrderType.ORDER_TYPE_BESTPRICE:
 
             # todo del #332
-            self.log(f"!!! ORDER_TYPE_MARKET operation {order}")
+            self.log("!!! ORDER_TYPE_MARKET operation %s", order)
 
             self.accounting.add_deal_by_order(order)
             if direction == OrderDirection.ORDER_DIRECTION_BUY:
@@ -106,7 +106,7 @@ class TradeAbstractStrategy(ABC):
                 self.active_sell_orders[order.order_id] = order
                 prefix = "Sell order set"
 
-        self.log(f"{prefix}, {lots} x {avg_price} {self.get_cur_count_for_log()}")
+        self.log(lambda: f"{prefix}, {lots} x {avg_price} {self.get_cur_count_for_log()}")
 
         return order
 
@@ -124,12 +124,12 @@ class TradeAbstractStrategy(ABC):
     def buy_limit(self, price: float, lots: int = 1, retry=RETRY_DEFAULT) -> PostOrderResponse | None:
         return self.place_order(OrderType.ORDER_TYPE_LIMIT, OrderDirection.ORDER_DIRECTION_BUY, lots, price, retry)
 
-    def apply_order_execution(self, order: OrderState):
+    def apply_order_execution(self, order: OrderState | OrderRecord):
         lots = OrderHelper.get_lots(order)
         avg_price = self.get_order_avg_price(order)
         type_text = 'BUY' if order.direction == OrderDirection.ORDER_DIRECTION_BUY else 'SELL'
         self.accounting.add_deal_by_order(order)
-        self.log(f"{type_text} order executed, {lots} x {avg_price} {self.get_cur_count_for_log()}")
+        self.log(lambda: f"{type_text} order executed, {lots} x {avg_price} {self.get_cur_count_for_log()}")
 
     def get_existing_buy_order_prices(self) -> list[float]:
         return [self.get_order_avg_price(order)
@@ -151,13 +151,13 @@ class TradeAbstractStrategy(ABC):
         for order_id, order in self.active_sell_orders.copy().items():
             self.cancel_order(order)
 
-    def remove_order_from_active_list(self, order: PostOrderResponse | OrderState):
+    def remove_order_from_active_list(self, order: PostOrderResponse | OrderState | OrderRecord):
         if order.order_id in self.active_buy_orders:
             del self.active_buy_orders[order.order_id]
         if order.order_id in self.active_sell_orders:
             del self.active_sell_orders[order.order_id]
 
-    def cancel_order(self, order: PostOrderResponse):
+    def cancel_order(self, order: PostOrderResponse | OrderRecord):
         self.remove_order_from_active_list(order)
         res = self.client.cancel_order(order)
         self.accounting.del_order(order)
@@ -171,8 +171,8 @@ class TradeAbstractStrategy(ABC):
                     self.apply_order_execution(order_state)
                     self.remove_order_from_active_list(order)
                 else:
-                    self.log(f"Сработало частичное исполнение лимитной заявки {order_state.lots_executed} / "
-                             f"{order_state.lots_requested}")
+                    self.log("Сработало частичное исполнение лимитной заявки %s / %s",
+                             order_state.lots_executed, order_state.lots_requested)
                     # зарегистрировать частичное исполнение
                     self.accounting.add_deal_by_order(order_state, True)
                     # и откатить его
@@ -182,10 +182,9 @@ class TradeAbstractStrategy(ABC):
                         self.buy(lots_executed)
 
         if res:
-            prefix = "Buy" if order.direction == OrderDirection.ORDER_DIRECTION_BUY else "Sell"
-            lots = OrderHelper.get_lots(order)
-            avg_price = self.get_order_avg_price(order)
-            self.log(f"{prefix} order canceled, {lots} x {avg_price} {self.get_cur_count_for_log()}")
+            self.log(lambda: f"{'Buy' if order.direction == OrderDirection.ORDER_DIRECTION_BUY else 'Sell'} "
+                             f"order canceled, {OrderHelper.get_lots(order)} x {self.get_order_avg_price(order)} "
+                             f"{self.get_cur_count_for_log()}")
 
     def cancel_orders_by_limits(self):
         current_price = self.cached_current_price
@@ -193,29 +192,68 @@ class TradeAbstractStrategy(ABC):
             self.logger.error("Не могу закрыть заявки, нулевая цена")
             return
 
+        for order in self.get_orders_out_of_limits(current_price):
+            self.cancel_order(order)
+
+    def get_orders_out_of_limits(self, current_price: float) -> list[PostOrderResponse | OrderRecord]:
+        """Активные заявки, которые надо закрыть, так как они дальше порогов от текущей цены"""
+        out = []
+
         # берем текущую цену + сдвиг
         if self.config.threshold_buy_steps:
             threshold_price = (current_price - self.config.step_size * self.config.threshold_buy_steps)
 
             # перебираем активные заявки на покупку и закрываем всё, что ниже
-            for order_id, order in self.active_buy_orders.copy().items():
+            for order_id, order in self.active_buy_orders.items():
                 order_price = self.get_order_avg_price(order)
                 if order_price <= threshold_price:
-                    self.cancel_order(order)
+                    out.append(order)
 
         if self.config.threshold_sell_steps:
             threshold_price = (current_price + self.config.step_size * self.config.threshold_sell_steps)
 
             # перебираем активные заявки на продажу и закрываем всё, что ниже
-            for order_id, order in self.active_sell_orders.copy().items():
+            for order_id, order in self.active_sell_orders.items():
                 order_price = self.get_order_avg_price(order)
                 if order_price >= threshold_price:
-                    self.cancel_order(order)
+                    out.append(order)
+
+        return out
+
+    def is_idle(self, current_price: float) -> bool:
+        """
+        True если при такой цене и без исполнения заявок итерация не закроет и не выставит ни одной заявки
+        """
+        # заявки, исполненные пока бот спал, разберет update_orders_status на ближайшей итерации
+        if self.has_unprocessed_orders():
+            return False
+
+        if self.get_orders_out_of_limits(current_price):
+            return False
+
+        return self.is_placement_idle(current_price)
+
+    def has_unprocessed_orders(self) -> bool:
+        """True если среди своих активных заявок есть ушедшие из активных на стороне клиента"""
+        active_orders = self.client.get_active_orders()
+        if active_orders is None:
+            return True
+
+        active_order_ids = {order.order_id for order in active_orders}
+        return any(order_id not in active_order_ids
+                   for order_id in [*self.active_buy_orders, *self.active_sell_orders])
+
+    def is_placement_idle(self, current_price: float) -> bool:
+        """
+        True если place_buy_orders и place_sell_orders при такой цене ничего не изменят.
+        По умолчанию False - стратегия не умеет это определять и минуты не пропускаются
+        """
+        return False
 
     def round(self, price) -> float:
         return self.client.round(price)
 
-    def get_order_avg_price(self, order: PostOrderResponse | OrderState) -> float:
+    def get_order_avg_price(self, order: PostOrderResponse | OrderState | OrderRecord) -> float:
         return self.round(OrderHelper.get_avg_price(order))
 
     def equivalent_prices(self, quotation_price: Quotation | MoneyValue, float_price: float) -> bool:
@@ -286,11 +324,10 @@ class TradeAbstractStrategy(ABC):
         # требуемое изменение портфеля
         need_operations = self.config.step_base_cnt * self.config.step_lots - self.get_current_count()
 
-        max_portfolio_size = self.get_max_start_depo()
-        self.log(f"START \n"
-                 f"     need_operations - {need_operations}\n"
-                 f"     start_price - {self.start_price} {self.client.instrument.currency}\n"
-                 f"     max_port - {max_portfolio_size} {self.client.instrument.currency}"
+        self.log(lambda: f"START \n"
+                         f"     need_operations - {need_operations}\n"
+                         f"     start_price - {self.start_price} {self.client.instrument.currency}\n"
+                         f"     max_port - {self.get_max_start_depo()} {self.client.instrument.currency}"
                  )
 
         # докупаем недостающие по рыночной цене
@@ -307,12 +344,16 @@ class TradeAbstractStrategy(ABC):
         """Возвращает True если нужно выходить в 0 при завершении работы бота"""
         return False
 
-    def lower_limit(self) -> float | None:
-        if self.cached_current_price is None:
+    def lower_limit(self, current_price: float | None = None) -> float | None:
+        if current_price is None:
+            current_price = self.cached_current_price
+        if current_price is None:
             return None
-        return self.round(self.cached_current_price * (1 - AppConfig.ALLOWED_ORDER_RANGE))
+        return self.round(current_price * (1 - AppConfig.ALLOWED_ORDER_RANGE))
 
-    def upper_limit(self) -> float | None:
-        if self.cached_current_price is None:
+    def upper_limit(self, current_price: float | None = None) -> float | None:
+        if current_price is None:
+            current_price = self.cached_current_price
+        if current_price is None:
             return None
-        return self.round(self.cached_current_price * (1 + AppConfig.ALLOWED_ORDER_RANGE))
+        return self.round(current_price * (1 + AppConfig.ALLOWED_ORDER_RANGE))
@@ -35,9 +35,9 @@ class TradeNormalStrategy(TradeAbstractStrategy):
                     self.apply_order_execution(order_state)
                 self.remove_order_from_active_list(order)
 
-        self.log(f"Orders: "
-                 f"buy {self.get_existing_buy_order_prices()}, "
-                 f"sell {self.get_existing_sell_order_prices()} ")
+        self.log(lambda: f"Orders: "
+                         f"buy {self.get_existing_buy_order_prices()}, "
+                         f"sell {self.get_existing_sell_order_prices()} ")
 
     def place_buy_orders(self):
         current_price = self.cached_current_price
@@ -45,6 +45,12 @@ class TradeNormalStrategy(TradeAbstractStrategy):
             self.logger.error("Не могу выставить заявки на покупку, нулевая цена")
             return
 
+        # Ставим заявки на покупку
+        for price in self.get_buy_prices_to_place(current_price):
+            self.buy_limit(price, self.config.step_lots)
+
+    def get_buy_prices_to_place(self, current_price: float) -> list[float]:
+        """Цены заявок на покупку, которые нужно выставить при такой цене"""
         current_buy_orders_cnt = len(self.active_buy_orders)
         current_step_cnt = self.get_current_step_count()
         current_price = math.floor(current_price / self.config.step_size) * self.config.step_size
@@ -59,21 +65,29 @@ class TradeNormalStrategy(TradeAbstractStrategy):
         # Исключаем цены, по которым уже выставлены заявки на покупку
         existing_order_prices = self.get_existing_buy_order_prices()
 
-        # Ставим заявки на покупку
+        out = []
         for price in target_prices:
             if current_buy_orders_cnt + current_step_cnt >= self.config.step_max_cnt:
                 break
             if price in existing_order_prices:
                 continue
-            self.buy_limit(price, self.config.step_lots)
+            out.append(price)
             current_buy_orders_cnt += 1
 
+        return out
+
     def place_sell_orders(self):
         current_price = self.cached_current_price
         if not current_price:
             self.logger.error("Не могу выставить заявки на продажу, нулевая цена")
             return
 
+        # Ставим заявки на продажу
+        for price in self.get_sell_prices_to_place(current_price):
+            self.sell_limit(price, self.config.step_lots)
+
+    def get_sell_prices_to_place(self, current_price: float) -> list[float]:
+        """Цены заявок на продажу, которые нужно выставить при такой цене"""
         current_sell_orders_cnt = len(self.active_sell_orders)
         current_step_cnt = self.get_current_step_count()
         current_price = math.ceil(current_price / self.config.step_size) * self.config.step_size
@@ -88,16 +102,24 @@ class TradeNormalStrategy(TradeAbstractStrategy):
         # Исключаем цены, по которым уже выставлены заявки
         existing_order_prices = self.get_existing_sell_order_prices()
 
-        # Ставим заявки на продажу
+        out = []
         for price in target_prices:
             min_steps = -self.config.step_max_cnt if self.config.majority_trade else 0
             if current_step_cnt - current_sell_orders_cnt <= min_steps:
                 break
             if price in existing_order_prices:
                 continue
-            self.sell_limit(price, self.config.step_lots)
+            out.append(price)
             current_sell_orders_cnt += 1
 
+        return out
+
+    def is_placement_idle(self, current_price: float) -> bool:
+        if not current_price:
+            return False
+
+        return not self.get_buy_prices_to_place(current_price) and not self.get_sell_prices_to_place(current_price)
+
     def set_sell_order_by_buy_order(self, order: OrderState):
         price = self.get_order_avg_price(order)
         price += self.config.step_size
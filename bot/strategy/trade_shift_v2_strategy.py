@@ -46,7 +46,7 @@ class TradeShiftV2Strategy(TradeAbstractStrategy):
         # Убираем возможные дубликаты и сортируем по возрастанию
         self.order_map = sorted(set(order_map))
 
-        self.log(f"Определены уровни для fan v2 {self.order_map}")
+        self.log("Определены уровни для fan v2 %s", self.order_map)
 
         return True
 
@@ -82,13 +82,16 @@ class TradeShiftV2Strategy(TradeAbstractStrategy):
                     self.bought_price = 0
                 self.remove_order_from_active_list(order)
 
-    def get_required_buy_levels(self):
-        low_bound = self.lower_limit()
+    def get_required_buy_levels(self, current_price: float | None = None):
+        if current_price is None:
+            current_price = self.cached_current_price
+
+        low_bound = self.lower_limit(current_price)
         if low_bound is None:
             return []
 
         max_price = min(
-            self.cached_current_price,
+            current_price,
             self.bought_price if self.bought_price else float("inf"),
             self.sold_price if self.sold_price else float("inf"),
         )
@@ -96,7 +99,7 @@ class TradeShiftV2Strategy(TradeAbstractStrategy):
         existing_order_prices = self.get_existing_buy_order_prices()
 
         def is_active_order(o_price) -> bool:
-            return o_price == self.cached_current_price and o_price in existing_order_prices
+            return o_price == current_price and o_price in existing_order_prices
 
         levels_to_buy = [price for price in self.order_map if price < max_price or is_active_order(price)]
         required_buy = levels_to_buy[-self.config.step_set_orders_cnt:] \
@@ -105,17 +108,20 @@ class TradeShiftV2Strategy(TradeAbstractStrategy):
 
         return required_buy
 
-    def get_required_sell_levels(self):
-        up_bound = self.upper_limit()
+    def get_required_sell_levels(self, current_price: float | None = None):
+        if current_price is None:
+            current_price = self.cached_current_price
+
+        up_bound = self.upper_limit(current_price)
         if up_bound is None:
             return []
 
-        min_price = max(self.cached_current_price, self.sold_price, self.bought_price)
+        min_price = max(current_price, self.sold_price, self.bought_price)
 
         existing_order_prices = self.get_existing_sell_order_prices()
 
         def is_active_order(o_price) -> bool:
-            return o_price == self.cached_current_price and o_price in existing_order_prices
+            return o_price == current_price and o_price in existing_order_prices
 
         levels_to_sell = [price for price in self.order_map if price > min_price or is_active_order(price)]
         required_sell = levels_to_sell[:self.config.step_set_orders_cnt] \
@@ -182,6 +188,21 @@ class TradeShiftV2Strategy(TradeAbstractStrategy):
             if self.get_order_avg_price(order) not in required_sell:
                 self.cancel_order(order)
 
+    def is_placement_idle(self, current_price: float) -> bool:
+        # заявки на покупку: либо ранний выход из place_buy_orders, либо набор уровней уже совпадает с планом
+        cur_order_prices = self.get_existing_buy_order_prices()
+        if self.config.step_set_orders_cnt - len(cur_order_prices) > 0 or self.sold_price:
+            if sorted(cur_order_prices) != sorted(self.get_required_buy_levels(current_price)):
+                return False
+
+        # аналогично для продажи
+        cur_order_prices = self.get_existing_sell_order_prices()
+        if self.config.step_set_orders_cnt - len(cur_order_prices) > 0 or self.bought_price:
+            if sorted(cur_order_prices) != sorted(self.get_required_sell_levels(current_price)):
+                return False
+
+        return True
+
     def to_zero_on_end(self) -> bool:
         """Возвращает True если нужно выходить в 0 при завершении работы бота"""
         return True
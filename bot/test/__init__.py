@@ -1,3 +1,4 @@
 from .test_helper import TestHelper
+from .test_batch_alg import TestBatchAlgorithm
 from .test_alg import TestAlgorithm
 from .test_acc_alg import TestAccAlgorithm
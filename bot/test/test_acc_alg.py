@@ -1,7 +1,10 @@
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
+from itertools import repeat
 from typing import List, Tuple, Optional
 
-from app.config import AccConfig
+from app import AppConfig
+from app.config import AccConfig, RunConfig
 from bot import TradingAccountBot
 from bot.env.test import TimeTestEnvHelper, LoggerTestEnvHelper
 from bot.env.test.acc import TestAccClientEnvHelper, AccDbTestEnvHelper
@@ -14,10 +17,14 @@ class TestAccAlgorithm:
             config: AccConfig,
             bot_alg_list: List[TestAlgorithm],
             do_printing=False,
+            workers: int | None = None,
     ):
         # текущий конфиг прогона
         self.config: AccConfig = config
 
+        # количество процессов для дней ботов. при 1 все идет последовательно в одном цикле по минутам
+        self.workers = workers if workers is not None else AppConfig.TEST_WORKERS
+
         self.bot_alg_list: List[TestAlgorithm] = bot_alg_list
 
         self.time_helper = TimeTestEnvHelper()
@@ -38,30 +45,140 @@ class TestAccAlgorithm:
     ):
         days_list = TestAlgorithm.get_days_list(last_test_date, test_days_num)
 
-        for test_date in days_list:
-            date_from, date_to = self.set_day(test_date)
+        if self.workers > 1 and len(self.bot_alg_list) > 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                for test_date in days_list:
+                    date_from, date_to = self.set_day(test_date)
+                    self.bots_update_config(test_date)
+                    if not self.run_day_parallel(test_date, executor):
+                        self.run_day_bots(date_from, date_to)
+        else:
+            for test_date in days_list:
+                self.run_day(test_date)
+
+        self.bots_calculate_total_results()
+        self.acc_calculate_total_results()
+        return self.get_results(test_days_num)
 
-            self.bots_create(test_date)
-            self.acc_create()
+    def run_day(self, test_date: str):
+        date_from, date_to = self.set_day(test_date)
+        self.bots_update_config(test_date)
+        self.run_day_bots(date_from, date_to)
 
-            for dt in TestAlgorithm.get_time_list(date_from, date_to):
-                self.bots_run_iteration(dt)
-                self.acc_run_iteration(dt)
+    def run_day_bots(self, date_from: datetime, date_to: datetime):
+        """Последовательный прогон дня: боты и бот аккаунта в одном цикле по минутам"""
+        self.time_helper.set_current_time(date_from)
 
-            self.bots_stop()
-            self.acc_stop()
+        self.bots_create()
+        self.acc_create()
 
-            self.bots_calculate_day_results()
-            self.acc_calculate_day_results()
+        for dt in TestAlgorithm.get_time_list(date_from, date_to):
+            self.bots_run_iteration(dt)
+            self.acc_run_iteration(dt)
 
-        self.bots_calculate_total_results()
-        self.acc_calculate_total_results()
-        return self.get_results(test_days_num)
+        self.bots_stop()
+        self.acc_stop()
+
+        self.bots_calculate_day_results()
+        self.acc_calculate_day_results()
+
+    def run_day_parallel(self, test_date: str, executor: ProcessPoolExecutor) -> bool:
+        """
+        День, в котором боты считаются независимо в процессах пула, а бот аккаунта потом
+        проигрывает поминутную сумму их балансов. Конфиги на день уже подобраны в основном процессе,
+        в пул уходят только конфиг, количество акций и баланс на старте, обратно - итог дня и балансы.
+        Бот аккаунта влияет на ботов только продажами и командами остановки. Если он до них дошел,
+        результаты процессов отбрасываются и день пересчитывается последовательно, так что итог совпадает
+        :return: False - день не посчитан, нужен последовательный прогон
+        """
+        date_from, date_to = self.get_day_bounds(test_date)
+        time_list = list(TestAlgorithm.get_time_list(date_from, date_to))
+
+        run_list = [bot_alg for bot_alg in self.bot_alg_list if bot_alg.process_this_day]
+        day_results = dict(zip(run_list, executor.map(
+            TestAccAlgorithm.run_bot_day,
+            [bot_alg.config for bot_alg in run_list],
+            [bot_alg.accounting_helper.get_num() for bot_alg in run_list],
+            [bot_alg.balance for bot_alg in run_list],
+            [bot_alg.maj_k for bot_alg in run_list],
+            repeat(test_date),
+            repeat(time_list),
+        )))
+
+        # баланс ботов, которые в этот день не торгуют, не меняется
+        balance_lists = [
+            day_results[bot_alg]['balances'] if bot_alg in day_results else repeat(bot_alg.get_cur_balance())
+            for bot_alg in self.bot_alg_list
+        ]
+        balance_iterator = zip(*balance_lists)
+
+        original_end_time = self.config.end_time
+
+        self.time_helper.set_current_time(date_from)
+        self.acc_client.start_replay()
+
+        # первый баланс - на момент создания бота аккаунта
+        self.acc_client.set_balance(next(balance_iterator))
+        self.acc_create()
+
+        for dt, balances in zip(time_list, balance_iterator):
+            self.acc_client.set_balance(balances)
+            self.acc_run_iteration(dt)
+
+            if self.acc_client.intervened or self.acc_bot.exiting:
+                break
+
+        success = not self.acc_client.intervened and not self.acc_bot.exiting
+        self.acc_client.stop_replay()
+
+        if not success:
+            self.config.end_time = original_end_time
+            return False
+
+        for bot_alg, res in day_results.items():
+            bot_alg.apply_day_result(res['day_trade'], res['config'])
+            bot_alg.calculate_day_results()
+
+        self.acc_stop()
+        self.acc_calculate_day_results()
 
-    def bots_create(self, test_date):
+        return True
+
+    @staticmethod
+    def run_bot_day(config: RunConfig, start_cnt: int, balance: float, maj_k: int, test_date: str,
+                    time_list: list[datetime]) -> dict:
+        """
+        День одного бота в процессе пула, в том же порядке вызовов, что и в последовательном цикле.
+        Конфиг уже подобран на день, поэтому подбор не запускается и процессы внутри не создаются
+        :return: итог дня, конфиг после дня и балансы: после создания бота и после каждой минуты
+        """
+        bot_alg = TestAlgorithm(config=config, use_cache=False, workers=1)
+        bot_alg.balance = balance
+        bot_alg.maj_k = maj_k
+        bot_alg.bot_init_state(start_cnt)
+
+        bot_alg.set_day(test_date)
+        bot_alg.update_config(test_date, False)
+        bot_alg.bot_create()
+
+        balances = [bot_alg.get_cur_balance()]
+        for dt in time_list:
+            bot_alg.bot_run_iteration(dt)
+            balances.append(bot_alg.get_cur_balance())
+
+        bot_alg.bot_stop()
+
+        return {
+            'day_trade': bot_alg.day_trade,
+            'config': bot_alg.config,
+            'balances': balances,
+        }
+
+    def bots_update_config(self, test_date):
         for bot_alg in self.bot_alg_list:
             bot_alg.update_config(test_date, True)
 
+    def bots_create(self):
         for bot_alg in self.bot_alg_list:
             if not bot_alg.process_this_day:
                 continue
@@ -89,12 +206,17 @@ class TestAccAlgorithm:
         for bot_alg in self.bot_alg_list:
             bot_alg.calculate_total_results()
 
-    def set_day(self, test_date: str) -> Tuple[datetime, datetime]:
+    @staticmethod
+    def get_day_bounds(test_date: str) -> Tuple[datetime, datetime]:
         # прогоняем по дню (время в UTC)
         date_from_ = datetime.strptime(test_date + ' ' + TestAlgorithm.START_TIME,
                                        "%Y-%m-%d %H:%M").replace(tzinfo=timezone.utc)
         date_to_ = datetime.strptime(test_date + ' ' + TestAlgorithm.END_TIME,
                                      "%Y-%m-%d %H:%M").replace(tzinfo=timezone.utc)
+        return date_from_, date_to_
+
+    def set_day(self, test_date: str) -> Tuple[datetime, datetime]:
+        date_from_, date_to_ = self.get_day_bounds(test_date)
 
         # задаем параметры дня
         self.time_helper.set_current_time(date_from_)
@@ -1,31 +1,45 @@
 import copy
 import math
+import random
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
+from itertools import repeat
 from typing import Tuple, Optional
 
-from tinkoff.invest import OrderDirection
+import numpy as np
 
 from app import AppConfig
 from bot import TradingBot
-from app.cache import LocalCache
+from app.cache import LocalCache, DayResultCache, TickerCache
 from app.dto import TestBotTradeDayDto
-from bot.env.test import TimeTestEnvHelper, LoggerTestEnvHelper, ClientTestEnvHelper, AccountingTestEnvHelper
-from bot.helper import OrderHelper
+from bot.env.test import TimeTestEnvHelper, LoggerTestEnvHelper, ClientTestEnvHelper, AccountingTestEnvHelper, \
+    MinuteCandlesDay
 from app.config import RunConfig
 from app.helper import TimeHelper
-from bot.test import TestHelper
+from bot.test import TestHelper, TestBatchAlgorithm
 
 
 class TestAlgorithm:
     START_TIME = '04:00'
     END_TIME = '20:48'
 
+    # на сколько пачек на каждый процесс делить список конфигов при параллельном расчете
+    CHUNKS_PER_WORKER = 4
+
+    # комиссия за перенос шорта через ночь, доля от стоимости позиции
+    MAJ_COMMISSION = 0.0012
+
     def __init__(
             self,
             config: RunConfig,
             do_printing=False,
             use_cache=True,
+            workers: int | None = None,
+            fast_forward: bool | None = None,
+            walk_forward: bool | None = None,
+            ticker_cache: TickerCache | None = None,
     ):
+        """:param ticker_cache: общий кэш тикера для нескольких тестов (см. TestBatchAlgorithm)"""
         # текущий конфиг прогона
         self.config: RunConfig = config
         # первичный конфиг, с которым зашли в алгоритм
@@ -39,9 +53,18 @@ class TestAlgorithm:
 
         self.time_helper = TimeTestEnvHelper()
         self.logger_helper = LoggerTestEnvHelper(self.time_helper, do_printing)
-        self.client_helper = ClientTestEnvHelper(config.ticker, self.logger_helper, self.time_helper)
+        self.client_helper = ClientTestEnvHelper(config.ticker, self.logger_helper, self.time_helper,
+                                                 ticker_cache)
         self.accounting_helper = AccountingTestEnvHelper(self.client_helper, self.time_helper)
         self.use_cache = use_cache
+        # количество процессов для перебора вариантов конфига
+        self.workers = workers if workers is not None else AppConfig.TEST_WORKERS
+        # пропускать минуты, в которых бот ничего не сделает
+        self.fast_forward = fast_forward if fast_forward is not None else AppConfig.TEST_FAST_FORWARD
+        # подбор конфига по скользящему окну: считается только новый день, остальные берутся из прошлых подборов
+        self.walk_forward = walk_forward if walk_forward is not None else AppConfig.TEST_WALK_FORWARD
+        # результаты дней для подбора конфига: дата -> {(конфиг, акций на старте): результат дня}
+        self.walk_forward_results: dict[str, dict[Tuple[RunConfig, int], dict]] = {}
 
         # внутренние переменные
         self.success_days = 0
@@ -60,6 +83,12 @@ class TestAlgorithm:
         self.day_trade: Optional[TestBotTradeDayDto] = None
         self.bot_started: bool = False
         self.process_this_day = False
+        self.is_today_test = False
+
+        # состояние для пропуска минут: бездействие бота по цене (сбрасывается после каждой полной итерации)
+        # и минуты дня, в которые он может торговать
+        self.idle_by_price: dict[float, bool] = {}
+        self.day_tradable: np.ndarray | None = None
 
     def test(
             self,
@@ -79,6 +108,7 @@ class TestAlgorithm:
         """
 
         days_list = self.get_days_list(last_test_date, test_days_num)
+        self.client_helper.preload_candles(days_list[0], days_list[-1])
         self.bot_init_state(shares_count)
 
         # закручиваем цикл по датам
@@ -93,11 +123,7 @@ class TestAlgorithm:
 
             if not self.apply_from_cache(cache_name):
                 self.bot_create()
-
-                for dt in self.get_time_list(date_from, date_to):
-                    if not self.bot_run_iteration(dt):
-                        break
-
+                self.run_day(date_from, date_to)
                 self.bot_stop()
 
                 self.save_to_cache(cache_name)
@@ -122,7 +148,8 @@ class TestAlgorithm:
 
     def set_day(self, test_date: str) -> Tuple[datetime, datetime]:
         if self.accounting_helper.get_num() < 0:
-            self.maj_commission += self.client_helper.get_current_price() * self.accounting_helper.get_num() * 0.0012
+            self.maj_commission += (self.client_helper.get_current_price() * self.accounting_helper.get_num()
+                                    * self.MAJ_COMMISSION)
 
         # прогоняем по дню (время в UTC)
         date_from_ = datetime.strptime(test_date + ' ' + self.START_TIME,
@@ -132,6 +159,7 @@ class TestAlgorithm:
 
         # задаем параметры дня
         self.time_helper.set_current_time(date_from_)
+        self.is_today_test = TimeHelper.is_today(test_date)
 
         # сбрасываем все заказы и заявки
         self.accounting_helper.reset()
@@ -154,7 +182,8 @@ class TestAlgorithm:
         return (not self.original_config.mod_disable_big_best_conf
                 and TestAlgorithm.is_need_big_best_conf(test_date))
 
-    def update_config(self, test_date, try_find_best_config):
+    def update_config(self, test_date, try_find_best_config, day_candles: MinuteCandlesDay | None = None):
+        """:param day_candles: свечи дня, уже загруженные для другого теста того же тикера"""
         self.process_this_day = False
         if not TimeHelper.is_trading_day(TimeHelper.to_datetime(test_date)):
             return
@@ -194,7 +223,7 @@ class TestAlgorithm:
         # дальше текущего времени не убегаем
         self.config.end_time = self.get_end_time(test_date, self.config.end_time)
 
-        normal_trade_day = self.client_helper.set_candles_list_by_date(test_date)
+        normal_trade_day = self.client_helper.set_candles_list_by_date(test_date, day_candles)
         if not normal_trade_day:
             # print(f"{test_date} - skip, no candles")
             return
@@ -258,21 +287,14 @@ class TestAlgorithm:
             conf_list += conf_list2
 
         unique_conf_list = list(set(conf_list))
-        results = []
 
         # запускаем получение результатов работы всех вариантов конфигурации
-        for config in unique_conf_list:
-            test_alg = TestAlgorithm(do_printing=False, config=config, use_cache=self.use_cache)
-            res = test_alg.test(
-                last_test_date=prev_test_date,
-                test_days_num=prev_days,
-                shares_count=0,
-
-                # не менять, чтобы в рекурсию не уйти
-                try_find_best_config=False,
-            )
-            if res:
-                results.append(res)
+        if use_big_make_alg and AppConfig.TEST_BIG_SEARCH_RUNGS > 1:
+            results = self.run_config_list_halving(unique_conf_list, prev_test_date, prev_days)
+        elif self.walk_forward:
+            results = self.run_config_list_walk_forward(unique_conf_list, prev_test_date, prev_days)
+        else:
+            results = self.run_config_list(unique_conf_list, prev_test_date, prev_days)
 
         # сортировка результатов
         sorted_results = sorted(results, key=lambda x: (-float(x['profit_p']), str(x['config'])))
@@ -289,6 +311,223 @@ class TestAlgorithm:
             print(f"Ошибка при получении лучшей конфигурации")
             return copy.copy(original_config), 0
 
+    def run_config_list(self, config_list: list[RunConfig], last_test_date: str, test_days_num: int) -> list[dict]:
+        """
+        Прогоняет тест по каждому конфигу из списка, пачками конфигов за один проход по дням (run_config_batch).
+        При self.workers > 1 пачки раздаются в пул процессов (расчет упирается в GIL, потоки не помогают).
+        Порядок результатов совпадает с порядком конфигов, так что выбор лучшего не зависит от режима
+        :return: список результатов get_results() без пустых
+        """
+        if self.workers > 1 and len(config_list) > 1:
+            chunk_size = self.get_chunk_size(len(config_list), self.workers)
+            chunks = [config_list[i:i + chunk_size] for i in range(0, len(config_list), chunk_size)]
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                results = [res for chunk_results in executor.map(
+                    TestAlgorithm.run_config_batch,
+                    chunks,
+                    repeat(last_test_date),
+                    repeat(test_days_num),
+                    repeat(self.use_cache),
+                    repeat(self.fast_forward),
+                ) for res in chunk_results]
+        else:
+            results = self.run_config_batch(config_list, last_test_date, test_days_num, self.use_cache,
+                                            self.fast_forward)
+
+        return [res for res in results if res]
+
+    @staticmethod
+    def run_config_batch(
+            config_list: list[RunConfig],
+            last_test_date: str,
+            test_days_num: int,
+            use_cache: bool,
+            fast_forward: bool = False,
+    ) -> list[dict]:
+        """
+        Тест пачки вариантов конфига одним проходом по дням (TestBatchAlgorithm).
+        Статический, чтобы его можно было передать в дочерний процесс
+        """
+        ticker_caches = TestBatchAlgorithm.get_ticker_caches([config.ticker for config in config_list])
+        bot_alg_list = [
+            TestAlgorithm(do_printing=False, config=config, use_cache=use_cache, workers=1, fast_forward=fast_forward,
+                          ticker_cache=ticker_caches[config.ticker])
+            for config in config_list
+        ]
+        return TestBatchAlgorithm(bot_alg_list).test(last_test_date, test_days_num)
+
+    def run_config_list_halving(
+            self,
+            config_list: list[RunConfig],
+            last_test_date: str,
+            test_days_num: int,
+            rungs: int | None = None,
+            keep_ratio: float | None = None,
+            max_candidates: int | None = None,
+    ) -> list[dict]:
+        """
+        Перебор конфигов методом последовательного отсева (successive halving).
+        Сначала все кандидаты гоняются на коротком хвосте окна, после каждого этапа остается лучшая доля,
+        а окно для оставшихся удлиняется. На последнем этапе окно полное.
+        Дни хвоста, посчитанные на прошлом этапе, берутся из кэша дней (или результатов walk forward), только если
+        конфиг пришел в них с тем же количеством акций: оно входит в ключ дня и зависит от начала окна.
+        Обычно это часть хвоста, остальные дни считаются заново
+        :param rungs: количество этапов. 1 - обычный полный перебор
+        :param keep_ratio: доля кандидатов, которая переходит на следующий этап
+        :param max_candidates: ограничение числа кандидатов на первом этапе. 0 - все
+        :return: результаты последнего этапа в формате get_results()
+        """
+        rungs = rungs if rungs is not None else AppConfig.TEST_BIG_SEARCH_RUNGS
+        keep_ratio = keep_ratio if keep_ratio is not None else AppConfig.TEST_BIG_SEARCH_KEEP
+        max_candidates = max_candidates if max_candidates is not None else AppConfig.TEST_BIG_SEARCH_CANDIDATES
+
+        # порядок set зависит от процесса, для повторяемости выборки сортируем
+        candidates = sorted(config_list, key=str)
+        if 0 < max_candidates < len(candidates):
+            candidates = random.Random(last_test_date).sample(candidates, max_candidates)
+
+        results = []
+        days_list = self.get_halving_days(test_days_num, rungs)
+        for rung, days_num in enumerate(days_list):
+            if self.walk_forward:
+                results = self.run_config_list_walk_forward(candidates, last_test_date, days_num)
+            else:
+                results = self.run_config_list(candidates, last_test_date, days_num)
+
+            if rung == len(days_list) - 1:
+                break
+
+            results = sorted(results, key=lambda x: (-float(x['profit_p']), str(x['config'])))
+            keep_cnt = max(1, math.ceil(len(results) * keep_ratio))
+            candidates = [res['config'] for res in results[:keep_cnt]]
+
+        return results
+
+    @staticmethod
+    def get_halving_days(test_days_num: int, rungs: int) -> list[int]:
+        """
+        Длины окон по этапам отсева. Каждое следующее вдвое длиннее, последнее - полное окно
+        :return: список без повторов, например для 7 дней и 3 этапов [1, 3, 7]
+        """
+        out = []
+        for rung in range(max(1, rungs)):
+            days_num = max(1, test_days_num // 2 ** (rungs - 1 - rung))
+            if not out or days_num > out[-1]:
+                out.append(days_num)
+
+        return out
+
+    def run_config_list_walk_forward(
+            self,
+            config_list: list[RunConfig],
+            last_test_date: str,
+            test_days_num: int
+    ) -> list[dict]:
+        """
+        То же, что run_config_list, но окно собирается из результатов отдельных дней.
+        Результат дня хранится по (дата, конфиг, акций на старте), так что при сдвиге окна на день
+        считается только новый день, а префикс берется из прошлых вызовов.
+        Как и кэш дней (b_ ключ), считает результат дня не зависящим от баланса на его старте
+        :return: список результатов в формате get_results()
+        """
+        days_list = self.get_days_list(last_test_date, test_days_num)
+
+        # выкидываем дни, которые уже не попадут в окно
+        for date in list(self.walk_forward_results.keys()):
+            if date < days_list[0]:
+                del self.walk_forward_results[date]
+
+        start_cnt = {config: 0 for config in config_list}
+        # цена на конец последнего прогнанного дня - по ней берется комиссия за перенос шорта через ночь
+        last_price = {config: 0. for config in config_list}
+        balance_change = {config: 0. for config in config_list}
+        operations = {config: 0 for config in config_list}
+        last_conf = {config: config for config in config_list}
+
+        for test_date in days_list:
+            day_results = self.walk_forward_results.setdefault(test_date, {})
+
+            # досчитываем дни, которых еще нет
+            keys_to_run = [(config, start_cnt[config]) for config in config_list
+                           if (config, start_cnt[config]) not in day_results]
+            for key, res in zip(keys_to_run, self.run_day_list(keys_to_run, test_date)):
+                day_results[key] = res
+
+            for config in config_list:
+                res = day_results[(config, start_cnt[config])]
+                # как в set_day. в отдельном прогоне дня цены прошлого дня нет, поэтому комиссию считаем здесь
+                if start_cnt[config] < 0:
+                    balance_change[config] += last_price[config] * start_cnt[config] * self.MAJ_COMMISSION
+                if res['end_price'] is not None:
+                    last_price[config] = res['end_price']
+                balance_change[config] += res['balance_change']
+                operations[config] += res['op']
+                start_cnt[config] = res['end_cnt']
+                last_conf[config] = res['last_conf']
+
+        results = []
+        for config in config_list:
+            profit = round(balance_change[config])
+            profit_p = round(100 * profit / self.start_balance, 2)
+            results.append({
+                'exp': f"{config.ticker} {config.pretest_type} {config.mods}",
+                'profit': profit,
+                'profit_p': profit_p,
+                'profit_p_avg': round(profit_p / test_days_num, 2) if test_days_num > 0 else 0,
+                'config': config,
+                'last_conf': last_conf[config],
+                'op': operations[config],
+            })
+
+        return results
+
+    def run_day_list(self, key_list: list[Tuple[RunConfig, int]], test_date: str) -> list[dict]:
+        """Прогон одного дня по списку (конфиг, акций на старте). Параллельно - как в run_config_list"""
+        if self.workers > 1 and len(key_list) > 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                return list(executor.map(
+                    TestAlgorithm.run_config_day,
+                    [config for config, _ in key_list],
+                    repeat(test_date),
+                    [shares_count for _, shares_count in key_list],
+                    repeat(self.use_cache),
+                    repeat(self.fast_forward),
+                    chunksize=self.get_chunk_size(len(key_list), self.workers),
+                ))
+
+        return [self.run_config_day(config, test_date, shares_count, self.use_cache, self.fast_forward)
+                for config, shares_count in key_list]
+
+    @staticmethod
+    def run_config_day(
+            config: RunConfig,
+            test_date: str,
+            shares_count: int,
+            use_cache: bool,
+            fast_forward: bool = False,
+    ) -> dict:
+        """Тест одного дня по конфигу. Отдает изменение баланса и количество акций на конец дня"""
+        test_alg = TestAlgorithm(do_printing=False, config=config, use_cache=use_cache, workers=1,
+                                 fast_forward=fast_forward)
+        test_alg.test(
+            last_test_date=test_date,
+            test_days_num=1,
+            shares_count=shares_count,
+            try_find_best_config=False,
+        )
+
+        return {
+            'balance_change': test_alg.balance - test_alg.start_balance,
+            'end_cnt': test_alg.accounting_helper.get_num(),
+            'end_price': test_alg.day_trade.end_price if test_alg.process_this_day else None,
+            'op': test_alg.operations_cnt,
+            'last_conf': test_alg.config,
+        }
+
+    @classmethod
+    def get_chunk_size(cls, items_cnt: int, workers: int) -> int:
+        return max(1, math.ceil(items_cnt / (workers * cls.CHUNKS_PER_WORKER)))
+
     @staticmethod
     def get_step_by_price(price: float | None) -> float:
         if price is None or price == 0:
@@ -519,24 +758,44 @@ class TestAlgorithm:
         if not self.use_cache:
             return False
 
-        cached_val = LocalCache.get(cache_name)
+        cached_val = self.get_from_cache(cache_name)
 
         LocalCache.inc_counter('cache_find' if cached_val else 'cache_miss')
 
         if cached_val:
             self.day_trade = cached_val
             self.accounting_helper.set_num(self.day_trade.end_cnt)
+            # цена конца дня нужна для комиссии за перенос шорта на следующий день
+            self.client_helper.set_current_price(self.day_trade.end_price)
             return True
 
         return False
 
+    def get_from_cache(self, cache_name) -> TestBotTradeDayDto | None:
+        # текущий день еще не закончен - его результат храним только в памяти процесса
+        if self.is_today_test:
+            return LocalCache.get(cache_name)
+
+        return DayResultCache.get(cache_name)
+
     def save_to_cache(self, cache_name):
         if not self.use_cache:
             return False
 
-        LocalCache.set(cache_name, self.day_trade)
+        if self.is_today_test:
+            LocalCache.set(cache_name, self.day_trade)
+        else:
+            DayResultCache.set(cache_name, self.day_trade)
         return True
 
+    def apply_day_result(self, day_trade: TestBotTradeDayDto, config: RunConfig):
+        """Состояние после дня, посчитанного в другом процессе (параллельный тест аккаунта)"""
+        self.day_trade = day_trade
+        self.config = config
+        self.accounting_helper.set_num(day_trade.end_cnt)
+        # цена конца дня нужна для комиссии за перенос шорта на следующий день
+        self.client_helper.set_current_price(day_trade.end_price)
+
     def bot_init_state(self, shares_count):
         self.accounting_helper.set_num(shares_count)
 
@@ -566,13 +825,14 @@ class TestAlgorithm:
 
         self.time_helper.set_time(dt)
 
-        candle = self.client_helper.get_candle(dt)
-        if candle is None:
+        day_candles = self.client_helper.day_candles
+        minute = MinuteCandlesDay.get_index(dt)
+        if not day_candles.has(minute):
             self.logger_helper.error(f"No candle for {dt}")
             return True
 
         # задаем текущее значение свечи
-        self.client_helper.set_current_candle(candle)
+        self.client_helper.set_current_minute(minute)
 
         # при первом запуске
         if not self.bot_started:
@@ -582,21 +842,8 @@ class TestAlgorithm:
             self.config.step_lots = math.floor(
                 self.balance / (self.maj_k * self.day_trade.start_price * self.config.step_max_cnt))
 
-        for order_id, order in self.client_helper.orders.items():
-            if order_id in self.client_helper.executed_orders_ids:
-                continue
-            avg_price = self.client_helper.round(OrderHelper.get_avg_price(order))
-            if order.direction == OrderDirection.ORDER_DIRECTION_BUY:
-                low_buy_price = self.client_helper.q2f(candle.low)
-                order_executed = avg_price >= low_buy_price
-                # order_executed_on_border = price == low_buy_price
-            else:
-                high_sell_price = self.client_helper.q2f(candle.high)
-                order_executed = avg_price <= high_sell_price
-                # order_executed_on_border = price == high_sell_price
-
-            if order_executed:
-                self.client_helper.executed_orders_ids.append(order_id)
+        # исполняем заявки, задетые свечой
+        self.client_helper.match_orders(day_candles.get_low(minute), day_candles.get_high(minute))
 
         # если пора просыпаться
         if self.time_helper.is_time_to_awake():
@@ -606,6 +853,133 @@ class TestAlgorithm:
 
         return True
 
+    def run_day(self, date_from: datetime, date_to: datetime):
+        """Прогон созданного бота по минутам дня"""
+        self.run_day_minutes(list(self.get_time_list(date_from, date_to)))
+
+    def run_day_minutes(self, time_list: list[datetime]):
+        """Прогон по готовому списку минут дня. Для пропуска минут заранее считается, когда бот может торговать"""
+        if self.fast_forward and time_list:
+            self.day_tradable = self.get_tradable_mask(time_list)
+
+        index = 0
+        while index is not None and index < len(time_list):
+            index = self.run_day_step(time_list, index)
+
+    def run_day_step(self, time_list: list[datetime], index: int) -> int | None:
+        """
+        Полная итерация в минуту index. В режиме fast_forward перед ней пропускаются минуты без событий,
+        так что полностью прогоняется уже минута следующего события
+        :return: индекс следующей минуты. None - бот закончил работу
+        """
+        if not self.bot.continue_trading():
+            return None
+
+        if self.fast_forward and self.bot_started:
+            index = self.skip_idle_minutes(time_list, index)
+            if index >= len(time_list):
+                return index
+
+        # после полной итерации бот может вести себя при тех же ценах иначе
+        self.idle_by_price = {}
+
+        if not self.bot_run_iteration(time_list[index]):
+            return None
+
+        return index + 1
+
+    def get_tradable_mask(self, time_list: list[datetime]) -> np.ndarray:
+        """
+        Минуты, в которых бот может торговать: по часам конфига (is_trading_hours) и статусу торгов (can_trade).
+        Вне них итерация бота ждет начала торгов или останавливает его
+        """
+        start_time, end_time = self.bot.get_trading_hours()
+        first = time_list[0]
+        offsets = np.arange(len(time_list))
+
+        seconds = first.hour * 3600 + first.minute * 60 + first.second + offsets * 60
+        start_seconds = start_time.hour * 3600 + start_time.minute * 60 + start_time.second
+        end_seconds = end_time.hour * 3600 + end_time.minute * 60 + end_time.second
+        in_hours = (seconds >= start_seconds) & (seconds < end_seconds)
+
+        can_trade = self.client_helper.get_can_trade_minutes(first)[MinuteCandlesDay.get_index(first) + offsets]
+        return in_hours & can_trade
+
+    def get_awake_index(self, time_list: list[datetime], index: int) -> int:
+        """Первая минута не раньше index, в которую бот уже не спит"""
+        sleep_minutes = (self.time_helper.sleep_until - time_list[0]).total_seconds() / 60
+        return max(index, math.ceil(sleep_minutes))
+
+    def skip_idle_minutes(self, time_list: list[datetime], index: int) -> int:
+        """
+        Переход сразу к следующему событию дня, начиная с минуты index. События ищутся по массивам свечей:
+        свеча задевает активную заявку, бот просыпается вне торгового режима или при цене, на которой он
+        что-то сделает. Бот со сном больше минуты на каждом пробуждении прогоняется полностью,
+        иначе пропуск сдвинул бы его расписание. Время и цена после пропуска те же, что после поминутного прогона
+        :return: индекс минуты события. len(time_list) - событий до конца дня нет
+        """
+        day_candles = self.client_helper.day_candles
+        start = MinuteCandlesDay.get_index(time_list[index])
+        end = start + len(time_list) - index
+        has_candle = day_candles.mask[start:end]
+
+        # свеча задевает активные заявки
+        event = np.zeros(len(has_candle), dtype=np.bool_)
+        max_buy_price, min_sell_price = self.client_helper.matching.get_bounds()
+        if max_buy_price is not None:
+            event |= day_candles.low[start:end] <= max_buy_price
+        if min_sell_price is not None:
+            event |= day_candles.high[start:end] >= min_sell_price
+
+        # итерация бота идет только в минуты со свечой, после пробуждения
+        awake = has_candle.copy()
+        awake[:self.get_awake_index(time_list, index) - index] = False
+
+        long_sleep = self.config.sleep_trading > 60
+        event |= awake if long_sleep else awake & ~self.day_tradable[index:]
+        event &= has_candle
+        stop = int(np.argmax(event)) if event.any() else len(event)
+
+        if not long_sleep:
+            stop = self.find_not_idle_minute(time_list, index, awake[:stop], stop)
+
+        if stop > 0:
+            self.time_helper.set_time(time_list[index + stop - 1])
+            candle_offsets = np.flatnonzero(has_candle[:stop])
+            if len(candle_offsets):
+                self.client_helper.set_current_minute(start + int(candle_offsets[-1]))
+
+        return index + stop
+
+    def find_not_idle_minute(self, time_list: list[datetime], index: int, awake: np.ndarray, stop: int) -> int:
+        """
+        Первая минута пробуждения, в которую итерация что-то сделает.
+        Без исполнения заявок это зависит только от цены, поэтому бот проверяется по разу на каждую новую цену
+        :param awake: минуты пробуждения от index до stop
+        :return: смещение этой минуты от index или stop, если такой нет
+        """
+        awake_offsets = np.flatnonzero(awake)
+        if not len(awake_offsets):
+            return stop
+
+        start = MinuteCandlesDay.get_index(time_list[index])
+        closes = self.client_helper.day_candles.close[start + awake_offsets]
+        _, first_offsets = np.unique(closes, return_index=True)
+
+        # цены в порядке появления
+        for i in np.sort(first_offsets):
+            price = float(closes[i])
+            offset = int(awake_offsets[i])
+            if price not in self.idle_by_price:
+                self.time_helper.set_time(time_list[index + offset])
+                self.client_helper.set_current_minute(start + offset)
+                self.idle_by_price[price] = self.bot.is_idle(price)
+
+            if not self.idle_by_price[price]:
+                return offset
+
+        return stop
+
     def bot_stop(self):
         self.bot.stop()
 
@@ -0,0 +1,92 @@
+from datetime import datetime
+from typing import List, TYPE_CHECKING
+
+from app.cache import TickerCache
+from bot.env.test import MinuteCandlesDay
+from bot.test import TestHelper
+
+if TYPE_CHECKING:
+    from bot.test import TestAlgorithm
+
+
+class TestBatchAlgorithm:
+    """
+    Тест списка конфигов за один проход по дням.
+    Свечи периода и дня загружаются один раз на тикер, кэш тикера (инструмент, архив свечей) и список минут дня
+    общие для всех ботов. Итог по каждому конфигу тот же, что у TestAlgorithm.test
+    """
+
+    def __init__(self, bot_alg_list: List['TestAlgorithm']):
+        self.bot_alg_list: List['TestAlgorithm'] = bot_alg_list
+
+    @staticmethod
+    def get_ticker_caches(tickers: list[str]) -> dict[str, TickerCache]:
+        """Кэши тикеров для TestAlgorithm(ticker_cache=...), по одному на тикер"""
+        return {ticker: TickerCache(ticker) for ticker in set(tickers)}
+
+    def test(self, last_test_date: str, test_days_num: int) -> list[dict]:
+        """
+        Тест всех конфигов без подбора конфига, с нулем акций на старте
+        :return: результаты get_results() в порядке списка ботов
+        """
+        days_list = TestHelper.get_trade_days_only(last_test_date, test_days_num)
+
+        preloaded = set()
+        for bot_alg in self.bot_alg_list:
+            if bot_alg.client_helper.ticker_cache not in preloaded:
+                preloaded.add(bot_alg.client_helper.ticker_cache)
+                bot_alg.client_helper.preload_candles(days_list[0], days_list[-1])
+            bot_alg.bot_init_state(0)
+
+        for test_date in days_list:
+            self.run_day(test_date)
+
+        results = []
+        for bot_alg in self.bot_alg_list:
+            bot_alg.calculate_total_results()
+            results.append(bot_alg.get_results(test_days_num))
+        return results
+
+    def run_day(self, test_date: str):
+        """День всех ботов: те, что есть в кэше дней, берутся из него, остальные прогоняются вместе"""
+        # свечи дня по тикерам: загружает первый бот тикера, остальные получают те же массивы
+        day_candles: dict[str, MinuteCandlesDay] = {}
+        day_list = []
+        run_list = []
+        date_from = date_to = None
+
+        for bot_alg in self.bot_alg_list:
+            date_from, date_to = bot_alg.set_day(test_date)
+            ticker = bot_alg.config.ticker
+            bot_alg.update_config(test_date, False, day_candles.get(ticker))
+            if not bot_alg.process_this_day:
+                continue
+
+            day_candles[ticker] = bot_alg.client_helper.day_candles
+            day_list.append(bot_alg)
+
+            cache_name = bot_alg.get_cache_key(test_date)
+            if not bot_alg.apply_from_cache(cache_name):
+                bot_alg.bot_create()
+                run_list.append((bot_alg, cache_name))
+
+        if run_list:
+            self.run_day_bots([bot_alg for bot_alg, _ in run_list], date_from, date_to)
+
+        for bot_alg, cache_name in run_list:
+            bot_alg.bot_stop()
+            bot_alg.save_to_cache(cache_name)
+
+        for bot_alg in day_list:
+            bot_alg.calculate_day_results()
+
+    @staticmethod
+    def run_day_bots(bot_alg_list: List['TestAlgorithm'], date_from: datetime, date_to: datetime):
+        """
+        Прогон созданных ботов по одному списку минут и одним массивам свечей дня.
+        Боты друг от друга не зависят, поэтому каждый проходит день целиком, а не по минуте вперемешку с остальными:
+        так быстрее, его состояние не вытесняется из кэша процессора
+        """
+        time_list = list(bot_alg_list[0].get_time_list(date_from, date_to))
+        for bot_alg in bot_alg_list:
+            bot_alg.run_day_minutes(time_list)
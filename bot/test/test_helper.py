@@ -1,6 +1,4 @@
-from datetime import datetime, timedelta
-
-from app.helper import TimeHelper
+from app.helper import TimeHelper, TradingCalendar
 
 
 class TestHelper:
@@ -21,14 +19,4 @@ class TestHelper:
             else:
                 end_date = TimeHelper.get_current_date()
 
-        current_date = datetime.strptime(end_date, "%Y-%m-%d")
-        out = [end_date]
-
-        while len(out) < days_num:
-            current_date -= timedelta(days=1)
-            if TimeHelper.is_trading_day(current_date):
-                out.append(current_date.strftime("%Y-%m-%d"))
-
-        out.reverse()
-
-        return out
+        return TradingCalendar.get_trading_days(end_date, days_num)
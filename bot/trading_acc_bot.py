@@ -78,10 +78,10 @@ class TradingAccountBot(AbstractBot):
         )
         self.update_run_state()
 
-        self.log(f"INIT \n"
-                 f"     config - {self.config}\n"
-                 f"     account - {self.account}\n"
-                 f"     run_instance - {self.run_state}"
+        self.log(lambda: f"INIT \n"
+                         f"     config - {self.config}\n"
+                         f"     account - {self.account}\n"
+                         f"     run_instance - {self.run_state}"
                  )
 
     def get_status_str(self) -> str:
@@ -86,14 +86,14 @@ class TradingBot(AbstractBot):
 
             self.accounting.set_run_id(self.run_state.id)
 
-        self.log(f"INIT \n"
-                 f"     config - {self.config}\n"
-                 f"     instrument - {self.client.instrument}\n"
-                 f"     cur_used_cnt - {self.trade_strategy.start_count}\n"
-                 f"     last_price - {self.trade_strategy.start_price}\n"
-                 f"     depo - {self.trade_strategy.get_max_start_depo()}\n"
-                 f"     instrument_id - {self.config.instrument_id}\n"
-                 f"     run_instance - {self.run_state}"
+        self.log(lambda: f"INIT \n"
+                         f"     config - {self.config}\n"
+                         f"     instrument - {self.client.instrument}\n"
+                         f"     cur_used_cnt - {self.trade_strategy.start_count}\n"
+                         f"     last_price - {self.trade_strategy.start_price}\n"
+                         f"     depo - {self.trade_strategy.get_max_start_depo()}\n"
+                         f"     instrument_id - {self.config.instrument_id}\n"
+                         f"     run_instance - {self.run_state}"
                  )
 
     def is_trading_day(self):
@@ -161,6 +161,7 @@ class TradingBot(AbstractBot):
         return True
 
     def run_iteration(self):
+        self.client.start_iteration()
         self.client.update_cached_status()
 
         can_trade, sleep_sec = self.can_trade()
@@ -205,25 +206,48 @@ class TradingBot(AbstractBot):
         self.time.sleep(self.config.sleep_trading)
 
     def check_need_stop(self):
+        reason = self.get_stop_reason()
+        if reason:
+            self.log(reason)
+            return True
+
+        return False
+
+    def get_stop_reason(self, current_price: float | None = None) -> str | None:
+        """
+        Причина остановки по уровню прибыли/потерь или None, если останавливаться не надо
+        :param current_price: цена для расчета прибыли, по умолчанию - закешированная текущая
+        """
         if not self.trade_strategy.start_price or not (self.config.stop_up_p or self.config.stop_down_p):
-            return False
+            return None
 
-        profit = self.trade_strategy.get_current_profit()
+        profit = self.trade_strategy.get_current_profit(current_price)
         max_portfolio = self.trade_strategy.get_max_start_depo()
 
         need_profit = self.trade_strategy.round(max_portfolio * self.config.stop_up_p)
         if self.config.stop_up_p and profit > need_profit:
-            self.log(f"Останавливаем по получению нужного уровня прибыли. "
-                     f"profit={profit}, stop_up_p={self.config.stop_up_p}, need_profit={need_profit}")
-            return True
+            return (f"Останавливаем по получению нужного уровня прибыли. "
+                    f"profit={profit}, stop_up_p={self.config.stop_up_p}, need_profit={need_profit}")
 
         need_loss = self.trade_strategy.round(max_portfolio * self.config.stop_down_p)
         if self.config.stop_down_p and profit < -need_loss:
-            self.log(f"Останавливаем по достижению критического уровня потерь. "
-                     f"profit={profit}, stop_up_p={self.config.stop_down_p}, need_loss=-{need_loss}")
-            return True
+            return (f"Останавливаем по достижению критического уровня потерь. "
+                    f"profit={profit}, stop_up_p={self.config.stop_down_p}, need_loss=-{need_loss}")
 
-        return False
+        return None
+
+    def is_idle(self, current_price: float) -> bool:
+        """
+        True если итерация при указанной цене и без исполнения заявок ничего не изменит в состоянии бота.
+        Используется в тестах для пропуска таких минут
+        """
+        if self.state != self.STATE_WORKING or self.run_state:
+            return False
+
+        if self.get_stop_reason(current_price):
+            return False
+
+        return self.trade_strategy.is_idle(current_price)
 
     def stop(self, to_zero=False, exit_code=0):
         if self.state == self.STATE_FINISHED:
@@ -251,15 +275,6 @@ class TradingBot(AbstractBot):
         if not current_price:
             self.logger.error("Нулевая цена, статистика НЕ будет верной")
 
-        results = (f"RESULTS\n"
-                   f"     config - {self.config}\n"
-                   f"     instrument - {self.client.instrument}\n"
-                   f"     depo - {self.trade_strategy.get_max_start_depo()}\n"
-                   f"     current_price - {current_price}\n"
-                   f"     error_cnt - {self.logger.error_cnt}\n"
-                   f"     end_cnt - {self.trade_strategy.get_current_count()}\n"
-                   f"     total - {self.trade_strategy.get_current_profit()}\n")
-
         if self.run_state:
             self.run_state.exit_code = exit_code
             self.run_state.status = RunStatus.FINISHED if not exit_code else RunStatus.FAILED
@@ -271,10 +286,23 @@ class TradingBot(AbstractBot):
 
             self.update_run_state()
 
+        self.log(lambda: self.get_results_str(current_price))
+
+    def get_results_str(self, current_price: float | None) -> str:
+        results = (f"RESULTS\n"
+                   f"     config - {self.config}\n"
+                   f"     instrument - {self.client.instrument}\n"
+                   f"     depo - {self.trade_strategy.get_max_start_depo()}\n"
+                   f"     current_price - {current_price}\n"
+                   f"     error_cnt - {self.logger.error_cnt}\n"
+                   f"     end_cnt - {self.trade_strategy.get_current_count()}\n"
+                   f"     total - {self.trade_strategy.get_current_profit()}\n")
+
+        if self.run_state:
             results += (f"     profit - {self.run_state.profit}\n"
                         f"     profit_n - {self.run_state.profit_n}")
 
-        self.log(results)
+        return results
 
     def buy(self, count):
         self.trade_strategy.buy(count)
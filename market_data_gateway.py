@@ -0,0 +1,33 @@
+import sys
+from datetime import datetime
+from signal import signal, SIGTERM, SIGINT
+from time import sleep
+
+from app.helper import TimeHelper
+from bot.env.prod import MarketDataGateway, MarketDataGatewayClient
+
+if __name__ == '__main__':
+    # python market_data_gateway.py [figi,через,запятую] - работает до окончания торгов
+    if MarketDataGatewayClient.is_running():
+        print(f"{datetime.now()} Шлюз рыночных данных уже запущен")
+        sys.exit(0)
+
+    figi_list = sys.argv[1].split(',') if len(sys.argv) > 1 and sys.argv[1] else []
+
+    gateway = MarketDataGateway(figi_list)
+
+    def clean(*_args):
+        gateway.stop()
+        sys.exit(0)
+
+    for sig in (SIGTERM, SIGINT):
+        signal(sig, clean)
+
+    gateway.start()
+    print(f"{datetime.now()} Шлюз рыночных данных запущен на {gateway.socket_path}")
+
+    while not TimeHelper.trades_are_finished():
+        sleep(60)
+
+    gateway.stop()
+    print(f"{datetime.now()} Шлюз рыночных данных остановлен")
@@ -0,0 +1,17 @@
+import glob
+import os
+import sys
+
+from app import AppConfig
+from app.cache import CandleArchive
+
+if __name__ == '__main__':
+    # python migrate_candles.py [тикеры через запятую]. без параметров - все базы db/c_*.db
+    if len(sys.argv) > 1:
+        tickers = sys.argv[1].split(',')
+    else:
+        tickers = [os.path.basename(path)[2:-3] for path in sorted(glob.glob(f"{AppConfig.BASE_DIR}/db/c_*.db"))]
+
+    for ticker in tickers:
+        rows_cnt = CandleArchive(ticker).migrate_from_sqlite(f"{AppConfig.BASE_DIR}/db/c_{ticker}.db")
+        print(f"{ticker}: {rows_cnt}")
@@ -11,8 +11,9 @@ from app.lib import TinkoffApi
 from app.models import Instrument, Account
 from app.config import RunConfig, AccConfig
 from app.utils import SystemMonitor
-from app.cache import TickerCache
+from app.cache import InstrumentCatalog
 from app.helper import TimeHelper
+from bot.env.prod import MarketDataGatewayClient
 
 
 async def run_command(command):
@@ -86,6 +87,7 @@ async def main():
     with app.app_context():
         commands = []
         commands_acc = []
+        gateway_figi = []
         current_dir = os.path.dirname(os.path.abspath(__file__))
 
         # набор инструментов
@@ -112,9 +114,11 @@ async def main():
                 config = RunConfig.from_repr_string(instrument.config)
                 config.instrument_id = instrument.id
                 ticker = config.ticker
-                ticker_cache = TickerCache(ticker)
-                figi = ticker_cache.get_instrument().figi
-                instrument_lots = ticker_cache.get_instrument().lot
+                instrument_dto = InstrumentCatalog.get_by_ticker(ticker)
+                if instrument_dto is None:
+                    raise Exception(f"No figi found for '{ticker}'")
+                figi = instrument_dto.figi
+                instrument_lots = instrument_dto.lot
 
                 stock = Stock()
                 stock.config = config
@@ -172,6 +176,7 @@ async def main():
 
             # добавляем команду на запуск бота по инструменту
             for stock in stocks:
+                gateway_figi.append(stock.figi)
                 commands.append(f"python3 {current_dir}/bot.py {stock.config.to_string()} >> ~/log/all.log 2>&1")
 
             # и добавляем команду на запуск аккаунт бота
@@ -207,6 +212,12 @@ async def main():
                   f"всего доступно скриптов {max_scripts_cnt}, "
                   f"пытались запустить {bots_cnt} ботов и {acc_bots_cnt} акк ботов")
 
+        # общий шлюз рыночных данных поднимаем до ботов, figi остальных инструментов он подхватит по запросам
+        if AppConfig.MARKET_DATA_GATEWAY and commands and not MarketDataGatewayClient.is_running():
+            await run_command(f"python3 {current_dir}/market_data_gateway.py {','.join(gateway_figi)} "
+                              f">> ~/log/all.log 2>&1")
+            sleep(2)
+
         # запускаем торговых ботов
         for command in commands:
             tasks = [run_command(command)]
@@ -0,0 +1,112 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from app.cache import CandleArchive
+
+
+def add_minute(archive_dir: str, minute: int):
+    archive = CandleArchive('TEST')
+    archive.dir = archive_dir
+    archive.meta_file = os.path.join(archive_dir, 'meta.json')
+    archive.add_rows([(f'2024-10-23 05:{minute:02d}:00+00:00', 10.1, 10.3, 10.05, 10.2, minute)])
+
+
+class TestCandleArchive(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.archive = CandleArchive('TEST')
+        self.archive.dir = os.path.join(self.tmp_dir.name, 'TEST')
+        self.archive.meta_file = os.path.join(self.archive.dir, 'meta.json')
+
+        self.rows = [
+            ('2024-10-23 04:00:00+00:00', 10.1, 10.3, 10.05, 10.2, 5),
+            ('2024-10-23 04:01:00+00:00', 10.2, 10.2, 10.1, 10.15, 7),
+            ('2024-10-24 00:00', 0, 0, 0, 0, 0),
+            ('2024-10-25 04:00:00+00:00', 0.07, 0.07, 0.07, 0.07, 1),
+            ('2024-10-25 04:05:00+00:00', 0.09, 0.1, 0.01, 0.03, 2),
+            ('2024-11-01 04:00:00+00:00', 101.7, 101.9, 101.3, 101.8, 3),
+            ('2024-11-01 04:01:00+00:00', 101.8, 102.0, 101.7, 101.9, 4),
+        ]
+
+    def tearDown(self):
+        self.archive.clear()
+        self.tmp_dir.cleanup()
+
+    def test_migrate(self):
+        db_file = os.path.join(self.tmp_dir.name, 'c_TEST.db')
+        conn = sqlite3.connect(db_file)
+        conn.execute('CREATE TABLE candles (date DATETIME PRIMARY KEY, open REAL, high REAL, low REAL, close REAL, '
+                     'volume INTEGER)')
+        conn.executemany('INSERT INTO candles VALUES (?, ?, ?, ?, ?, ?)', self.rows)
+        conn.execute('CREATE TABLE instrument (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+        conn.execute("INSERT INTO instrument VALUES ('round_signs', '2')")
+        conn.commit()
+        conn.close()
+
+        self.assertEqual(self.archive.migrate_from_sqlite(db_file), len(self.rows))
+        self.assertEqual(self.archive.get_digits(), 2)
+
+        day = self.archive.get_day('2024-10-23')
+        self.assertEqual(day['time'].tolist(), [240, 241])
+        self.assertEqual(day['open'].tolist(), [10.1, 10.2])
+        self.assertEqual(day['low'].tolist(), [10.05, 10.1])
+        self.assertEqual(day['volume'].tolist(), [5, 7])
+
+        # признак дня без данных
+        self.assertEqual(len(self.archive.get_day('2024-10-24')['time']), 0)
+
+        # цены восстанавливаются точно
+        self.assertEqual(self.archive.get_day('2024-10-25')['close'].tolist(), [0.07, 0.03])
+        self.assertEqual(self.archive.get_day('2024-11-01')['high'].tolist(), [101.9, 102.0])
+
+        # дня нет в архиве
+        self.assertIsNone(self.archive.get_day('2024-10-26'))
+        self.assertIsNone(self.archive.get_day('2024-12-01'))
+        self.assertTrue(self.archive.has_day('2024-10-24'))
+        self.assertFalse(self.archive.has_day('2024-10-26'))
+
+    def create_db(self, name: str, rows: list[tuple]) -> str:
+        db_file = os.path.join(self.tmp_dir.name, f'{name}.db')
+        conn = sqlite3.connect(db_file)
+        conn.execute('CREATE TABLE candles (date DATETIME PRIMARY KEY, open REAL, high REAL, low REAL, close REAL, '
+                     'volume INTEGER)')
+        conn.executemany('INSERT INTO candles VALUES (?, ?, ?, ?, ?, ?)', rows)
+        conn.commit()
+        conn.close()
+        return db_file
+
+    def test_migrate_digits(self):
+        # в базе только признак дня без данных и нет инструмента: масштаб не угадывается по ценам
+        self.archive.migrate_from_sqlite(self.create_db('marker', [('2024-10-19 00:00', 0, 0, 0, 0, 0)]))
+        self.assertEqual(self.archive.get_digits(), CandleArchive.DEFAULT_DIGITS)
+
+        self.archive.add_rows([
+            ('2024-10-21 04:00:00+00:00', 123.456, 123.5, 123.4, 123.45, 1),
+            ('2024-10-21 04:01:00+00:00', 123.45, 123.46, 123.401, 123.4, 2),
+        ])
+        day = self.archive.get_day('2024-10-21')
+        self.assertEqual([day[name].tolist() for name in ['open', 'high', 'low', 'close']],
+                         [[123.456, 123.45], [123.5, 123.46], [123.4, 123.401], [123.45, 123.4]])
+
+        # грубые цены выборки масштаб не уменьшают
+        self.archive.migrate_from_sqlite(self.create_db('coarse', [('2024-10-22 04:00:00+00:00', 123, 124, 123, 123, 1)]))
+        self.assertEqual(self.archive.get_digits(), CandleArchive.DEFAULT_DIGITS)
+
+    def test_add_rows_keeps_existing(self):
+        self.archive.add_rows(self.rows[:2])
+        self.archive.add_rows([('2024-10-23 04:00:00+00:00', 1, 1, 1, 1, 1), self.rows[3], self.rows[4]])
+
+        self.assertEqual(self.archive.get_day('2024-10-23')['open'].tolist(), [10.1, 10.2])
+        self.assertEqual(self.archive.get_day('2024-10-25')['open'].tolist(), [0.07, 0.09])
+
+    def test_add_rows_processes(self):
+        """Записи из нескольких процессов в один месяц не теряются"""
+        self.archive.set_digits(2)
+        with ProcessPoolExecutor(max_workers=4) as executor:
+            list(executor.map(add_minute, repeat(self.archive.dir), range(60)))
+
+        self.assertEqual(self.archive.get_day('2024-10-23')['volume'].tolist(), list(range(60)))
@@ -0,0 +1,102 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from tinkoff.invest import GetCandlesResponse, HistoricCandle, Quotation
+
+from app import AppConfig
+from app.cache import CandleBackfill, TickerCache, InstrumentDTO
+
+
+class FakeMarketData:
+    def __init__(self, empty_days: set, fail_days: set):
+        self.empty_days = empty_days
+        self.fail_days = fail_days
+        self.requests = []
+
+    async def get_candles(self, figi, from_, to, interval):
+        date = from_.strftime("%Y-%m-%d")
+        self.requests.append((figi, date))
+        if date in self.fail_days:
+            raise RuntimeError('RESOURCE_EXHAUSTED')
+        if date in self.empty_days:
+            return GetCandlesResponse(candles=[])
+
+        return GetCandlesResponse(candles=[
+            HistoricCandle(
+                time=from_.replace(hour=7, minute=minute),
+                open=Quotation(units=100, nano=500000000),
+                high=Quotation(units=101, nano=0),
+                low=Quotation(units=100, nano=0),
+                close=Quotation(units=100, nano=700000000),
+                volume=10 + minute,
+                is_complete=True,
+            )
+            for minute in range(2)
+        ])
+
+
+class FakeClient:
+    def __init__(self, market_data: FakeMarketData):
+        self.market_data = market_data
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+
+class TestCandleBackfill(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        os.makedirs(os.path.join(self.tmp_dir.name, 'db'))
+        self.patcher = patch.object(AppConfig, 'BASE_DIR', self.tmp_dir.name)
+        self.patcher.start()
+
+        self.ticker_cache = TickerCache('TEST')
+        self.ticker_cache.instrument = InstrumentDTO(ticker='TEST', figi='FIGI_TEST', round_signs=2)
+
+        self.market_data = FakeMarketData(empty_days={'2024-04-23'}, fail_days={'2024-04-24'})
+
+    def tearDown(self):
+        self.ticker_cache.archive.clear()
+        self.ticker_cache.close_connection()
+        self.patcher.stop()
+        self.tmp_dir.cleanup()
+
+    def test_run(self):
+        progress = []
+        backfill = CandleBackfill(
+            ['TEST'], '2024-04-25', 4,
+            rate_limit=60000,
+            concurrency=2,
+            client_factory=lambda: FakeClient(self.market_data),
+            on_progress=lambda: progress.append(1),
+        )
+        days = backfill.days_list
+        self.assertEqual(days, ['2024-04-22', '2024-04-23', '2024-04-24', '2024-04-25'])
+
+        jobs = [(self.ticker_cache, date) for date in self.ticker_cache.get_missing_days(days)]
+        self.assertEqual(backfill.run(jobs), 3)
+        self.assertEqual(len(progress), 4)
+        self.assertEqual([(ticker, date) for ticker, date, _ in backfill.errors], [('TEST', '2024-04-24')])
+        self.assertEqual({figi for figi, _ in self.market_data.requests}, {'FIGI_TEST'})
+
+        rows = self.ticker_cache.get_candles_rows('2024-04-22')
+        self.assertEqual(rows, [
+            ('2024-04-22 07:00:00+00:00', 100.5, 101.0, 100.0, 100.7, 10),
+            ('2024-04-22 07:01:00+00:00', 100.5, 101.0, 100.0, 100.7, 11),
+        ])
+        # признак дня без данных
+        self.assertEqual(self.ticker_cache.get_candles_rows('2024-04-23'), [('2024-04-23 00:00', 0, 0, 0, 0, 0)])
+
+        # повторно запрашивается только день с ошибкой
+        self.assertEqual(self.ticker_cache.get_missing_days(days), ['2024-04-24'])
+
+    def test_api_day_bounds(self):
+        from_time, to_time = TickerCache.get_api_day_bounds('2024-04-22')
+        self.assertEqual(from_time, datetime(2024, 4, 22, 3, 55, tzinfo=timezone.utc))
+        self.assertEqual(to_time, datetime(2024, 4, 22, 23, 59, tzinfo=timezone.utc))
@@ -0,0 +1,50 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from app.cache import DayResultCache
+from app.dto import TestBotTradeDayDto
+
+
+class TestDayResultCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        db_file = os.path.join(self.tmp_dir.name, 'test_results.db')
+        self.patcher = patch.object(DayResultCache, 'get_db_file', return_value=db_file)
+        self.patcher.start()
+        DayResultCache.close_connection()
+
+    def tearDown(self):
+        DayResultCache.close_connection()
+        self.patcher.stop()
+        self.tmp_dir.cleanup()
+
+    def test_set_get(self):
+        day = TestBotTradeDayDto(operations=5, end_price=101.5, end_cnt=2, start_price=100.0, start_cnt=0,
+                                 day_sum=-203.0)
+        DayResultCache.set('b_2024-04-22-conf-0', day)
+
+        self.assertEqual(day, DayResultCache.get('b_2024-04-22-conf-0'))
+        self.assertIsNone(DayResultCache.get('b_2024-04-23-conf-0'))
+
+    def test_other_version(self):
+        DayResultCache.set('b_2024-04-22-conf-0', TestBotTradeDayDto(operations=1))
+
+        with patch.object(DayResultCache, 'get_version', return_value='other'):
+            self.assertIsNone(DayResultCache.get('b_2024-04-22-conf-0'))
+            self.assertEqual(1, DayResultCache.clear_old_versions())
+
+    def test_threads(self):
+        DayResultCache.set('b_2024-04-22-conf-0', TestBotTradeDayDto(operations=1))
+
+        # параллельные тесты в потоках читают и пишут кэш каждый через свое соединение
+        def read_write(i):
+            DayResultCache.set(f'b_2024-04-23-conf-{i}', TestBotTradeDayDto(operations=i))
+            return DayResultCache.get('b_2024-04-22-conf-0').operations
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            self.assertEqual(list(executor.map(read_write, range(8))), [1] * 8)
+
+        self.assertEqual(7, DayResultCache.get('b_2024-04-23-conf-7').operations)
@@ -0,0 +1,84 @@
+import json
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+
+from tinkoff.invest import Quotation
+
+from app import AppConfig
+from app.cache import InstrumentCatalog
+
+
+class TestInstrumentCatalog(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        os.makedirs(os.path.join(self.tmp_dir.name, 'db'))
+        self.patcher = patch.object(AppConfig, 'BASE_DIR', self.tmp_dir.name)
+        self.patcher.start()
+        InstrumentCatalog.clear()
+
+        shares = [
+            self.make_share('SBER', 'BBG004730N88', Quotation(units=0, nano=10000000), 10),
+            self.make_share('VTBR', 'BBG004730ZJ9', Quotation(units=0, nano=5000), 10000),
+            self.make_share('PLZL', 'BBG000R607Y3', Quotation(units=1, nano=0), 1),
+        ]
+        self.client = MagicMock()
+        self.client.__enter__.return_value.instruments.shares.return_value = SimpleNamespace(instruments=shares)
+        self.client_patcher = patch('app.cache.instrument_catalog.Client', return_value=self.client)
+        self.client_patcher.start()
+
+    def tearDown(self):
+        self.client_patcher.stop()
+        InstrumentCatalog.clear()
+        self.patcher.stop()
+        self.tmp_dir.cleanup()
+
+    @staticmethod
+    def make_share(ticker, figi, min_price_increment, lot):
+        return SimpleNamespace(ticker=ticker, figi=figi, name=ticker.lower(), currency='rub',
+                               min_price_increment=min_price_increment, lot=lot, short_enabled_flag=True)
+
+    def get_fetch_cnt(self):
+        return self.client.__enter__.return_value.instruments.shares.call_count
+
+    def test_lookup(self):
+        sber = InstrumentCatalog.get_by_ticker('SBER')
+        self.assertEqual((sber.figi, sber.round_signs, sber.min_increment, sber.lot), ('BBG004730N88', 2, 0.01, 10))
+        self.assertEqual(InstrumentCatalog.get_by_figi('BBG004730ZJ9').ticker, 'VTBR')
+        self.assertEqual(InstrumentCatalog.get_by_ticker('VTBR').round_signs, 6)
+        self.assertEqual(InstrumentCatalog.get_by_ticker('PLZL').round_signs, 0)
+        self.assertIsNone(InstrumentCatalog.get_by_ticker('NONE'))
+
+        # справочник загружен из API один раз
+        self.assertEqual(self.get_fetch_cnt(), 1)
+
+    def test_file(self):
+        InstrumentCatalog.get_by_ticker('SBER')
+
+        # новый процесс берет справочник из файла
+        InstrumentCatalog.clear()
+        self.assertEqual(InstrumentCatalog.get_by_ticker('SBER').figi, 'BBG004730N88')
+        self.assertEqual(self.get_fetch_cnt(), 1)
+
+        # устаревший файл загружается заново
+        InstrumentCatalog.clear()
+        with patch.object(AppConfig, 'INSTRUMENT_CATALOG_TTL', 0):
+            InstrumentCatalog.get_by_ticker('SBER')
+        self.assertEqual(self.get_fetch_cnt(), 2)
+
+    def test_other_fields(self):
+        InstrumentCatalog.get_by_ticker('SBER')
+
+        # файл записан для другого набора полей InstrumentDTO
+        with open(InstrumentCatalog.get_file()) as f:
+            data = json.load(f)
+        for row in data['instruments']:
+            del row['lot']
+        with open(InstrumentCatalog.get_file(), 'w') as f:
+            json.dump(data, f)
+
+        InstrumentCatalog.clear()
+        self.assertEqual(InstrumentCatalog.get_by_ticker('SBER').lot, 10)
+        self.assertEqual(self.get_fetch_cnt(), 2)
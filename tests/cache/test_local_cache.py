@@ -0,0 +1,71 @@
+import unittest
+
+import numpy as np
+
+from app.cache import LocalCache
+
+
+class TestLocalCache(unittest.TestCase):
+    def setUp(self):
+        LocalCache.clear()
+        self.limits = dict(LocalCache.LIMITS)
+        self.byte_limits = dict(LocalCache.BYTE_LIMITS)
+
+    def tearDown(self):
+        LocalCache.LIMITS = self.limits
+        LocalCache.BYTE_LIMITS = self.byte_limits
+        LocalCache.clear()
+
+    def test_namespace(self):
+        self.assertEqual(LocalCache.get_namespace('candle_day_SBER_2024-04-22'), 'candle_day_')
+        self.assertEqual(LocalCache.get_namespace('candle_arr_SBER_2024-04-22'), 'candle_arr_')
+        self.assertEqual(LocalCache.get_namespace('candle_SBER_2024-04-22'), 'candle_')
+        self.assertEqual(LocalCache.get_namespace('b_2024-04-22-conf-0'), 'b_')
+        self.assertEqual(LocalCache.get_namespace('other'), LocalCache.DEFAULT_NAMESPACE)
+
+    def test_lru_eviction(self):
+        LocalCache.set_limit('b_', 2)
+        LocalCache.set('b_1', 1)
+        LocalCache.set('b_2', 2)
+
+        # b_1 используется последним, вытесняется b_2
+        self.assertEqual(LocalCache.get('b_1'), 1)
+        LocalCache.set('b_3', 3)
+
+        self.assertIsNone(LocalCache.get('b_2'))
+        self.assertEqual(LocalCache.get('b_1'), 1)
+        self.assertEqual(LocalCache.get('b_3'), 3)
+
+        stats = LocalCache.get_stats()['b_']
+        self.assertEqual(stats, {'hits': 3, 'misses': 1, 'evictions': 1, 'size': 2})
+
+    def test_byte_limit(self):
+        # массивы по 800 байт, в лимит помещаются два
+        LocalCache.set_byte_limit('candle_arr_', 2000)
+        LocalCache.set('candle_arr_1', np.zeros(100))
+        LocalCache.set('candle_arr_2', np.zeros(100))
+        LocalCache.set('candle_arr_2', np.zeros(100))
+        self.assertEqual(LocalCache.get_nbytes('candle_arr_'), 1600)
+
+        LocalCache.set('candle_arr_3', np.zeros(100))
+        self.assertIsNone(LocalCache.get('candle_arr_1'))
+        self.assertIsNotNone(LocalCache.get('candle_arr_2'))
+        self.assertEqual(LocalCache.get_nbytes('candle_arr_'), 1600)
+
+        # значение больше лимита остается одно
+        LocalCache.set('candle_arr_4', np.zeros(1000))
+        self.assertEqual(LocalCache.get_stats()['candle_arr_']['size'], 1)
+        self.assertEqual(LocalCache.get_nbytes('candle_arr_'), 8000)
+
+        LocalCache.set_byte_limit('candle_arr_', None)
+        LocalCache.set('candle_arr_5', np.zeros(100))
+        self.assertEqual(LocalCache.get_nbytes('candle_arr_'), 8800)
+
+    def test_counters(self):
+        LocalCache.inc_counter('cache_miss')
+        LocalCache.inc_counter('cache_miss')
+        self.assertEqual(LocalCache.get_counter('cache_miss'), 2)
+        self.assertEqual(LocalCache.get_counter('cache_find'), 0)
+
+        LocalCache.clear()
+        self.assertEqual(LocalCache.get_counter('cache_miss'), 0)
@@ -0,0 +1,138 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from unittest.mock import patch
+
+from app import AppConfig
+from app.cache import TickerCache, InstrumentDTO, LocalCache
+from app.helper import q2f
+
+
+class TestTickerCacheDayCandles(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        os.makedirs(os.path.join(self.tmp_dir.name, 'db'))
+        self.patcher = patch.object(AppConfig, 'BASE_DIR', self.tmp_dir.name)
+        self.patcher.start()
+
+        self.ticker_cache = TickerCache('TEST')
+        self.ticker_cache.instrument = InstrumentDTO(ticker='TEST', figi='FIGI_TEST', round_signs=2)
+
+        conn = self.ticker_cache.get_connection()
+        conn.executemany('INSERT INTO candles (date, open, high, low, close, volume) VALUES (?, ?, ?, ?, ?, ?)', [
+            ('2024-04-22 04:00:00+00:00', 10.1, 10.3, 10.05, 10.2, 5),
+            ('2024-04-22 07:00:00+00:00', 10.2, 10.6, 10.1, 10.15, 7),
+            ('2024-04-22 20:49:00+00:00', 10.15, 10.2, 9.9, 10.0, 1),
+            ('2024-04-23 00:00', 0, 0, 0, 0, 0),
+            ('2024-04-24 04:00:00+00:00', 0.07, 0.07, 0.07, 0.07, 1),
+            ('2024-04-24 04:05:00+00:00', 0.09, 0.1, 0.01, 0.03, 2),
+        ])
+        conn.commit()
+
+    def tearDown(self):
+        self.ticker_cache.archive.clear()
+        self.ticker_cache.close_connection()
+        self.patcher.stop()
+        self.tmp_dir.cleanup()
+
+    def test_day_column(self):
+        # день заполняет триггер, запрос по дню берет только свои свечи
+        cursor = self.ticker_cache.get_connection().cursor()
+        cursor.execute('SELECT DISTINCT day FROM candles ORDER BY day')
+        self.assertEqual(cursor.fetchall(), [('2024-04-22',), ('2024-04-23',), ('2024-04-24',)])
+
+        rows = self.ticker_cache.get_candles_rows('2024-04-22')
+        self.assertEqual([row[0] for row in rows],
+                         ['2024-04-22 04:00:00+00:00', '2024-04-22 07:00:00+00:00', '2024-04-22 20:49:00+00:00'])
+        self.assertEqual(self.ticker_cache.get_candles_rows('2024-04-23'), [('2024-04-23 00:00', 0, 0, 0, 0, 0)])
+
+        cursor.execute('EXPLAIN QUERY PLAN SELECT * FROM candles WHERE day = ?', ('2024-04-22',))
+        self.assertIn('candles_day_index', str(cursor.fetchall()))
+
+    def test_migrate_database(self):
+        # база старого формата: без колонки day
+        db_file = os.path.join(self.tmp_dir.name, 'db', 'c_OLD.db')
+        conn = sqlite3.connect(db_file)
+        conn.execute('CREATE TABLE candles (date DATETIME PRIMARY KEY, open REAL, high REAL, low REAL, close REAL, '
+                     'volume INTEGER)')
+        conn.executemany('INSERT INTO candles VALUES (?, ?, ?, ?, ?, ?)', [
+            ('2024-04-22 04:00:00+00:00', 10.1, 10.3, 10.05, 10.2, 5),
+            ('2024-04-23 00:00', 0, 0, 0, 0, 0),
+        ])
+        conn.commit()
+        conn.close()
+
+        ticker_cache = TickerCache('OLD')
+        try:
+            conn = ticker_cache.get_connection()
+            conn.execute('INSERT INTO candles (date, open, high, low, close, volume) VALUES (?, ?, ?, ?, ?, ?)',
+                         ('2024-04-24 04:00:00+00:00', 0.07, 0.07, 0.07, 0.07, 1))
+            conn.commit()
+
+            cursor = conn.cursor()
+            cursor.execute('SELECT date, day FROM candles ORDER BY date')
+            self.assertEqual(cursor.fetchall(), [
+                ('2024-04-22 04:00:00+00:00', '2024-04-22'),
+                ('2024-04-23 00:00', '2024-04-23'),
+                ('2024-04-24 04:00:00+00:00', '2024-04-24'),
+            ])
+            self.assertEqual(len(ticker_cache.get_candles_rows('2024-04-22')), 1)
+        finally:
+            ticker_cache.close_connection()
+
+    def test_load_candles_range(self):
+        self.ticker_cache.load_candles_range('2024-04-21', '2024-04-25')
+
+        archive = self.ticker_cache.archive
+        self.assertEqual(archive.get_day('2024-04-22')['time'].tolist(), [240, 420, 1249])
+        self.assertEqual(len(archive.get_day('2024-04-23')['time']), 0)
+        self.assertEqual(archive.get_day('2024-04-24')['close'].tolist(), [0.07, 0.03])
+        self.assertIsNone(archive.get_day('2024-04-25'))
+
+    def test_get_candles_range(self):
+        with patch.object(self.ticker_cache, 'get_candles_rows') as get_candles_rows:
+            days = self.ticker_cache.get_candles_range('2024-04-21', '2024-04-25')
+        # все дни одним запросом, без запросов по дням
+        get_candles_rows.assert_not_called()
+
+        self.assertEqual(list(days.keys()), ['2024-04-22', '2024-04-23', '2024-04-24'])
+        self.assertEqual(days['2024-04-22']['time'].tolist(), [240, 420, 1249])
+        self.assertEqual(days['2024-04-22']['high'].tolist(), [10.3, 10.6, 10.2])
+        self.assertEqual(len(days['2024-04-23']['time']), 0)
+        self.assertEqual(days['2024-04-24']['low'].tolist(), [0.07, 0.01])
+
+    def test_materialize_day_candles(self):
+        rows = self.ticker_cache.materialize_day_candles(['2024-04-22', '2024-04-23', '2024-04-24', '2024-04-25'])
+        self.assertEqual(rows, {
+            '2024-04-22': ('2024-04-22', 10.1, 10.6, 9.9, 10.0, 13),
+            '2024-04-23': ('2024-04-23', 0, 0, 0, 0, 0),
+            '2024-04-24': ('2024-04-24', 0.07, 0.1, 0.01, 0.03, 3),
+        })
+
+        cursor = self.ticker_cache.get_connection().cursor()
+        cursor.execute('SELECT * FROM candles_day ORDER BY date')
+        self.assertEqual(cursor.fetchall(), sorted(rows.values()))
+
+    def test_get_day_candles(self):
+        LocalCache.clear()
+        with patch('app.cache.ticker_cache.Client') as client:
+            candles = self.ticker_cache.get_day_candles(datetime(2024, 4, 22), datetime(2024, 4, 24)).candles
+            client.assert_not_called()
+
+        # день без торгов в ответ не попадает
+        self.assertEqual([candle.time for candle in candles], [datetime(2024, 4, 22), datetime(2024, 4, 24)])
+        self.assertEqual([q2f(candle.high) for candle in candles], [10.6, 0.1])
+        self.assertEqual([candle.volume for candle in candles], [13, 3])
+
+    def test_connection_per_thread(self):
+        # тесты в ноутбуках гоняются в ThreadPoolExecutor - у каждого потока свое соединение
+        def count_candles():
+            return self.ticker_cache.get_connection().execute('SELECT COUNT(*) FROM candles').fetchone()[0]
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            self.assertEqual(list(executor.map(lambda _: count_candles(), range(4))), [6] * 4)
+
+        self.assertEqual(count_candles(), 6)
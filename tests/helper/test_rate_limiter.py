@@ -0,0 +1,42 @@
+import asyncio
+import unittest
+
+from app.helper import RateLimiter
+
+
+class TestRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.
+        self.limiter = RateLimiter(rate=2, capacity=3, timer=lambda: self.now)
+
+    def test_burst_and_refill(self):
+        # корзина заполнена - capacity запросов без ожидания
+        self.assertEqual([self.limiter.try_acquire() for _ in range(3)], [0., 0., 0.])
+        self.assertAlmostEqual(self.limiter.try_acquire(), 0.5)
+
+        self.now = 0.25
+        self.assertAlmostEqual(self.limiter.try_acquire(), 0.25)
+
+        self.now = 0.5
+        self.assertEqual(self.limiter.try_acquire(), 0.)
+
+        # токены не копятся сверх capacity
+        self.now = 100
+        self.assertEqual([self.limiter.try_acquire() for _ in range(3)], [0., 0., 0.])
+        self.assertGreater(self.limiter.try_acquire(), 0)
+
+    def test_per_minute(self):
+        limiter = RateLimiter.per_minute(120, timer=lambda: self.now)
+        self.assertEqual(limiter.rate, 2)
+        self.assertEqual(limiter.capacity, 1)
+
+    def test_acquire(self):
+        limiter = RateLimiter(rate=1000, capacity=2)
+
+        async def run():
+            for _ in range(5):
+                await limiter.acquire()
+
+        asyncio.run(run())
+        self.assertLess(limiter.tokens, 1)
+
@@ -0,0 +1,38 @@
+import unittest
+from datetime import datetime, timedelta
+
+from tinkoff.invest import SecurityTradingStatus
+
+from app.helper import TradingCalendar
+from app.helper.day_exclusions import DayExclusions
+
+
+class TestTradingCalendar(unittest.TestCase):
+    def test_is_weekend(self):
+        ex = DayExclusions()
+        day = datetime(2022, 12, 1)
+        while day < datetime(2026, 2, 1):
+            expected = (day.weekday() < 5) == ex.is_exclusion(day)
+            self.assertEqual(TradingCalendar.is_weekend(day), expected, day)
+            day += timedelta(days=1)
+
+    def test_get_status(self):
+        for schedule, weekend in [
+            (TradingCalendar.WORK_DAY_SCHEDULE, False),
+            (TradingCalendar.WEEKEND_DAY_SCHEDULE, True),
+        ]:
+            # 2024-04-26 - пятница, 2024-04-28 - воскресенье
+            day = datetime(2024, 4, 28 if weekend else 26)
+            for minute in range(TradingCalendar.MINUTES_IN_DAY):
+                dt = day + timedelta(minutes=minute)
+                time_str = dt.strftime('%H:%M')
+                expected = SecurityTradingStatus.SECURITY_TRADING_STATUS_NOT_AVAILABLE_FOR_TRADING
+                for key in sorted(schedule.keys()):
+                    if time_str < key:
+                        break
+                    expected = schedule[key]
+                self.assertEqual(TradingCalendar.get_status(dt), expected, time_str)
+
+    def test_get_trading_days(self):
+        self.assertEqual(TradingCalendar.get_trading_days('2024-04-30', 3), ['2024-04-28', '2024-04-29', '2024-04-30'])
+        self.assertEqual(TradingCalendar.get_trading_days('2024-04-30', 1), ['2024-04-30'])
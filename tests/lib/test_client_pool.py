@@ -0,0 +1,108 @@
+import unittest
+from unittest.mock import patch
+
+from grpc import StatusCode
+from tinkoff.invest import RequestError
+
+from app import AppConfig
+from app.lib import ClientPool
+
+
+class FakeServices:
+    def __init__(self):
+        self.healthy = True
+        self.requests = 0
+
+    def get_info(self):
+        if not self.healthy:
+            raise RequestError(StatusCode.UNAVAILABLE, 'down', None)
+
+    @property
+    def users(self):
+        return self
+
+
+class FakeClient:
+    """Канал-заглушка: считает открытия и закрытия"""
+    opened = []
+
+    def __init__(self, token):
+        self.token = token
+        self.closed = False
+        self.services = FakeServices()
+
+    def __enter__(self):
+        FakeClient.opened.append(self)
+        return self.services
+
+    def __exit__(self, *args):
+        self.closed = True
+
+
+class TestClientPool(unittest.TestCase):
+    def setUp(self):
+        FakeClient.opened = []
+        ClientPool.clients = {}
+        self.patcher = patch('app.lib.client_pool.Client', FakeClient)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        ClientPool.clients = {}
+
+    def test_reuse(self):
+        for _ in range(3):
+            with ClientPool.client('token') as client:
+                client.requests += 1
+
+        with ClientPool.client('other') as client:
+            client.requests += 1
+
+        self.assertEqual(len(FakeClient.opened), 2)
+        self.assertEqual(FakeClient.opened[0].services.requests, 3)
+
+    def test_reconnect_on_error(self):
+        with self.assertRaises(RequestError):
+            with ClientPool.client('token'):
+                raise RequestError(StatusCode.UNAVAILABLE, 'down', None)
+        self.assertTrue(FakeClient.opened[0].closed)
+
+        # ошибка запроса, а не соединения - канал остается
+        with self.assertRaises(RequestError):
+            with ClientPool.client('token'):
+                raise RequestError(StatusCode.INVALID_ARGUMENT, 'bad', None)
+
+        with ClientPool.client('token'):
+            pass
+
+        self.assertEqual(len(FakeClient.opened), 2)
+        self.assertFalse(FakeClient.opened[1].closed)
+
+    def test_health_check(self):
+        with ClientPool.client('token'):
+            pass
+
+        with patch.object(AppConfig, 'CLIENT_HEALTH_CHECK_INTERVAL', 0):
+            # проверка прошла - клиент тот же
+            with ClientPool.client('token'):
+                pass
+            self.assertEqual(len(FakeClient.opened), 1)
+
+            FakeClient.opened[0].services.healthy = False
+            with ClientPool.client('token'):
+                pass
+
+        self.assertEqual(len(FakeClient.opened), 2)
+        self.assertTrue(FakeClient.opened[0].closed)
+
+    def test_other_process(self):
+        with ClientPool.client('token'):
+            pass
+
+        with patch('app.lib.client_pool.os.getpid', return_value=-1):
+            with ClientPool.client('token'):
+                pass
+
+        self.assertEqual(len(FakeClient.opened), 2)
+        # чужой канал не закрывается
+        self.assertFalse(FakeClient.opened[0].closed)
@@ -0,0 +1,93 @@
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+from tinkoff.invest import Quotation, SecurityTradingStatus
+
+from bot.env.prod import MarketDataGateway, MarketDataGatewayClient
+
+
+class FakeMarketData:
+    def __init__(self):
+        self.requests = []
+
+    def get_last_prices(self, figi):
+        self.requests.append(('prices', list(figi)))
+        return SimpleNamespace(last_prices=[
+            SimpleNamespace(figi=f, price=Quotation(units=100, nano=500000000)) for f in figi])
+
+    def get_trading_statuses(self, instrument_ids):
+        self.requests.append(('statuses', list(instrument_ids)))
+        return SimpleNamespace(trading_statuses=[SimpleNamespace(
+            figi=f,
+            trading_status=SecurityTradingStatus.SECURITY_TRADING_STATUS_NORMAL_TRADING,
+            limit_order_available_flag=True,
+            market_order_available_flag=True,
+            api_trade_available_flag=True,
+            bestprice_order_available_flag=False,
+        ) for f in instrument_ids])
+
+
+class FakeClient:
+    def __init__(self, market_data):
+        self.market_data = market_data
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+class TestMarketDataGateway(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.tmpdir.name, 'gateway.sock')
+        self.market_data = FakeMarketData()
+        self.gateway = MarketDataGateway(['FIGI1'], self.socket_path, interval=60,
+                                         client_factory=lambda: FakeClient(self.market_data))
+
+    def tearDown(self):
+        self.gateway.stop()
+        self.tmpdir.cleanup()
+
+    def test_batch_poll(self):
+        self.gateway.start()
+        self.assertTrue(MarketDataGatewayClient.is_running(self.socket_path))
+
+        client1 = MarketDataGatewayClient('FIGI1', self.socket_path)
+        client2 = MarketDataGatewayClient('FIGI2', self.socket_path)
+
+        # первый запрос по новому инструменту - данных нет, инструмент добавляется в опрос
+        self.assertIsNone(client2.get_last_price())
+
+        self.gateway.poll()
+        self.assertEqual(self.market_data.requests[-2:], [('prices', ['FIGI1', 'FIGI2']),
+                                                          ('statuses', ['FIGI1', 'FIGI2'])])
+
+        # все боты читают результат одного пакетного запроса
+        self.assertEqual(client1.get_last_price(), Quotation(units=100, nano=500000000))
+        self.assertEqual(client2.get_last_price(), Quotation(units=100, nano=500000000))
+        status = client1.get_trading_status()
+        self.assertEqual(status['trading_status'], SecurityTradingStatus.SECURITY_TRADING_STATUS_NORMAL_TRADING)
+        self.assertTrue(status['limit_order_available_flag'])
+        self.assertFalse(status['bestprice_order_available_flag'])
+
+    def test_expire(self):
+        self.gateway.handle_request(b'{"figi": "FIGI2"}')
+        self.gateway.poll()
+
+        # устаревшие данные не отдаются
+        self.gateway.data['FIGI1']['updated_at'] = 0
+        self.assertIsNone(self.gateway.handle_request(b'{"figi": "FIGI1"}')['price'])
+
+        # инструменты без запросов от ботов перестают опрашиваться
+        self.gateway.figi_requested['FIGI2'] = -self.gateway.FIGI_TTL
+        self.assertEqual(self.gateway.get_active_figi(), ['FIGI1'])
+        self.assertNotIn('FIGI2', self.gateway.data)
+
+    def test_not_running(self):
+        self.assertFalse(MarketDataGatewayClient.is_running(self.socket_path))
+        self.assertIsNone(MarketDataGatewayClient('FIGI1', self.socket_path).get_last_price())
+        self.assertEqual(self.gateway.handle_request(b'bad'), {'error': 'bad request'})
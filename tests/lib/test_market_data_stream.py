@@ -0,0 +1,107 @@
+import threading
+import unittest
+from types import SimpleNamespace
+
+from tinkoff.invest import Quotation
+
+from bot.env.prod import MarketDataStream
+from bot.env.test import LoggerTestEnvHelper
+
+
+class FakeSubscription:
+    def __init__(self):
+        self.instruments = []
+
+    def subscribe(self, instruments):
+        self.instruments.extend(instruments)
+
+
+class FakeStream:
+    """Стрим-заглушка: отдает заданные сообщения, потом ждет остановки"""
+
+    def __init__(self, messages: list, wait_stop=False):
+        self.messages = messages
+        self.wait_stop = wait_stop
+        self.last_price = FakeSubscription()
+        self.info = FakeSubscription()
+        self.stopped = threading.Event()
+
+    def stop(self):
+        self.stopped.set()
+
+    def __iter__(self):
+        yield from self.messages
+        if self.wait_stop:
+            self.stopped.wait(5)
+
+
+class FakeClient:
+    def __init__(self, streams: list):
+        self.streams = streams
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def create_market_data_stream(self):
+        return self.streams.pop(0)
+
+
+def price_message(figi, units, nano=0):
+    return SimpleNamespace(last_price=SimpleNamespace(figi=figi, price=Quotation(units=units, nano=nano)),
+                           trading_status=None)
+
+
+def status_message(figi, limit_flag):
+    return SimpleNamespace(last_price=None, trading_status=SimpleNamespace(
+        figi=figi, trading_status=5, limit_order_available_flag=limit_flag, market_order_available_flag=limit_flag))
+
+
+class TestMarketDataStream(unittest.TestCase):
+    def setUp(self):
+        self.logger = LoggerTestEnvHelper(None, False)
+
+    def test_consume(self):
+        stream = MarketDataStream('token', 'FIGI', self.logger)
+        self.assertIsNone(stream.get_last_price())
+
+        fake_stream = FakeStream([
+            price_message('FIGI', 100, 500000000),
+            price_message('OTHER', 1),
+            status_message('FIGI', False),
+            price_message('FIGI', 101),
+        ])
+        stream.consume(fake_stream)
+
+        self.assertEqual([i.figi for i in fake_stream.last_price.instruments], ['FIGI'])
+        self.assertEqual([i.figi for i in fake_stream.info.instruments], ['FIGI'])
+        self.assertEqual(stream.get_last_price(), Quotation(units=101, nano=0))
+        self.assertFalse(stream.get_trading_status().limit_order_available_flag)
+
+        # без подключения данные не отдаются - клиент идет в API
+        stream.connected = False
+        self.assertIsNone(stream.get_last_price())
+        self.assertIsNone(stream.get_trading_status())
+
+    def test_reconnect(self):
+        streams = [
+            FakeStream([price_message('FIGI', 100)]),
+            FakeStream([price_message('FIGI', 102)], wait_stop=True),
+        ]
+        stream = MarketDataStream('token', 'FIGI', self.logger, client_factory=lambda: FakeClient(streams))
+        stream.RECONNECT_SLEEP = 0
+        stream.start()
+
+        for _ in range(100):
+            if not streams and stream.get_last_price() == Quotation(units=102, nano=0):
+                break
+            stream.stopped.wait(0.01)
+
+        self.assertEqual(stream.get_last_price(), Quotation(units=102, nano=0))
+
+        stream.stop()
+        stream.thread.join(5)
+        self.assertFalse(stream.thread.is_alive())
+        self.assertFalse(stream.connected)
@@ -0,0 +1,80 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from app import AppConfig
+from bot.env.prod import OrderStateTracker
+from bot.env.test import LoggerTestEnvHelper
+
+
+def trade_message(figi):
+    return SimpleNamespace(order_trades=SimpleNamespace(figi=figi), ping=None)
+
+
+class TestOrderStateTracker(unittest.TestCase):
+    def setUp(self):
+        self.orders = [SimpleNamespace(order_id='1'), SimpleNamespace(order_id='2')]
+        self.fetch_cnt = 0
+        self.tracker = OrderStateTracker('token', 'acc', 'FIGI', LoggerTestEnvHelper(None, False), self.fetch)
+
+    def fetch(self):
+        self.fetch_cnt += 1
+        return list(self.orders)
+
+    def get_ids(self):
+        return [order.order_id for order in self.tracker.get_active_orders()]
+
+    def test_one_request_per_iteration(self):
+        self.assertEqual(self.get_ids(), ['1', '2'])
+
+        # выставленные и снятые ботом заявки учитываются без запроса
+        self.tracker.add_order(SimpleNamespace(order_id='3'))
+        self.tracker.remove_order('1')
+        self.assertEqual(self.get_ids(), ['2', '3'])
+        self.assertEqual(self.fetch_cnt, 1)
+
+        # без стрима - новый запрос на каждой итерации
+        self.tracker.new_iteration()
+        self.assertEqual(self.get_ids(), ['1', '2'])
+        self.assertEqual(self.fetch_cnt, 2)
+
+    def test_fetch_error(self):
+        self.tracker.fetch_active_orders = lambda: None
+        self.assertIsNone(self.tracker.get_active_orders())
+
+        self.tracker.fetch_active_orders = self.fetch
+        self.assertEqual(self.get_ids(), ['1', '2'])
+
+    def test_stream(self):
+        stream = [trade_message('OTHER')]
+        self.tracker.consume(stream)
+
+        # после подключения стрима список запрашивается
+        self.get_ids()
+        self.assertEqual(self.fetch_cnt, 1)
+
+        # сделок по инструменту не было - запросов нет
+        self.tracker.new_iteration()
+        self.tracker.on_data(trade_message('OTHER'))
+        self.get_ids()
+        self.assertEqual(self.fetch_cnt, 1)
+
+        # была сделка по инструменту - запрос
+        self.tracker.on_data(trade_message('FIGI'))
+        self.get_ids()
+        self.assertEqual(self.fetch_cnt, 2)
+        self.tracker.new_iteration()
+        self.get_ids()
+        self.assertEqual(self.fetch_cnt, 2)
+
+        # не реже интервала обновления
+        self.tracker.new_iteration()
+        with patch.object(AppConfig, 'ORDER_STATE_REFRESH_INTERVAL', 0):
+            self.get_ids()
+        self.assertEqual(self.fetch_cnt, 3)
+
+        # стрим отключился - запрос на каждой итерации
+        self.tracker.stream_connected = False
+        self.tracker.new_iteration()
+        self.get_ids()
+        self.assertEqual(self.fetch_cnt, 4)
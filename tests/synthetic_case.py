@@ -0,0 +1,42 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from app import AppConfig
+from app.cache import LocalCache, TickerCache
+from bench.candle_generator import SyntheticCandleGenerator
+
+
+class SyntheticCandlesTestCase(unittest.TestCase):
+    """
+    Тесты симулятора на синтетических минутных свечах.
+    База тикера создается во временной папке, AppConfig.BASE_DIR подменяется на нее на время теста
+    """
+    TICKER = 'SYNTA'
+    # тикеры теста, если их несколько. у каждого свой seed: SEED, SEED + 1, ...
+    TICKERS: list[str] | None = None
+    LAST_DATE = '2024-10-24'
+    # календарных дней свечей, с запасом под окно подбора конфига
+    SEED_DAYS_NUM = 14
+    SEED = 1
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        os.makedirs(os.path.join(self.tmp_dir.name, 'db'))
+        self.patcher = patch.object(AppConfig, 'BASE_DIR', self.tmp_dir.name)
+        self.patcher.start()
+
+        LocalCache.clear()
+        for i, ticker in enumerate(self.get_tickers()):
+            SyntheticCandleGenerator(ticker, seed=self.SEED + i).seed_db(self.LAST_DATE, self.SEED_DAYS_NUM)
+
+    def tearDown(self):
+        for ticker in self.get_tickers():
+            TickerCache(ticker).close_connection()
+        LocalCache.clear()
+        self.patcher.stop()
+        self.tmp_dir.cleanup()
+
+    def get_tickers(self) -> list[str]:
+        return self.TICKERS or [self.TICKER]
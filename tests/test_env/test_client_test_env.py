@@ -1,9 +1,15 @@
 import unittest
+from unittest.mock import patch
 
+import numpy as np
 from tinkoff.invest import OrderDirection, OrderType, OrderExecutionReportStatus, PostOrderResponse, OrderState
 
 from test_helper import TestHelper
+from app.cache import LocalCache
+from bot.env.test import ClientTestEnvHelper, LoggerTestEnvHelper, TimeTestEnvHelper
 from bot.helper import OrderHelper
+from bot.test import TestAlgorithm
+from tests.synthetic_case import SyntheticCandlesTestCase
 
 
 class TestOrderHelper(unittest.TestCase):
@@ -76,7 +82,7 @@ class TestOrderHelper(unittest.TestCase):
         self.assertEqual(OrderHelper.get_lots(order_state), lots)
 
         # закрываем
-        self.client_helper.executed_orders_ids.append(order.order_id)
+        self.client_helper.executed_orders_ids.add(order.order_id)
 
         # закрытая
         order_state = self.client_helper.get_order_state(order)
@@ -85,5 +91,26 @@ class TestOrderHelper(unittest.TestCase):
         self.assertEqual(OrderHelper.get_lots(order_state), lots)
 
 
+class TestPreloadCandles(SyntheticCandlesTestCase):
+    def get_client(self) -> ClientTestEnvHelper:
+        time_helper = TimeTestEnvHelper()
+        return ClientTestEnvHelper(self.TICKER, LoggerTestEnvHelper(time_helper, False), time_helper)
+
+    def test_preload_candles(self):
+        """После предзагрузки периода дни берутся из кэша, без чтения архива по дням"""
+        days_list = TestAlgorithm.get_days_list(self.LAST_DATE, 5)
+        expected = {date: self.get_client().get_minute_candles_day(date) for date in days_list}
+
+        LocalCache.clear()
+        client = self.get_client()
+        client.preload_candles(days_list[0], days_list[-1])
+        with patch.object(client.ticker_cache, 'get_candles_columns') as get_candles_columns:
+            for date in days_list:
+                day_candles = client.get_minute_candles_day(date)
+                self.assertEqual(day_candles.candles_cnt, expected[date].candles_cnt)
+                np.testing.assert_array_equal(day_candles.close, expected[date].close)
+        get_candles_columns.assert_not_called()
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,23 @@
+import unittest
+
+from bot.env.test import LoggerTestEnvHelper
+
+
+class TestLoggerTestEnvHelper(unittest.TestCase):
+    def test_format_message(self):
+        self.assertEqual(LoggerTestEnvHelper.format_message('text'), 'text')
+        self.assertEqual(LoggerTestEnvHelper.format_message('a %s b %s', (1, 2)), 'a 1 b 2')
+        self.assertEqual(LoggerTestEnvHelper.format_message(lambda: 'lazy'), 'lazy')
+
+    def test_disabled(self):
+        logger = LoggerTestEnvHelper(None, do_printing=False)
+        self.assertFalse(logger.is_enabled())
+
+        # отложенное сообщение не форматируется
+        logger.log(lambda: self.fail('message formatted'))
+        self.assertEqual(logger.last_message, '')
+
+        # ошибки считаются всегда
+        logger.error('error %s', 1)
+        self.assertEqual(logger.last_error, 'error 1')
+        self.assertEqual(logger.error_cnt, 1)
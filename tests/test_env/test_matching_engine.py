@@ -0,0 +1,39 @@
+import unittest
+
+from tinkoff.invest import OrderDirection
+
+from bot.env.test import MatchingEngine
+
+
+class TestMatchingEngine(unittest.TestCase):
+    def setUp(self):
+        self.engine = MatchingEngine()
+        self.engine.add('1', OrderDirection.ORDER_DIRECTION_BUY, 99.)
+        self.engine.add('2', OrderDirection.ORDER_DIRECTION_BUY, 98.)
+        self.engine.add('3', OrderDirection.ORDER_DIRECTION_BUY, 98.)
+        self.engine.add('4', OrderDirection.ORDER_DIRECTION_SELL, 101.)
+        self.engine.add('5', OrderDirection.ORDER_DIRECTION_SELL, 102.)
+
+    def test_bounds(self):
+        self.assertEqual(self.engine.get_bounds(), (99., 101.))
+
+    def test_match(self):
+        # ничего не задето
+        self.assertEqual(self.engine.match(99.5, 100.5), [])
+
+        # граница цены исполняет заявку
+        self.assertEqual(sorted(self.engine.match(98., 101.)), ['1', '2', '3', '4'])
+        self.assertEqual(self.engine.executed_ids, {'1', '2', '3', '4'})
+        self.assertEqual(self.engine.get_bounds(), (None, 102.))
+
+    def test_remove(self):
+        self.assertTrue(self.engine.remove('1'))
+        self.assertFalse(self.engine.remove('1'))
+        self.assertEqual(self.engine.get_bounds(), (98., 101.))
+
+        self.engine.remove('2')
+        self.assertEqual(self.engine.match(97., 100.), ['3'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+from datetime import datetime, timezone
+
+from tinkoff.invest import HistoricCandle
+
+from app.helper import f2q, q2f
+from bot.env.test import MinuteCandlesDay
+
+
+class TestMinuteCandlesDay(unittest.TestCase):
+    @staticmethod
+    def make_candle(hour, minute, open_, high, low, close, volume=10) -> HistoricCandle:
+        return HistoricCandle(
+            time=datetime(2024, 4, 22, hour, minute, tzinfo=timezone.utc),
+            open=f2q(open_),
+            high=f2q(high),
+            low=f2q(low),
+            close=f2q(close),
+            volume=volume,
+            is_complete=True,
+        )
+
+    def test_from_candles(self):
+        candles = [
+            self.make_candle(4, 0, 100.1, 100.5, 99.8, 100.2),
+            self.make_candle(4, 2, 100.2, 101, 100, 100.9, 20),
+        ]
+        day = MinuteCandlesDay.from_candles(candles, lambda q: q2f(q, 2))
+
+        self.assertEqual(day.candles_cnt, 2)
+        self.assertTrue(day.has(240))
+        self.assertFalse(day.has(241))
+        self.assertTrue(day.has(242))
+
+        self.assertEqual(day.get_open(240), 100.1)
+        self.assertEqual(day.get_high(240), 100.5)
+        self.assertEqual(day.get_low(240), 99.8)
+        self.assertEqual(day.get_close(242), 100.9)
+        self.assertEqual(day.get_volume(242), 20)
+
+        candle = day.get_candle(242, datetime(2024, 4, 22, 4, 2, 1, tzinfo=timezone.utc))
+        self.assertEqual(q2f(candle.close), 100.9)
+        self.assertIsNone(day.get_candle(241, datetime(2024, 4, 22, 4, 1, tzinfo=timezone.utc)))
+
+    def test_get_aggregated(self):
+        candles = [
+            self.make_candle(4, 0, 100.1, 100.5, 99.8, 100.2),
+            self.make_candle(4, 2, 100.2, 101, 100, 100.9, 20),
+            self.make_candle(4, 4, 100.9, 102, 100.7, 101.5, 30),
+        ]
+        day = MinuteCandlesDay.from_candles(candles, lambda q: q2f(q, 2))
+
+        self.assertEqual(day.get_aggregated(240, 5, 300), (100.1, 102, 99.8, 101.5, 60, True))
+
+        # последняя свеча еще не наступила
+        self.assertEqual(day.get_aggregated(240, 5, 243), (100.1, 101, 99.8, 100.9, 30, False))
+
+        open_, high, low, close, volume, is_complete = day.get_aggregated(250, 5, 300)
+        self.assertIsNone(open_)
+        self.assertEqual(volume, 0)
+        self.assertTrue(is_complete)
+
+    def test_nbytes(self):
+        # объем с таблицами агрегированных свечей сразу, после их построения он не меняется
+        day = MinuteCandlesDay.from_candles([self.make_candle(4, 0, 100.1, 100.5, 99.8, 100.2)], lambda q: q2f(q, 2))
+        nbytes = day.nbytes
+        self.assertGreater(nbytes, day.open.nbytes * 20)
+
+        day.get_aggregated(240, 5, 300)
+        tables = [*day._high_table, *day._low_table, day._volume_sum, day._mask_sum, day._next_index, day._prev_index]
+        arrays = [day.open, day.high, day.low, day.close, day.volume, day.mask]
+        self.assertEqual(day.nbytes, nbytes)
+        self.assertEqual(nbytes, sum(array.nbytes for array in arrays + tables))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,21 @@
+import unittest
+from datetime import datetime, timezone
+
+from app.constants import HistoryOrderType
+from bot.env.test import OrderLog
+
+
+class TestOrderLog(unittest.TestCase):
+    def setUp(self):
+        self.log = OrderLog()
+        self.dt = datetime(2024, 10, 24, 10, 0, tzinfo=timezone.utc)
+
+    def test_add(self):
+        self.log.add(0, HistoryOrderType.OPEN_BUY_LIMIT, self.dt, 100., 100., 1)
+        self.log.add(0, HistoryOrderType.EXECUTED_BUY_LIMIT, self.dt, -100., -100.05, 1, 0.05)
+        self.log.add(0, HistoryOrderType.MARK, self.dt, 100., 0, 0, 0)
+
+        self.assertEqual(len(self.log), 3)
+        self.assertEqual(self.log.executed_cnt, 1)
+        self.assertEqual(self.log.prices, [100., -100., 100.])
+        self.assertEqual(self.log.commissions, [None, 0.05, 0])
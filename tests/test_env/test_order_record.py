@@ -0,0 +1,112 @@
+import unittest
+
+from tinkoff.invest import OrderDirection, OrderType, OrderExecutionReportStatus, PostOrderResponse, OrderState, \
+    MoneyValue
+
+from bot.helper import OrderHelper, OrderRecord
+
+
+def money(value: float) -> tuple[float, MoneyValue]:
+    """Значение в OrderRecord и MoneyValue, который оно заменяет"""
+    units = int(value)
+    nano = round((value - units) * 1e9)
+    return units + nano * 1e-9, MoneyValue(currency='rub', units=units, nano=nano)
+
+
+def make_pair(
+        direction: int,
+        status: int,
+        lots_requested: int,
+        lots_executed: int,
+        initial_order_price: float,
+        executed_order_price: float,
+        initial_commission: float,
+        executed_commission: float,
+        initial_security_price: float,
+        average_position_price: float | None = None,
+) -> tuple[OrderRecord, PostOrderResponse | OrderState]:
+    """
+    Пара из OrderRecord и объекта API с теми же полями.
+    average_position_price задан - OrderState, нет - PostOrderResponse
+    """
+    is_state = average_position_price is not None
+    values = {
+        'initial_order_price': money(initial_order_price),
+        'executed_order_price': money(executed_order_price),
+        'initial_commission': money(initial_commission),
+        'executed_commission': money(executed_commission),
+        'initial_security_price': money(initial_security_price),
+    }
+    if is_state:
+        values['average_position_price'] = money(average_position_price)
+
+    common = {
+        'order_id': '1',
+        'direction': direction,
+        'execution_report_status': status,
+        'lots_requested': lots_requested,
+        'lots_executed': lots_executed,
+    }
+    record = OrderRecord(order_type=OrderType.ORDER_TYPE_LIMIT, is_state=is_state, **common,
+                         **{name: value[0] for name, value in values.items()})
+    api_class = OrderState if is_state else PostOrderResponse
+    order = api_class(**common, **{name: value[1] for name, value in values.items()})
+    return record, order
+
+
+class TestOrderRecord(unittest.TestCase):
+    BUY = OrderDirection.ORDER_DIRECTION_BUY
+    SELL = OrderDirection.ORDER_DIRECTION_SELL
+    FILL = OrderExecutionReportStatus.EXECUTION_REPORT_STATUS_FILL
+    NEW = OrderExecutionReportStatus.EXECUTION_REPORT_STATUS_NEW
+
+    PRICES = [100, 236.5, 234.29, 0.07, 1.03, 17.6, 2999.99]
+    LOTS = [1, 2, 7]
+    COMMISSION = 0.0005
+
+    def get_pairs(self) -> list[tuple[OrderRecord, PostOrderResponse | OrderState]]:
+        pairs = [
+            # ответы реального API из комментариев в ClientTestEnvHelper: исполненная и новая заявки
+            make_pair(self.BUY, self.FILL, 2, 2, 470, 468.59, 0.24, 0.23, 235, 234.295),
+            make_pair(self.SELL, self.NEW, 2, 0, 473, 0, 0.24, 0, 236.5, 0),
+        ]
+
+        # заявки, которые собирает тестовое окружение
+        for price in self.PRICES:
+            for lots in self.LOTS:
+                amount = round(lots * price, 2)
+                commission = round(amount * self.COMMISSION, 2)
+                for direction in [self.BUY, self.SELL]:
+                    pairs += [
+                        # рыночная и по лучшей цене: исполнена сразу
+                        make_pair(direction, self.FILL, lots, lots, amount, price, commission, 0, price),
+                        # лимитная: выставлена
+                        make_pair(direction, self.NEW, lots, 0, amount, 0, commission, 0, price),
+                        # статус лимитной: открыта и исполнена
+                        make_pair(direction, self.NEW, lots, 0, amount, 0, commission, 0, price, 0),
+                        make_pair(direction, self.FILL, lots, lots, amount, amount, commission, commission, price,
+                                  price),
+                    ]
+        return pairs
+
+    def test_order_helper(self):
+        """OrderHelper отдает по OrderRecord то же, что и по PostOrderResponse и OrderState"""
+        for record, order in self.get_pairs():
+            with self.subTest(order=order):
+                self.assertEqual(OrderHelper.get_avg_price(record), OrderHelper.get_avg_price(order))
+                self.assertEqual(OrderHelper.get_lots(record), OrderHelper.get_lots(order))
+                self.assertEqual(OrderHelper.get_lots(record, True), OrderHelper.get_lots(order, True))
+                self.assertEqual(OrderHelper.get_commission(record), OrderHelper.get_commission(order))
+                self.assertEqual(record.direction, order.direction)
+
+    def test_pair_values(self):
+        record, order = make_pair(self.BUY, self.FILL, 2, 2, 470, 468.59, 0.24, 0.23, 235, 234.295)
+        # 234.295 во float чуть меньше, округление как у q2f
+        self.assertEqual(OrderHelper.get_avg_price(record), 234.29)
+        self.assertEqual(OrderHelper.get_lots(record), 2)
+        self.assertEqual(OrderHelper.get_commission(record), 0.23)
+        self.assertEqual(order.average_position_price, MoneyValue(currency='rub', units=234, nano=295000000))
+
+
+if __name__ == '__main__':
+    unittest.main()
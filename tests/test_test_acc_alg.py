@@ -0,0 +1,42 @@
+import unittest
+
+from app.config import RunConfig, AccConfig
+from bot.test import TestAlgorithm, TestAccAlgorithm
+from tests.synthetic_case import SyntheticCandlesTestCase
+
+
+class TestAccParallel(SyntheticCandlesTestCase):
+    TICKERS = ['SYNTA', 'SYNTB', 'SYNTC']
+    CONFIGS = [
+        'SYNTA- 8/4/2 x l1 x 0.4¤',
+        'SYNTB+ 4/fan7:0/2 x l1 x 0.6(+x0.2)¤',
+        'SYNTC- 8/fan3:4/2 x l1 x 0.4¤ P',
+    ]
+    ACC_CONFIGS = [
+        # бот аккаунта только следит
+        't2 [0] |u0.2 d0|',
+        # остановки по прибыли аккаунта: день пересчитывается последовательно
+        't2 [0] |u0.002 d0.002|',
+    ]
+
+    def run_test(self, acc_config: AccConfig, workers: int) -> dict:
+        bot_alg_list = [TestAlgorithm(config=RunConfig.from_repr_string(config), use_cache=False, workers=1)
+                        for config in self.CONFIGS]
+        acc_alg = TestAccAlgorithm(config=acc_config, bot_alg_list=bot_alg_list, workers=workers)
+        results = acc_alg.test(self.LAST_DATE, 3)
+        return {
+            'acc': results['acc']['profit'],
+            'bots': [(res['profit'], res['op'], str(res['last_conf'])) for res in results['bots']],
+            'balances': [bot_alg.balance_change_list for bot_alg in bot_alg_list],
+        }
+
+    def test_same_as_sequential(self):
+        """Дни ботов в процессах пула дают тот же итог, что и общий поминутный цикл"""
+        for acc_config_str in self.ACC_CONFIGS:
+            with self.subTest(acc_config=acc_config_str):
+                acc_config = AccConfig.from_repr_string(acc_config_str)
+                self.assertEqual(self.run_test(acc_config, 2), self.run_test(acc_config, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,13 @@
 import math
+import copy
 import unittest
+from unittest.mock import patch
 
+from app.config import RunConfig
+from bot import TradingBot
+from bot.env.test import ClientTestEnvHelper
 from bot.test import TestAlgorithm
+from tests.synthetic_case import SyntheticCandlesTestCase
 
 
 class TestTestAlg(unittest.TestCase):
@@ -34,3 +40,147 @@ class TestTestAlg(unittest.TestCase):
         expected = 1
         result = TestAlgorithm.calc_required_step_max_cnt(max_change, step_size, step_size_shift)
         self.assertEqual(result, expected)
+
+    def test_chunk_size(self):
+        """Размер пачки конфигов для пула процессов"""
+        self.assertEqual(TestAlgorithm.get_chunk_size(1, 8), 1)
+        self.assertEqual(TestAlgorithm.get_chunk_size(0, 8), 1)
+        self.assertEqual(TestAlgorithm.get_chunk_size(64, 8), 2)
+        self.assertEqual(TestAlgorithm.get_chunk_size(1350, 8), 43)
+
+    def test_halving_days(self):
+        """Длины окон по этапам отсева"""
+        self.assertEqual(TestAlgorithm.get_halving_days(7, 3), [1, 3, 7])
+        self.assertEqual(TestAlgorithm.get_halving_days(7, 1), [7])
+        self.assertEqual(TestAlgorithm.get_halving_days(2, 3), [1, 2])
+        self.assertEqual(TestAlgorithm.get_halving_days(20, 2), [10, 20])
+
+
+class TestRunConfigList(SyntheticCandlesTestCase):
+    CONFIGS = [
+        'SYNTA- 8/4/2 x l1 x 0.4¤',
+        'SYNTA+ 4/fan7:0/2 x l1 x 0.6(+x0.2)¤',
+        'SYNTA- 8/4/2 x l1 x 0.4¤ |u0.01 d0.01| ',
+    ]
+
+    def test_same_as_single_test(self):
+        """Перебор списка конфигов (и в пуле процессов) дает те же результаты, что и тест каждого по отдельности"""
+        config_list = [RunConfig.from_repr_string(config) for config in self.CONFIGS]
+        expected = [
+            TestAlgorithm(config=config, use_cache=False, workers=1).test(self.LAST_DATE, 5)
+            for config in config_list
+        ]
+
+        for workers in [1, 2]:
+            test_alg = TestAlgorithm(config=config_list[0], use_cache=False, workers=workers)
+            self.assertEqual(test_alg.run_config_list(config_list, self.LAST_DATE, 5), expected)
+
+
+class TestBatchAlg(SyntheticCandlesTestCase):
+    TICKERS = ['SYNTA', 'SYNTB']
+    CONFIGS = [
+        'SYNTA- 8/4/2 x l1 x 0.4¤',
+        'SYNTB+ 6/-3/2 x l1 x 0.4¤',
+        'SYNTA+ 4/fan7:0/2 x l1 x 0.6(+x0.2)¤',
+        'SYNTA- 8/4/2 x l1 x 0.4¤ |u0.01 d0.01| ',
+        'SYNTB- 8/fan3:4/2 x l1 x 0.4¤ P',
+    ]
+
+    def run_batch(self, fast_forward: bool) -> list[dict]:
+        config_list = [RunConfig.from_repr_string(config) for config in self.CONFIGS]
+        return TestAlgorithm.run_config_batch(config_list, self.LAST_DATE, 5, False, fast_forward)
+
+    def test_same_as_single_test(self):
+        """Боты пачки, идущие по дню вместе, дают те же результаты, что и тест каждого конфига отдельно"""
+        for fast_forward in [False, True]:
+            with self.subTest(fast_forward=fast_forward):
+                expected = [
+                    TestAlgorithm(config=RunConfig.from_repr_string(config), use_cache=False, workers=1,
+                                  fast_forward=fast_forward).test(self.LAST_DATE, 5)
+                    for config in self.CONFIGS
+                ]
+                self.assertEqual(self.run_batch(fast_forward), expected)
+
+    def test_day_loaded_once(self):
+        """Свечи дня загружаются один раз на тикер, а не на каждый конфиг"""
+        with patch.object(ClientTestEnvHelper, 'get_minute_candles_day', autospec=True,
+                          side_effect=ClientTestEnvHelper.get_minute_candles_day) as get_day:
+            self.run_batch(True)
+
+        days_num = len(TestAlgorithm.get_days_list(self.LAST_DATE, 5))
+        self.assertEqual(get_day.call_count, days_num * len(self.TICKERS))
+
+
+class TestWalkForward(SyntheticCandlesTestCase):
+    # при таком числе шагов лотность в окне не зависит от баланса на старте дня
+    CONFIGS = [
+        'SYNTA+ 12/-6/2 x l1 x 0.2¤',
+        'SYNTA+ 20/-10/2 x l1 x 0.2¤',
+    ]
+
+    @staticmethod
+    def get_totals(results: list[dict]) -> list[tuple]:
+        return [(res['profit'], res['op'], res['last_conf']) for res in results]
+
+    def test_same_as_full_window(self):
+        """Окно из отдельных дней с переносом шорта через ночь считается так же, как полный прогон окна"""
+        config_list = [RunConfig.from_repr_string(config) for config in self.CONFIGS]
+        test_alg = TestAlgorithm(config=config_list[0], use_cache=False, workers=1)
+
+        # бот не откупает шорт в конце дня - позиция переносится на следующий
+        with patch.object(TradingBot, 'buy', lambda bot, count: None):
+            expected = test_alg.run_config_list(config_list, self.LAST_DATE, 5)
+            results = test_alg.run_config_list_walk_forward(config_list, self.LAST_DATE, 5)
+
+        day_results = [res for date_results in test_alg.walk_forward_results.values()
+                       for res in date_results.values()]
+        self.assertTrue(any(res['end_cnt'] < 0 for res in day_results))
+        self.assertEqual(self.get_totals(results), self.get_totals(expected))
+
+
+class TestFastForward(SyntheticCandlesTestCase):
+    SEED = 4
+    CONFIGS = [
+        # TradeNormalStrategy
+        'SYNTA- 8/4/2 x l1 x 0.4¤',
+        'SYNTA+ 6/-3/2 x l1 x 0.4¤',
+        'SYNTA- 8/0/2 x l1 x 0.4¤',
+        'SYNTA+ 5/-5/2 x l1 x 0.4¤',
+        # TradeShiftV2Strategy
+        'SYNTA+ 4/fan7:0/2 x l1 x 0.6(+x0.2)¤',
+        'SYNTA- 8/fan3:4/2 x l1 x 0.4¤ P',
+        # остановки по прибыли и убытку
+        'SYNTA- 8/4/2 x l1 x 0.4¤ |u0.01 d0.01| ',
+        'SYNTA- 8/fan3:4/2 x l1 x 0.3(+x0.1)¤ |u0.01 d0.005| ',
+    ]
+
+    # интервал сна бота, сек. больше минуты - бот просыпается не каждую минуту
+    SLEEP_LIST = [60, 180]
+
+    @staticmethod
+    def run_test(config: RunConfig, fast_forward: bool) -> tuple:
+        test_alg = TestAlgorithm(config=config, use_cache=False, workers=1, fast_forward=fast_forward)
+        results = test_alg.test(TestFastForward.LAST_DATE, 5)
+        return results, test_alg.balance_change_list, test_alg.operations_cnt_list
+
+    def test_same_as_minute_by_minute(self):
+        """Пропуск минут без событий не меняет результаты дней"""
+        for config_str in self.CONFIGS:
+            for sleep_trading in self.SLEEP_LIST:
+                with self.subTest(config=config_str, sleep_trading=sleep_trading):
+                    config = RunConfig.from_repr_string(config_str)
+                    config.sleep_trading = sleep_trading
+                    self.assertEqual(self.run_test(config, True), self.run_test(copy.copy(config), False))
+
+    def test_minutes_skipped(self):
+        """Полностью прогоняется малая часть минут дня"""
+        config = RunConfig.from_repr_string(self.CONFIGS[2])
+        with patch.object(TestAlgorithm, 'bot_run_iteration', autospec=True,
+                          side_effect=TestAlgorithm.bot_run_iteration) as run_iteration:
+            self.run_test(config, True)
+            fast_cnt = run_iteration.call_count
+            run_iteration.reset_mock()
+            self.run_test(copy.copy(config), False)
+            full_cnt = run_iteration.call_count
+
+        self.assertLess(fast_cnt * 3, full_cnt)